@@ -0,0 +1,59 @@
+"""
+Validadores HTTP (ETag) y peticiones condicionales para los manejadores
+basados en http.server.
+
+Los ETags se construyen a partir de datos ya conocidos (id y versión del
+recurso, formato de la representación), no del hash del cuerpo, así que
+comprobar If-None-Match no requiere serializar nada: si coincide se responde
+304 Not Modified sin cuerpo.
+"""
+
+
+def make_etag(*parts):
+    """
+    Devuelve un ETag fuerte (entre comillas) formado por las partes indicadas
+    """
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+
+def if_none_match(header, etag):
+    """
+    Indica si la cabecera If-None-Match incluye el ETag (o es "*").
+
+    Usa la comparación débil que exige RFC 9110 para If-None-Match: el prefijo
+    W/ no se tiene en cuenta.
+    """
+    if not header:
+        return False
+    header = header.strip()
+    if header == "*":
+        return True
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class ConditionalHandlerMixin:
+    """
+    Mixin para manejadores BaseHTTPRequestHandler con peticiones condicionales
+    """
+
+    def not_modified(self, etag, vary=None):
+        """
+        Si la petición ya tiene la representación con ese ETag, responde 304 y
+        devuelve True; si no, devuelve False para que se envíe el cuerpo.
+
+        vary es la cabecera Vary que llevaría la respuesta completa.
+        """
+        if not if_none_match(self.headers.get("If-None-Match"), etag):
+            return False
+        self.send_response(304)
+        self.send_header("ETag", etag)
+        if vary:
+            self.send_header("Vary", vary)
+        self.end_headers()
+        return True
@@ -0,0 +1,17 @@
+from conditional import if_none_match, make_etag
+
+
+def test_make_etag_is_quoted():
+    assert make_etag(1, 3, "json") == '"1-3-json"'
+
+
+def test_if_none_match():
+    """
+    If-None-Match admite listas, "*" y ETags débiles (comparación débil)
+    """
+    etag = make_etag(1, 3, "json")
+    assert if_none_match('"1-3-json"', etag)
+    assert if_none_match('"otro", W/"1-3-json"', etag)
+    assert if_none_match("*", etag)
+    assert not if_none_match('"1-2-json"', etag)
+    assert not if_none_match(None, etag)
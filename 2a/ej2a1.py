@@ -13,13 +13,75 @@ Tu tarea es completar la implementación de la clase MyHTTPRequestHandler.
 Nota: Si deseas cambiar el idioma del ejercicio, edita el archivo de test correspondiente (ej2a1_test.py).
 """
 
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from email.utils import formatdate
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler
+import re
+import time
+from request_metrics import METRICS_PATH, InstrumentedHandlerMixin, RequestMetrics
+from server_engines import DrainableHandlerMixin, PreforkLauncher, create_http_server, serve_with_drain
 
-class MyHTTPRequestHandler(BaseHTTPRequestHandler):
+
+class PreencodedResponse:
+    """
+    Respuesta HTTP completa (línea de estado, cabeceras y cuerpo) codificada
+    una sola vez, lista para enviarse con una única escritura en el socket.
+
+    Solo la cabecera Date depende del momento del envío, así que se vuelve a
+    sellar como mucho una vez por segundo. Durante un drenaje se añade
+    además "Connection: close", como en el resto de respuestas.
+    """
+
+    def __init__(self, status, content_type, body, protocol_version="HTTP/1.1"):
+        self.status = status
+        self.body_length = len(body)
+        self._head = (
+            f"{protocol_version} {status} {HTTPStatus(status).phrase}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Date: "
+        ).encode("latin-1")
+        self._body = b"\r\n\r\n" + body
+        self._stamped = (None, b"")
+
+    def data(self, close=False):
+        """
+        Devuelve los bytes de la respuesta con la cabecera Date actual y, con
+        close, la cabecera "Connection: close"
+        """
+        now = int(time.time())
+        second, data = self._stamped
+        if second != now:
+            data = self._head + formatdate(now, usegmt=True).encode("latin-1") + self._body
+            self._stamped = (now, data)
+        if close:
+            return data[:-len(self._body)] + b"\r\nConnection: close" + self._body
+        return data
+
+
+def build_static_responses(protocol_version="HTTP/1.1"):
+    """
+    Construye las respuestas fijas del servidor: la raíz y el 404
+    """
+    return {
+        "root": PreencodedResponse(200, "text/plain", "¡Hola mundo!".encode(), protocol_version),
+        "not_found": PreencodedResponse(404, "text/plain", "404 Not Found".encode(), protocol_version),
+    }
+
+
+class MyHTTPRequestHandler(InstrumentedHandlerMixin, DrainableHandlerMixin, BaseHTTPRequestHandler):
     """
     Manejador de peticiones HTTP personalizado
     """
 
+    # HTTP/1.1 permite reutilizar la conexión para varias peticiones (keep-alive),
+    # por lo que todas las respuestas deben indicar su Content-Length exacto
+    protocol_version = "HTTP/1.1"
+    # Segundos de inactividad tras los que se cierra una conexión keep-alive
+    timeout = 5
+    # Rutas con las que se agrupan las métricas de /metrics
+    metrics_routes = ((re.compile(r"/$"), "/"),)
+
     def do_GET(self):
         """
         Método que se ejecuta cuando se recibe una petición GET.
@@ -28,32 +90,66 @@ class MyHTTPRequestHandler(BaseHTTPRequestHandler):
 
         Para otras rutas, devuelve un código de estado 404 (Not Found).
         """
+        # Las respuestas se construyen una vez en create_server y se reutilizan
         if self.path == '/':
-            self.send_response(200)
-            self.send_header('Content-type', 'text/plain')
-            self.end_headers()
-            self.wfile.write("¡Hola mundo!".encode())
+            self.send_preencoded(self.server.static_responses["root"])
+        elif self.path == METRICS_PATH:
+            self.send_metrics()
         else:
-            self.send_response(404)
-            self.send_header('Content-type', 'text/plain')
-            self.end_headers()
-            self.wfile.write("404 Not Found".encode())
+            self.send_preencoded(self.server.static_responses["not_found"])
+
+    def send_preencoded(self, response):
+        """
+        Envía una respuesta PreencodedResponse con una sola escritura (un sendall)
+        """
+        self.log_request(response.status, response.body_length)
+        # Igual que end_headers en DrainableHandlerMixin
+        close = getattr(self.server, "draining", False) and self.request_version != "HTTP/0.9"
+        self.wfile.write(response.data(close))
 
 
-def create_server(host="localhost", port=8000):
+def create_server(host="localhost", port=8000, workers=None, queue_size=None, backlog=None,
+                  queue_timeout=None, engine="threads", log_sample_rate=0.0):
     """
     Crea y configura el servidor HTTP
+
+    - workers: si se indica, las conexiones se atienden en un pool de ese tamaño
+    - queue_size: conexiones que pueden esperar un hilo libre (por defecto, workers)
+    - backlog: tamaño de la cola de conexiones pendientes del socket
+    - queue_timeout: segundos que se espera hueco en la cola del pool antes de
+      responder 503 (None = esperar sin límite)
+    - engine: "threads" (un hilo por conexión o pool de hilos) o "asyncio" (bucle de eventos)
+    - log_sample_rate: fracción de peticiones que se escriben en el log (0 = ninguna)
     """
     server_address = (host, port)
-    httpd = HTTPServer(server_address, MyHTTPRequestHandler)
+    httpd = create_http_server(
+        server_address,
+        MyHTTPRequestHandler,
+        workers=workers,
+        queue_size=queue_size,
+        backlog=backlog,
+        queue_timeout=queue_timeout,
+        engine=engine,
+    )
+    httpd.metrics = RequestMetrics()
+    httpd.log_sample_rate = log_sample_rate
+    httpd.static_responses = build_static_responses(MyHTTPRequestHandler.protocol_version)
     return httpd
 
-def run_server(server):
+def run_server(server, processes=None, drain_timeout=10.0):
     """
-    Inicia el servidor HTTP
+    Inicia el servidor HTTP (sirve igual para cualquier motor de create_server)
+
+    - processes: si se indica, reparte el servidor entre ese número de procesos
+      hijos que comparten el socket de escucha y se relanzan si fallan
+    - drain_timeout: al recibir SIGTERM se deja de aceptar conexiones y las
+      peticiones en curso tienen este plazo (en segundos) para terminar
     """
     print(f"Servidor iniciado en http://{server.server_name}:{server.server_port}")
-    server.serve_forever()
+    if processes:
+        PreforkLauncher(server, processes, drain_timeout=drain_timeout).serve_forever()
+    else:
+        serve_with_drain(server, drain_timeout)
 
 if __name__ == '__main__':
     server = create_server()
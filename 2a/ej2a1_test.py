@@ -2,15 +2,17 @@ import pytest
 import threading
 import requests
 import time
-from ej2a1 import create_server
+import socket
+from ej2a1 import PreencodedResponse, create_server
 
-@pytest.fixture
-def server():
+@pytest.fixture(params=["threads", "asyncio"])
+def server(request):
     """
     Fixture para iniciar y detener el servidor HTTP durante las pruebas
+    (se ejecuta con cada uno de los motores de servidor disponibles)
     """
     # Crear el servidor en un puerto específico para pruebas
-    server = create_server(host="localhost", port=8888)
+    server = create_server(host="localhost", port=8888, engine=request.param)
 
     # Iniciar el servidor en un hilo separado
     thread = threading.Thread(target=server.serve_forever)
@@ -42,3 +44,103 @@ def test_nonexistent_endpoint(server):
     """
     response = requests.get("http://localhost:8888/nonexistent")
     assert response.status_code == 404, "El código de estado debe ser 404 para rutas inexistentes."
+
+def test_preencoded_response(monkeypatch):
+    """
+    La respuesta precodificada contiene estado, cabeceras y cuerpo en un único bloque de bytes.
+    """
+    monkeypatch.setattr(time, "time", lambda: 1700000000.5)
+    response = PreencodedResponse(200, "text/plain", "¡Hola mundo!".encode())
+    data = response.data()
+    head, _, body = data.partition(b"\r\n\r\n")
+    assert head.startswith(b"HTTP/1.1 200 OK\r\n")
+    assert b"Content-Length: %d" % len(body) in head
+    assert b"\r\nDate: " in head
+    assert body == "¡Hola mundo!".encode()
+    assert b"Date: Tue, 14 Nov 2023 22:13:20 GMT" in head
+    # Dentro del mismo segundo se reutilizan exactamente los mismos bytes
+    assert response.data() is data
+
+    # Durante un drenaje la respuesta anuncia que se cierra la conexión
+    closing = response.data(close=True)
+    head, _, body = closing.partition(b"\r\n\r\n")
+    assert head.endswith(b"\r\nConnection: close")
+    assert body == "¡Hola mundo!".encode()
+
+def test_cached_response_headers(server):
+    """
+    Las respuestas cacheadas llevan las cabeceras habituales.
+    """
+    response = requests.get("http://localhost:8888/")
+    assert response.headers["Content-Type"] == "text/plain"
+    assert response.headers["Content-Length"] == str(len(response.content))
+    assert "Date" in response.headers
+
+def test_keep_alive_pipelined_requests(server):
+    """
+    Con HTTP/1.1 varias peticiones encadenadas se responden por la misma conexión,
+    cada una con su Content-Length exacto (también la de 404).
+    """
+    with socket.create_connection(("localhost", 8888), timeout=2) as sock:
+        sock.sendall(
+            b"GET / HTTP/1.1\r\nHost: localhost\r\n\r\n"
+            b"GET /nonexistent HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n"
+        )
+        data = b""
+        while True:
+            chunk = sock.recv(4096)
+            if not chunk:
+                break
+            data += chunk
+
+    first, _, rest = data.partition(b"\r\n\r\n")
+    assert first.startswith(b"HTTP/1.1 200")
+    length = int(next(line for line in first.split(b"\r\n") if line.lower().startswith(b"content-length:")).split(b":")[1])
+    assert rest[:length] == "¡Hola mundo!".encode()
+
+    second = rest[length:]
+    assert second.startswith(b"HTTP/1.1 404")
+    head, _, body = second.partition(b"\r\n\r\n")
+    assert f"Content-Length: {len(body)}".encode() in head
+
+def test_slow_client_does_not_block_worker_pool():
+    """
+    Con un pool de hilos, un cliente lento no debe bloquear al resto de peticiones.
+    """
+    server = create_server(host="localhost", port=8891, workers=4)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+
+    # Cliente que abre la conexión pero nunca envía la petición
+    slow_client = socket.create_connection(("localhost", 8891))
+    try:
+        time.sleep(0.2)
+        response = requests.get("http://localhost:8891/", timeout=2)
+        assert response.status_code == 200, "El pool debe atender otras conexiones mientras una está ocupada."
+    finally:
+        slow_client.close()
+        server.shutdown()
+        server.server_close()
+        thread.join(1)
+
+def test_queue_timeout_rejects_with_503():
+    """
+    Con queue_timeout, una conexión que no cabe en el pool lleno recibe un 503.
+    """
+    server = create_server(host="localhost", port=8891, workers=1, queue_size=0, queue_timeout=0.2)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+
+    # La conexión lenta retiene el único hilo del pool
+    slow_client = socket.create_connection(("localhost", 8891))
+    try:
+        time.sleep(0.2)
+        response = requests.get("http://localhost:8891/", timeout=2)
+        assert response.status_code == 503
+    finally:
+        slow_client.close()
+        server.shutdown()
+        server.server_close()
+        thread.join(1)
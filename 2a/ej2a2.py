@@ -10,17 +10,38 @@ Tu tarea es implementar el siguiente endpoint:
 
 Requisitos:
 - Utiliza la lista de productos proporcionada.
-- Devuelve las respuestas en formato JSON.
+- Devuelve las respuestas en formato JSON (o en XML si la cabecera Accept lo prefiere).
 - Asegúrate de utilizar los códigos de estado HTTP apropiados.
 
 Ejemplo:
 1. Una solicitud `GET /product/1` debe devolver los datos del producto con ID 1 y código 200.
 2. Una solicitud `GET /product/999` debe devolver un mensaje de error con código 404.
+
+Además, para no hacer una petición por producto, la API permite pedir varios a la vez:
+`GET /products?ids=1,2,3` o `POST /products/batch` con el cuerpo `{"ids": [1, 2, 3]}`.
+Ambas devuelven `{"products": [...], "missing": [...]}` con código 200.
 """
 
-from http.server import HTTPServer, BaseHTTPRequestHandler
+import os
+import sys
+from http.server import BaseHTTPRequestHandler
 import json
-import re
+from urllib.parse import parse_qs, urlsplit
+
+# El paquete comun está en la raíz del repositorio; así el ejercicio también
+# se puede ejecutar como script (python 2a/ej2a2.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from comun.compression import CompressionHandlerMixin, Compressor
+from comun.response_cache import ResponseCache
+
+from conditional import ConditionalHandlerMixin, make_etag
+from negotiation import negotiate
+from product_repository import ProductRepository
+from request_metrics import METRICS_PATH, InstrumentedHandlerMixin, RequestMetrics
+from routing import Router, RoutingHandlerMixin
+from server_engines import DrainableHandlerMixin, PreforkLauncher, create_http_server, serve_with_drain
+from xml_writer import to_xml
 
 # Lista de productos predefinida
 products = [
@@ -29,61 +50,227 @@ products = [
     {"id": 3, "name": "Tablet", "price": 349.99}
 ]
 
+# Índice por id sobre la lista anterior: las búsquedas no recorren el catálogo
+repository = ProductRepository(products)
+
+# Formatos en que se puede pedir un producto con la cabecera Accept (el primero
+# es el predeterminado), con el sufijo de su ETag y su serializador
+PRODUCT_FORMATS = {
+    "application/json": ("json", lambda product: json.dumps(product).encode()),
+    "application/xml": ("xml", lambda product: to_xml("product", product)),
+}
+
+# Cuerpo ya serializado de cada producto en cada formato; se invalida cuando el
+# producto cambia
+product_cache = ResponseCache()
+
+
+def invalidate_product(product_id):
+    for media_type in PRODUCT_FORMATS:
+        product_cache.invalidate((product_id, media_type))
+
+
+repository.add_listener(invalidate_product)
+
+# Rutas de la API: se compilan una vez en un árbol de prefijos por segmentos
+api_routes = Router()
+api_routes.add("GET", "/product/<int:product_id>", "get_product")
+api_routes.add("GET", "/products", "get_products")
+api_routes.add("POST", "/products/batch", "post_products_batch")
+api_routes.add("GET", METRICS_PATH, "send_metrics")
+
+# Máximo de ids por petición de varios productos, y tamaño máximo de su cuerpo
+MAX_BATCH_IDS = 100
+MAX_BATCH_BODY = 64 * 1024
 
-class ProductAPIHandler(BaseHTTPRequestHandler):
+
+def product_body(product, media_type="application/json"):
+    """
+    Devuelve el CachedBody del producto en ese formato, serializándolo solo si no está en caché
+    """
+    serialize = PRODUCT_FORMATS[media_type][1]
+    return product_cache.get_or_build((product["id"], media_type), lambda: serialize(product))
+
+
+def parse_ids(values):
+    """
+    Convierte los ids pedidos en enteros, sin repetidos y en el orden pedido.
+
+    Lanza ValueError si alguno no es válido o si hay demasiados.
+    """
+    ids = list(dict.fromkeys(int(value) for value in values))
+    if len(ids) > MAX_BATCH_IDS:
+        raise ValueError(f"Se pueden pedir como mucho {MAX_BATCH_IDS} productos")
+    return ids
+
+
+class ProductAPIHandler(RoutingHandlerMixin, ConditionalHandlerMixin, CompressionHandlerMixin,
+                        InstrumentedHandlerMixin, DrainableHandlerMixin, BaseHTTPRequestHandler):
     """
     Manejador de peticiones HTTP para la API de productos
     """
 
+    # HTTP/1.1 permite reutilizar la conexión para varias peticiones (keep-alive),
+    # por lo que todas las respuestas deben indicar su Content-Length exacto
+    protocol_version = "HTTP/1.1"
+    # Segundos de inactividad tras los que se cierra una conexión keep-alive
+    timeout = 5
+    # Tabla de rutas compilada al importar el módulo
+    routes = api_routes
+
     def do_GET(self):
         """
         Método que se ejecuta cuando se recibe una petición GET.
         Debes implementar la lógica para responder a la petición GET en la ruta /product/<id>
         con los datos del producto en formato JSON si existe, o un error 404 si no existe.
         """
-        # Verificar si la ruta coincide con el patrón /product/<id>
-        match = re.match(r'/product/(\d+)', self.path)
-        
-        if match:
-            # Extraer el ID del producto de la ruta
-            product_id = int(match.group(1))
-            
-            # Buscar el producto en la lista
-            product = next((p for p in products if p["id"] == product_id), None)
-            
-            if product:
-                # Producto encontrado - devolver con código 200
-                self.send_response(200)
-                self.send_header('Content-type', 'application/json')
-                self.end_headers()
-                self.wfile.write(json.dumps(product).encode())
-            else:
-                # Producto no encontrado - devolver error 404
-                self.send_response(404)
-                self.send_header('Content-type', 'application/json')
-                self.end_headers()
-                self.wfile.write(json.dumps({"error": "Producto no encontrado"}).encode())
-        else:
+        # Buscar la ruta en la tabla y ejecutar su método (get_product, get_products...)
+        if not self.dispatch():
             # Ruta no válida - devolver error 404
-            self.send_response(404)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps({"error": "Ruta no válida"}).encode())
+            self.send_json(404, {"error": "Ruta no válida"})
 
-def create_server(host="localhost", port=8000):
+    def do_POST(self):
+        """
+        Método que se ejecuta cuando se recibe una petición POST (POST /products/batch)
+        """
+        if not self.dispatch():
+            self.send_json(404, {"error": "Ruta no válida"})
+
+    def get_product(self, product_id):
+        """
+        GET /product/<id>: devuelve el producto en JSON o XML (según Accept), o
+        un error 404 si no existe
+        """
+        # Buscar el producto en el índice
+        product = repository.get(product_id)
+
+        if product:
+            # Elegir el formato según la cabecera Accept (con sus valores q)
+            media_type = negotiate(self.headers.get('Accept'), tuple(PRODUCT_FORMATS))
+            if media_type is None:
+                self.send_json(406, {"error": "Formato no disponible", "available": list(PRODUCT_FORMATS)})
+                return
+            # El ETag sale de la versión del producto y el formato: si el cliente
+            # ya tiene esa versión se responde 304 sin serializar nada
+            etag = make_etag(product_id, repository.version(product_id), PRODUCT_FORMATS[media_type][0])
+            # El 304 lleva el mismo Vary que llevaría la respuesta completa
+            vary = self.response_vary(media_type, ("Accept",))
+            if self.not_modified(etag, vary=", ".join(vary)):
+                return
+            # Producto encontrado - devolver con código 200 el cuerpo cacheado
+            cached = product_body(product, media_type)
+            self.send_body(200, media_type, cached.body, etag=etag,
+                           content_length=cached.content_length, vary=("Accept",))
+        else:
+            # Producto no encontrado - devolver error 404
+            self.send_json(404, {"error": "Producto no encontrado"})
+
+    def get_products(self):
+        """
+        GET /products?ids=1,2,3: devuelve varios productos en una sola respuesta
+        """
+        query = parse_qs(urlsplit(self.path).query)
+        values = [value for param in query.get("ids", []) for value in param.split(",") if value]
+        try:
+            ids = parse_ids(values)
+        except ValueError as e:
+            self.send_json(400, {"error": str(e)})
+            return
+        self.send_products(ids)
+
+    def post_products_batch(self):
+        """
+        POST /products/batch con {"ids": [...]}: devuelve varios productos en una sola respuesta
+        """
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            length = -1
+        if not 0 <= length <= MAX_BATCH_BODY:
+            # El cuerpo no se lee, así que la conexión no se puede reutilizar
+            self.close_connection = True
+            self.send_json(400, {"error": "Content-Length no válido o cuerpo demasiado grande"})
+            return
+        try:
+            values = json.loads(self.rfile.read(length) or b"{}")["ids"]
+            if not isinstance(values, list) or not all(type(value) is int for value in values):
+                raise ValueError("ids debe ser una lista de enteros")
+            ids = parse_ids(values)
+        except (ValueError, TypeError, KeyError) as e:
+            self.send_json(400, {"error": f"Petición no válida: {e}"})
+            return
+        self.send_products(ids)
+
+    def send_products(self, ids):
+        """
+        Resuelve los ids en una pasada por el índice y envía los encontrados
+        (con su JSON cacheado, sin volver a serializarlos) y los que faltan.
+
+        El cuerpo se construye entero en memoria: parse_ids ya descarta los
+        repetidos y limita la petición a MAX_BATCH_IDS productos, así que la
+        respuesta nunca supera MAX_BATCH_IDS veces el mayor producto del
+        catálogo y no hace falta enviarla por trozos como en ej2a3.
+        """
+        found, missing = repository.get_many(ids)
+        body = b"".join((
+            b'{"products": [',
+            b", ".join([product_body(product).body for product in found]),
+            b'], "missing": ',
+            json.dumps(missing).encode(),
+            b"}",
+        ))
+        self.send_body(200, 'application/json', body)
+
+    def send_json(self, status, data):
+        """
+        Envía data serializado en JSON con el código de estado indicado
+        """
+        self.send_body(status, 'application/json', json.dumps(data).encode())
+
+def create_server(host="localhost", port=8000, workers=None, queue_size=None, backlog=None,
+                  queue_timeout=None, engine="threads", log_sample_rate=0.0, compression_level=6):
     """
     Crea y configura el servidor HTTP
+
+    - workers: si se indica, las conexiones se atienden en un pool de ese tamaño
+    - queue_size: conexiones que pueden esperar un hilo libre (por defecto, workers)
+    - backlog: tamaño de la cola de conexiones pendientes del socket
+    - queue_timeout: segundos que se espera hueco en la cola del pool antes de
+      responder 503 (None = esperar sin límite)
+    - engine: "threads" (un hilo por conexión o pool de hilos) o "asyncio" (bucle de eventos)
+    - log_sample_rate: fracción de peticiones que se escriben en el log (0 = ninguna)
+    - compression_level: nivel de gzip/deflate para las respuestas grandes (None = sin comprimir)
     """
     server_address = (host, port)
-    httpd = HTTPServer(server_address, ProductAPIHandler)
+    httpd = create_http_server(
+        server_address,
+        ProductAPIHandler,
+        workers=workers,
+        queue_size=queue_size,
+        backlog=backlog,
+        queue_timeout=queue_timeout,
+        engine=engine,
+    )
+    httpd.metrics = RequestMetrics()
+    httpd.log_sample_rate = log_sample_rate
+    if compression_level is not None:
+        httpd.compressor = Compressor(level=compression_level)
     return httpd
 
-def run_server(server):
+def run_server(server, processes=None, drain_timeout=10.0):
     """
-    Inicia el servidor HTTP
+    Inicia el servidor HTTP (sirve igual para cualquier motor de create_server)
+
+    - processes: si se indica, reparte el servidor entre ese número de procesos
+      hijos que comparten el socket de escucha y se relanzan si fallan
+    - drain_timeout: al recibir SIGTERM se deja de aceptar conexiones y las
+      peticiones en curso tienen este plazo (en segundos) para terminar
     """
     print(f"Servidor iniciado en http://{server.server_name}:{server.server_port}")
-    server.serve_forever()
+    if processes:
+        PreforkLauncher(server, processes, drain_timeout=drain_timeout).serve_forever()
+    else:
+        serve_with_drain(server, drain_timeout)
 
 if __name__ == '__main__':
     server = create_server()
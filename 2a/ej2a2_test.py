@@ -3,15 +3,17 @@ import threading
 import requests
 import time
 import json
-from ej2a2 import create_server
+import xml.etree.ElementTree as ET
+from ej2a2 import create_server, product_cache, repository
 
-@pytest.fixture
-def server():
+@pytest.fixture(params=["threads", "asyncio"])
+def server(request):
     """
     Fixture para iniciar y detener el servidor HTTP durante las pruebas
+    (se ejecuta con cada uno de los motores de servidor disponibles)
     """
     # Crear el servidor en un puerto específico para pruebas
-    server = create_server(host="localhost", port=8889)
+    server = create_server(host="localhost", port=8889, engine=request.param)
 
     # Iniciar el servidor en un hilo separado
     thread = threading.Thread(target=server.serve_forever)
@@ -67,3 +69,167 @@ def test_invalid_route(server):
     """
     response = requests.get("http://localhost:8889/invalid")
     assert response.status_code == 404, "El código de estado debe ser 404 para rutas inválidas."
+
+def test_keep_alive_content_length(server):
+    """
+    Una sesión reutiliza la conexión y cada respuesta indica su longitud exacta
+    """
+    with requests.Session() as session:
+        for path, status in [("/product/1", 200), ("/product/999", 404), ("/invalid", 404)]:
+            response = session.get(f"http://localhost:8889{path}")
+            assert response.status_code == status
+            assert response.headers["Content-Length"] == str(len(response.content))
+            assert response.headers.get("Connection", "").lower() != "close"
+
+def test_metrics_endpoint(server):
+    """
+    /metrics expone los histogramas de las peticiones anteriores agrupadas por ruta
+    """
+    requests.get("http://localhost:8889/product/1")
+    requests.get("http://localhost:8889/product/999")
+    response = requests.get("http://localhost:8889/metrics")
+    assert response.status_code == 200
+    assert response.headers["Content-Type"].startswith("text/plain")
+    assert 'route="/product/<int:product_id>",status="200",phase="handler"' in response.text
+    assert 'route="/product/<int:product_id>",status="404",phase="handler"' in response.text
+
+def test_cached_product_is_invalidated_on_update(server):
+    """
+    Tras modificar un producto en el repositorio se sirve la versión nueva, no la cacheada
+    """
+    assert requests.get("http://localhost:8889/product/3").json()["price"] == 349.99
+    assert (3, "application/json") in product_cache
+    repository.update(3, {"price": 299.99})
+    try:
+        assert requests.get("http://localhost:8889/product/3").json()["price"] == 299.99
+    finally:
+        repository.update(3, {"price": 349.99})
+
+def test_compressed_variant_follows_the_update(server, monkeypatch):
+    """
+    Una petición gzip que llega mientras se modifica el producto no deja en
+    caché una variante comprimida del cuerpo anterior bajo el ETag nuevo
+    """
+    server.compressor.min_size = 10
+    url = "http://localhost:8889/product/3"
+    gzip_headers = {"Accept-Encoding": "gzip"}
+    invalidate = product_cache.invalidate
+
+    def invalidate_between_gets(key):
+        requests.get(url, headers=gzip_headers)
+        invalidate(key)
+        requests.get(url, headers=gzip_headers)
+
+    requests.get(url, headers=gzip_headers)
+    monkeypatch.setattr(product_cache, "invalidate", invalidate_between_gets)
+    repository.update(3, {"price": 299.99})
+    monkeypatch.setattr(product_cache, "invalidate", invalidate)
+    try:
+        compressed = requests.get(url, headers=gzip_headers)
+        plain = requests.get(url, headers={"Accept-Encoding": "identity"})
+        assert compressed.headers["Content-Encoding"] == "gzip"
+        assert compressed.json()["price"] == plain.json()["price"] == 299.99
+        assert compressed.headers["ETag"] == "W/" + plain.headers["ETag"]
+    finally:
+        repository.update(3, {"price": 349.99})
+
+def test_get_several_products(server):
+    """
+    GET /products?ids=... devuelve los encontrados y los que faltan en una sola respuesta
+    """
+    response = requests.get("http://localhost:8889/products?ids=3,1,999,3")
+    assert response.status_code == 200
+    data = response.json()
+    assert [product["id"] for product in data["products"]] == [3, 1]
+    assert data["products"][1] == {"id": 1, "name": "Laptop", "price": 999.99}
+    assert data["missing"] == [999]
+
+    response = requests.get("http://localhost:8889/products?ids=1,abc")
+    assert response.status_code == 400
+
+def test_post_products_batch(server):
+    """
+    POST /products/batch con {"ids": [...]} equivale a la consulta con ?ids=
+    """
+    response = requests.post("http://localhost:8889/products/batch", json={"ids": [2, 42]})
+    assert response.status_code == 200
+    assert response.json() == {
+        "products": [{"id": 2, "name": "Smartphone", "price": 699.99}],
+        "missing": [42],
+    }
+
+    response = requests.post("http://localhost:8889/products/batch", json={"ids": "1,2"})
+    assert response.status_code == 400
+    response = requests.post("http://localhost:8889/products/batch", json={"ids": list(range(101))})
+    assert response.status_code == 400
+
+def test_etag_and_not_modified(server):
+    """
+    El producto lleva un ETag; con If-None-Match se responde 304 hasta que el producto cambia
+    """
+    response = requests.get("http://localhost:8889/product/2")
+    etag = response.headers["ETag"]
+    assert etag.startswith('"') and etag.endswith('"')
+
+    response = requests.get("http://localhost:8889/product/2", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+    repository.update(2, {"price": 649.99})
+    try:
+        response = requests.get("http://localhost:8889/product/2", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+    finally:
+        repository.update(2, {"price": 699.99})
+
+def test_large_responses_are_compressed(server):
+    """
+    Las respuestas grandes se comprimen con gzip si el cliente lo acepta, y no si no lo acepta
+    """
+    server.compressor.min_size = 100
+    ids = ",".join(str(i) for i in range(1, 101))
+    url = f"http://localhost:8889/products?ids={ids}"
+    response = requests.get(url, headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert len(response.json()["missing"]) == 97
+
+    response = requests.get(url, headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in response.headers
+    assert int(response.headers["Content-Length"]) == len(response.content)
+
+def test_content_negotiation(server):
+    """
+    El mismo endpoint devuelve JSON o XML según Accept (con valores q) e indica Vary: Accept
+    """
+    response = requests.get("http://localhost:8889/product/1", headers={"Accept": "application/xml"})
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == "application/xml"
+    assert "Accept" in response.headers["Vary"]
+    assert ET.fromstring(response.content).find("name").text == "Laptop"
+    assert (1, "application/xml") in product_cache
+
+    accept = "application/xml;q=0.5, application/json"
+    response = requests.get("http://localhost:8889/product/1", headers={"Accept": accept})
+    assert response.headers["Content-Type"] == "application/json"
+    assert response.json()["name"] == "Laptop"
+
+    response = requests.get("http://localhost:8889/product/1", headers={"Accept": "text/html"})
+    assert response.status_code == 406
+
+def test_etag_depends_on_format(server):
+    """
+    Cada formato tiene su propio ETag, y la respuesta 304 indica el mismo Vary que la completa
+    """
+    full = requests.get("http://localhost:8889/product/1", headers={"Accept": "application/xml"})
+    xml_etag = full.headers["ETag"]
+    json_etag = requests.get("http://localhost:8889/product/1").headers["ETag"]
+    assert xml_etag != json_etag
+
+    response = requests.get("http://localhost:8889/product/1",
+                            headers={"Accept": "application/xml", "If-None-Match": xml_etag})
+    assert response.status_code == 304
+    assert response.headers["Vary"] == full.headers["Vary"] == "Accept, Accept-Encoding"
@@ -16,13 +16,30 @@ Requisitos:
 Ejemplo:
 1. Una solicitud `GET /product/1` debe devolver los datos del producto con ID 1 en formato XML y código 200.
 2. Una solicitud `GET /product/999` debe devolver un mensaje de error con código 404.
+
+Además, `GET /products` devuelve el catálogo completo (`<products>` con un `<product>` por
+producto), enviado por partes con Transfer-Encoding: chunked.
 """
 
-from http.server import HTTPServer, BaseHTTPRequestHandler
-import re
+import os
+import sys
+from http.server import BaseHTTPRequestHandler
 import xml.etree.ElementTree as ET
 from xml.dom import minidom
 
+# El paquete comun está en la raíz del repositorio; así el ejercicio también
+# se puede ejecutar como script (python 2a/ej2a3.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from comun.streaming import ChunkedResponseMixin, batch_chunks
+
+from conditional import ConditionalHandlerMixin, make_etag
+from product_repository import ProductRepository
+from request_metrics import METRICS_PATH, InstrumentedHandlerMixin, RequestMetrics
+from routing import Router, RoutingHandlerMixin
+from server_engines import DrainableHandlerMixin, PreforkLauncher, create_http_server, serve_with_drain
+from xml_writer import iter_collection, to_xml
+
 # Lista de productos predefinida
 products = [
     {"id": 1, "name": "Laptop", "price": 999.99},
@@ -30,6 +47,15 @@ products = [
     {"id": 3, "name": "Tablet", "price": 349.99}
 ]
 
+# Índice por id sobre la lista anterior: las búsquedas no recorren el catálogo
+repository = ProductRepository(products)
+
+# Rutas de la API: se compilan una vez en un árbol de prefijos por segmentos
+api_routes = Router()
+api_routes.add("GET", "/product/<int:product_id>", "get_product")
+api_routes.add("GET", "/products", "get_products")
+api_routes.add("GET", METRICS_PATH, "send_metrics")
+
 def dict_to_xml(tag, d):
     """
     Convierte un diccionario en un elemento XML
@@ -42,88 +68,123 @@ def dict_to_xml(tag, d):
 
 def prettify(elem):
     """
-    Devuelve una cadena XML formateada bonita
+    Devuelve una cadena XML formateada bonita.
+
+    El manejador ya no la usa (serializa, vuelve a analizar y serializa otra
+    vez); xml_writer.to_xml produce el mismo resultado en una sola pasada.
     """
     rough_string = ET.tostring(elem, 'utf-8')
     reparsed = minidom.parseString(rough_string)
     return reparsed.toprettyxml(indent="  ").encode()
 
-class ProductAPIHandler(BaseHTTPRequestHandler):
+class ProductAPIHandler(RoutingHandlerMixin, ConditionalHandlerMixin, ChunkedResponseMixin,
+                        InstrumentedHandlerMixin, DrainableHandlerMixin, BaseHTTPRequestHandler):
     """
     Manejador de peticiones HTTP para la API de productos en XML
     """
 
+    # HTTP/1.1 permite reutilizar la conexión para varias peticiones (keep-alive),
+    # por lo que todas las respuestas deben indicar su Content-Length exacto
+    protocol_version = "HTTP/1.1"
+    # Segundos de inactividad tras los que se cierra una conexión keep-alive
+    timeout = 5
+    # Tabla de rutas compilada al importar el módulo
+    routes = api_routes
+    # Sangría del XML de las respuestas (None = XML compacto, sin saltos de línea)
+    xml_indent = "  "
+
     def do_GET(self):
         """
         Método que se ejecuta cuando se recibe una petición GET.
         Debes implementar la lógica para responder a la petición GET en la ruta /product/<id>
         con los datos del producto en formato XML si existe, o un error 404 si no existe.
         """
-        # 1. Usa una expresión regular para verificar si la ruta coincide con /product/<id>
-        path_regex = r'^/product/(\d+)$'
-        match = re.match(path_regex, self.path)
-        
-        if match:
-            # 2. Si coincide, extrae el ID del producto de la ruta
-            product_id = int(match.group(1))
-            
-            # 3. Busca el producto en la lista
-            product = None
-            for prod in products:
-                if prod['id'] == product_id:
-                    product = prod
-                    break
-            
-            if product:
-                # 4. Si el producto existe:
-                #    a. Convierte el producto a XML usando dict_to_xml y prettify
-                product_element = dict_to_xml('product', product)
-                xml_response = prettify(product_element)
-                
-                #    b. Devuelve el XML con código 200 y Content-Type application/xml
-                self.send_response(200)
-                self.send_header('Content-type', 'application/xml')
-                self.end_headers()
-                self.wfile.write(xml_response)
-            else:
-                # 5. Si el producto no existe, devuelve un mensaje de error XML con código 404
-                error_elem = ET.Element('error')
-                message_elem = ET.SubElement(error_elem, 'message')
-                message_elem.text = f'Product with id {product_id} not found'
-                
-                xml_response = prettify(error_elem)
-                
-                self.send_response(404)
-                self.send_header('Content-type', 'application/xml')
-                self.end_headers()
-                self.wfile.write(xml_response)
-        else:
+        # 1. Busca la ruta en la tabla y ejecuta su método (get_product o send_metrics)
+        if not self.dispatch():
             # Ruta no válida
-            self.send_response(404)
-            self.send_header('Content-type', 'application/xml')
-            self.end_headers()
-            
-            error_elem = ET.Element('error')
-            message_elem = ET.SubElement(error_elem, 'message')
-            message_elem.text = 'Not found'
-            
-            xml_response = prettify(error_elem)
-            self.wfile.write(xml_response)
-
-def create_server(host="localhost", port=8000):
+            self.send_xml(404, 'error', {'message': 'Not found'})
+
+    def get_product(self, product_id):
+        """
+        GET /product/<id>: devuelve el producto en XML, o un error 404 si no existe
+        """
+        # 2. Busca el producto en el índice
+        product = repository.get(product_id)
+
+        if product:
+            # 3. El ETag sale de la versión del producto: si el cliente ya tiene
+            #    esa versión se responde 304 sin generar el XML
+            etag = make_etag(product_id, repository.version(product_id), "xml")
+            if self.not_modified(etag):
+                return
+            # 4. Si no, convierte el producto a XML y lo devuelve con código 200
+            self.send_xml(200, 'product', product, etag)
+        else:
+            # 5. Si el producto no existe, devuelve un mensaje de error XML con código 404
+            self.send_xml(404, 'error', {'message': f'Product with id {product_id} not found'})
+
+    def get_products(self):
+        """
+        GET /products: devuelve el catálogo completo en XML, generado y enviado
+        por partes, de modo que la memoria usada no depende del número de productos
+        """
+        pieces = iter_collection('products', 'product', repository, self.xml_indent)
+        self.send_chunked(200, 'application/xml', batch_chunks(pieces))
+
+    def send_xml(self, status, tag, fields, etag=None):
+        """
+        Envía <tag> con un hijo por campo, con Content-Type application/xml
+        """
+        xml_response = to_xml(tag, fields, self.xml_indent)
+        self.send_response(status)
+        self.send_header('Content-type', 'application/xml')
+        self.send_header('Content-Length', str(len(xml_response)))
+        if etag:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(xml_response)
+
+def create_server(host="localhost", port=8000, workers=None, queue_size=None, backlog=None,
+                  queue_timeout=None, engine="threads", log_sample_rate=0.0):
     """
     Crea y configura el servidor HTTP
+
+    - workers: si se indica, las conexiones se atienden en un pool de ese tamaño
+    - queue_size: conexiones que pueden esperar un hilo libre (por defecto, workers)
+    - backlog: tamaño de la cola de conexiones pendientes del socket
+    - queue_timeout: segundos que se espera hueco en la cola del pool antes de
+      responder 503 (None = esperar sin límite)
+    - engine: "threads" (un hilo por conexión o pool de hilos) o "asyncio" (bucle de eventos)
+    - log_sample_rate: fracción de peticiones que se escriben en el log (0 = ninguna)
     """
     server_address = (host, port)
-    httpd = HTTPServer(server_address, ProductAPIHandler)
+    httpd = create_http_server(
+        server_address,
+        ProductAPIHandler,
+        workers=workers,
+        queue_size=queue_size,
+        backlog=backlog,
+        queue_timeout=queue_timeout,
+        engine=engine,
+    )
+    httpd.metrics = RequestMetrics()
+    httpd.log_sample_rate = log_sample_rate
     return httpd
 
-def run_server(server):
+def run_server(server, processes=None, drain_timeout=10.0):
     """
-    Inicia el servidor HTTP
+    Inicia el servidor HTTP (sirve igual para cualquier motor de create_server)
+
+    - processes: si se indica, reparte el servidor entre ese número de procesos
+      hijos que comparten el socket de escucha y se relanzan si fallan
+    - drain_timeout: al recibir SIGTERM se deja de aceptar conexiones y las
+      peticiones en curso tienen este plazo (en segundos) para terminar
     """
     print(f"Servidor iniciado en http://{server.server_name}:{server.server_port}")
-    server.serve_forever()
+    if processes:
+        PreforkLauncher(server, processes, drain_timeout=drain_timeout).serve_forever()
+    else:
+        serve_with_drain(server, drain_timeout)
 
 if __name__ == '__main__':
     server = create_server()
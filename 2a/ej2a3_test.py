@@ -2,16 +2,18 @@ import pytest
 import threading
 import requests
 import time
+import socket
 import xml.etree.ElementTree as ET
 from ej2a3 import create_server
 
-@pytest.fixture
-def server():
+@pytest.fixture(params=["threads", "asyncio"])
+def server(request):
     """
     Fixture para iniciar y detener el servidor HTTP durante las pruebas
+    (se ejecuta con cada uno de los motores de servidor disponibles)
     """
     # Crear el servidor en un puerto específico para pruebas
-    server = create_server(host="localhost", port=8890)
+    server = create_server(host="localhost", port=8890, engine=request.param)
 
     # Iniciar el servidor en un hilo separado
     thread = threading.Thread(target=server.serve_forever)
@@ -87,3 +89,40 @@ def test_invalid_route(server):
 
     # Verificar que sea un XML de error
     assert "<error>" in response.text, "El XML debe contener un elemento 'error'"
+
+def test_etag_and_not_modified(server):
+    """
+    Con el ETag de una respuesta anterior en If-None-Match se responde 304 sin cuerpo
+    """
+    etag = requests.get("http://localhost:8890/product/1").headers["ETag"]
+    response = requests.get("http://localhost:8890/product/1", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+def test_get_all_products_chunked(server):
+    """
+    GET /products devuelve todos los productos en XML, enviados por partes
+    """
+    response = requests.get("http://localhost:8890/products")
+    assert response.status_code == 200
+    assert response.headers["Transfer-Encoding"] == "chunked"
+    assert "Content-Length" not in response.headers
+    root = ET.fromstring(response.content)
+    assert root.tag == "products"
+    assert [p.find("id").text for p in root.findall("product")] == ["1", "2", "3"]
+
+def test_get_all_products_http10(server):
+    """
+    Un cliente HTTP/1.0 recibe el catálogo sin codificación chunked y la conexión se cierra
+    """
+    with socket.create_connection(("localhost", 8890), timeout=2) as sock:
+        sock.sendall(b"GET /products HTTP/1.0\r\n\r\n")
+        data = b""
+        while True:
+            chunk = sock.recv(4096)
+            if not chunk:
+                break
+            data += chunk
+    head, _, body = data.partition(b"\r\n\r\n")
+    assert b"Transfer-Encoding" not in head
+    assert ET.fromstring(body).tag == "products"
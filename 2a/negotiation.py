@@ -0,0 +1,69 @@
+"""
+Negociación del tipo de contenido a partir de la cabecera Accept.
+
+negotiate elige, entre los tipos que ofrece el servidor, el que el cliente
+prefiere según sus valores q. Para cada tipo ofrecido cuenta el rango más
+específico de Accept que lo incluye (application/json antes que
+application/* y que */*), como indica RFC 9110. Ante la misma q gana el
+orden en que el servidor ofrece los tipos.
+"""
+
+
+def parse_accept(header):
+    """
+    Devuelve una lista de (tipo, subtipo, q) a partir de la cabecera Accept
+    """
+    ranges = []
+    for item in header.split(","):
+        media_range, _, params = item.strip().partition(";")
+        media_type, _, subtype = media_range.strip().lower().partition("/")
+        if not media_type or not subtype:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = min(max(float(value), 0.0), 1.0)
+                except ValueError:
+                    q = 0.0
+        ranges.append((media_type, subtype, q))
+    return ranges
+
+
+def quality(ranges, media_type):
+    """
+    Devuelve la q que el cliente da a media_type (0 si no lo acepta)
+    """
+    main, _, sub = media_type.lower().partition("/")
+    best_specificity = -1
+    best_q = 0.0
+    for range_main, range_sub, q in ranges:
+        if range_main == main and range_sub == sub:
+            specificity = 2
+        elif range_main == main and range_sub == "*":
+            specificity = 1
+        elif range_main == "*" and range_sub == "*":
+            specificity = 0
+        else:
+            continue
+        if specificity > best_specificity:
+            best_specificity, best_q = specificity, q
+    return best_q
+
+
+def negotiate(header, offered):
+    """
+    Devuelve el tipo de offered que prefiere el cliente, o None si no acepta
+    ninguno. Sin cabecera Accept se devuelve el primero.
+    """
+    if not header or not header.strip():
+        return offered[0]
+    ranges = parse_accept(header)
+    best = None
+    best_q = 0.0
+    for media_type in offered:
+        q = quality(ranges, media_type)
+        if q > best_q:
+            best, best_q = media_type, q
+    return best
@@ -0,0 +1,29 @@
+from negotiation import negotiate, parse_accept
+
+OFFERED = ("application/json", "application/xml")
+
+
+def test_parse_accept():
+    assert parse_accept("application/xml;q=0.5, */*") == [
+        ("application", "xml", 0.5),
+        ("*", "*", 1.0),
+    ]
+
+
+def test_negotiate_with_q_values():
+    """
+    Gana el tipo con mayor q; ante la misma q, el orden del servidor
+    """
+    assert negotiate("application/xml", OFFERED) == "application/xml"
+    assert negotiate("application/json;q=0.4, application/xml;q=0.9", OFFERED) == "application/xml"
+    assert negotiate("*/*", OFFERED) == "application/json"
+    assert negotiate(None, OFFERED) == "application/json"
+    assert negotiate("text/html", OFFERED) is None
+
+
+def test_most_specific_range_wins():
+    """
+    Un rango concreto con q=0 excluye el tipo aunque */* lo acepte
+    """
+    assert negotiate("application/json;q=0, */*", OFFERED) == "application/xml"
+    assert negotiate("application/*;q=0.2, application/xml", OFFERED) == "application/xml"
@@ -0,0 +1,130 @@
+"""
+Repositorio de productos con índice por clave primaria.
+
+Las APIs de productos (ej2a2 y ej2a3) buscaban cada producto
+recorriendo la lista completa, lo que cuesta O(n) por petición. El
+repositorio mantiene, junto a la lista, un diccionario id -> producto, de modo
+que get es O(1) sin importar el tamaño del catálogo.
+
+El repositorio envuelve la lista que recibe (no la copia), así que la lista
+del módulo sigue reflejando las altas y modificaciones. Los cambios deben
+hacerse con insert y update para que el índice no quede desincronizado, y
+para que se avise a los observadores registrados con add_listener (por
+ejemplo, una caché de respuestas que debe invalidar ese producto).
+
+Cada producto tiene además un número de versión que aumenta con cada
+modificación; sirve para construir ETags sin calcular el hash del cuerpo.
+Los observadores se avisan dentro del cerrojo de escritura y antes de subir
+la versión: quien lea la versión nueva ya no encuentra en una caché el cuerpo
+anterior guardado bajo ella.
+"""
+
+import threading
+
+
+class ProductRepository:
+    """
+    Catálogo de productos indexado por su campo "id".
+
+    Las lecturas no toman ningún cerrojo; las escrituras se serializan para
+    que la lista y el índice cambien juntos cuando hay varios hilos.
+    """
+
+    def __init__(self, products=None):
+        self._products = products if products is not None else []
+        self._index = {}
+        self._lock = threading.Lock()
+        self._last_id = 0
+        self._listeners = []
+        self._versions = {}
+        for product in self._products:
+            self._add_to_index(product)
+
+    def _add_to_index(self, product):
+        product_id = product["id"]
+        if product_id in self._index:
+            raise ValueError(f"Id de producto duplicado: {product_id}")
+        self._index[product_id] = product
+        self._versions[product_id] = 1
+        if isinstance(product_id, int) and product_id > self._last_id:
+            self._last_id = product_id
+
+    def add_listener(self, callback):
+        """
+        Registra una función que recibe el id de cada producto insertado o modificado
+
+        Se llama con el cerrojo de escritura tomado, así que no debe insertar
+        ni modificar productos.
+        """
+        self._listeners.append(callback)
+
+    def _notify(self, product_id):
+        for callback in self._listeners:
+            callback(product_id)
+
+    def get(self, product_id):
+        """
+        Devuelve el producto con ese id, o None si no existe
+        """
+        return self._index.get(product_id)
+
+    def version(self, product_id):
+        """
+        Devuelve la versión actual del producto (1 al crearse), o None si no existe
+        """
+        return self._versions.get(product_id)
+
+    def get_many(self, product_ids):
+        """
+        Busca varios ids de una vez y devuelve (productos encontrados, ids que
+        no existen), ambos en el orden pedido
+        """
+        found = []
+        missing = []
+        index = self._index
+        for product_id in product_ids:
+            product = index.get(product_id)
+            if product is None:
+                missing.append(product_id)
+            else:
+                found.append(product)
+        return found, missing
+
+    def insert(self, product):
+        """
+        Añade un producto y lo devuelve. Si no trae id se le asigna el siguiente.
+
+        Lanza ValueError si ya existe un producto con el mismo id.
+        """
+        with self._lock:
+            if "id" not in product:
+                product = {"id": self._last_id + 1, **product}
+            self._add_to_index(product)
+            self._products.append(product)
+            self._notify(product["id"])
+        return product
+
+    def update(self, product_id, changes):
+        """
+        Modifica los campos indicados de un producto y lo devuelve, o None si
+        no existe. El id no se puede cambiar.
+        """
+        if "id" in changes and changes["id"] != product_id:
+            raise ValueError("No se puede cambiar el id de un producto")
+        with self._lock:
+            product = self._index.get(product_id)
+            if product is None:
+                return None
+            product.update(changes)
+            self._notify(product_id)
+            self._versions[product_id] += 1
+        return product
+
+    def __contains__(self, product_id):
+        return product_id in self._index
+
+    def __len__(self):
+        return len(self._products)
+
+    def __iter__(self):
+        return iter(self._products)
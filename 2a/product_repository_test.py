@@ -0,0 +1,105 @@
+import pytest
+from product_repository import ProductRepository
+
+
+@pytest.fixture
+def products():
+    return [
+        {"id": 1, "name": "Laptop", "price": 999.99},
+        {"id": 2, "name": "Smartphone", "price": 699.99},
+    ]
+
+
+def test_get_uses_index(products):
+    """
+    get devuelve el mismo objeto de la lista, o None si el id no existe
+    """
+    repository = ProductRepository(products)
+    assert repository.get(2) is products[1]
+    assert repository.get(999) is None
+    assert 1 in repository
+    assert len(repository) == 2
+
+
+def test_insert_keeps_list_and_index_in_sync(products):
+    """
+    Las altas se reflejan en la lista envuelta y en el índice; sin id se asigna el siguiente
+    """
+    repository = ProductRepository(products)
+    tablet = repository.insert({"name": "Tablet", "price": 349.99})
+    assert tablet["id"] == 3
+    assert products[-1] is tablet
+    assert repository.get(3) is tablet
+
+    repository.insert({"id": 10, "name": "Monitor", "price": 199.99})
+    assert repository.insert({"name": "Ratón", "price": 19.99})["id"] == 11
+
+    with pytest.raises(ValueError):
+        repository.insert({"id": 1, "name": "Duplicado", "price": 1})
+    assert len(products) == 5
+
+
+def test_update_modifies_in_place(products):
+    """
+    update cambia los campos del producto indexado y no permite cambiar su id
+    """
+    repository = ProductRepository(products)
+    updated = repository.update(1, {"price": 899.99})
+    assert updated is products[0]
+    assert repository.get(1)["price"] == 899.99
+    assert repository.update(999, {"price": 1}) is None
+
+    with pytest.raises(ValueError):
+        repository.update(1, {"id": 2})
+
+
+def test_duplicate_ids_are_rejected():
+    with pytest.raises(ValueError):
+        ProductRepository([{"id": 1}, {"id": 1}])
+
+
+def test_listeners_receive_changed_ids(products):
+    """
+    Los observadores reciben el id de cada alta y modificación
+    """
+    repository = ProductRepository(products)
+    changed = []
+    repository.add_listener(changed.append)
+    repository.insert({"name": "Tablet", "price": 349.99})
+    repository.update(1, {"price": 899.99})
+    repository.update(999, {"price": 1})
+    assert changed == [3, 1]
+
+
+def test_get_many(products):
+    """
+    get_many devuelve los encontrados y los ids que faltan, en el orden pedido
+    """
+    repository = ProductRepository(products)
+    found, missing = repository.get_many([2, 7, 1])
+    assert found == [products[1], products[0]]
+    assert missing == [7]
+
+
+def test_versions_increase_on_update(products):
+    repository = ProductRepository(products)
+    assert repository.version(1) == 1
+    repository.update(1, {"price": 1})
+    assert repository.version(1) == 2
+    assert repository.version(999) is None
+
+
+def test_listeners_run_before_the_new_version_is_visible(products):
+    """
+    Al avisar a los observadores el producto ya está modificado pero la
+    versión aún es la anterior: una caché invalidada en ese momento no puede
+    servir el cuerpo antiguo con la versión nueva
+    """
+    repository = ProductRepository(products)
+    seen = []
+    repository.add_listener(
+        lambda product_id: seen.append((repository.get(product_id)["price"], repository.version(product_id)))
+    )
+    repository.update(1, {"price": 1})
+    assert seen == [(1, 1)]
+    assert repository.version(1) == 2
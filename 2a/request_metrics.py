@@ -0,0 +1,247 @@
+"""
+Instrumentación de peticiones para los manejadores basados en http.server.
+
+InstrumentedHandlerMixin mide, para cada petición, tres fases:
+
+- parse: lectura y análisis de la cabecera (parse_request).
+- handler: ejecución del método do_* sin contar las escrituras.
+- write: tiempo dentro de wfile.write (envío de cabeceras y cuerpo).
+
+Las duraciones se acumulan en histogramas de cubetas fijas por ruta y código
+de estado (RequestMetrics), que el servidor expone en texto plano con el
+formato de Prometheus en /metrics. Las rutas se agrupan con patrones
+(metrics_routes) para que /product/1 y /product/2 cuenten como la misma.
+
+Además sustituye la línea de log que BaseHTTPRequestHandler escribe en stderr
+por cada petición por un log muestreado: con log_sample_rate=0 (por defecto)
+no se escribe nada, con 1 se escriben todas. Los errores se siguen mostrando.
+
+Con PreforkLauncher cada proceso hijo tiene sus propias métricas.
+"""
+
+import random
+import threading
+from bisect import bisect_left
+from time import perf_counter
+
+# Límites superiores (en segundos) de las cubetas de los histogramas
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+)
+
+# Fases medidas en cada petición, en el orden en que se exponen
+PHASES = ("parse", "handler", "write")
+
+# Ruta que devuelve las métricas
+METRICS_PATH = "/metrics"
+
+# Etiqueta de las peticiones que no coinciden con ninguna ruta conocida
+OTHER_ROUTE = "other"
+
+
+class Histogram:
+    """
+    Histograma de cubetas fijas: cuenta observaciones por cubeta y su suma.
+
+    No es seguro entre hilos por sí mismo; RequestMetrics lo protege.
+    """
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        # La última posición es la cubeta +Inf
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """
+        Devuelve pares (límite, observaciones acumuladas), terminando en +Inf
+        """
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class RequestMetrics:
+    """
+    Registro de histogramas por (ruta, código de estado) y fase, seguro entre hilos
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, route, status, parse, handler, write):
+        """
+        Registra las duraciones (en segundos) de las fases de una petición
+        """
+        key = (route, status)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = tuple(Histogram(self.buckets) for _ in PHASES)
+            series[0].observe(parse)
+            series[1].observe(handler)
+            series[2].observe(write)
+
+    def snapshot(self):
+        """
+        Devuelve una copia {(ruta, estado): {fase: (acumulados, suma, total)}}
+        """
+        with self._lock:
+            return {
+                key: {
+                    phase: (histogram.cumulative(), histogram.sum, histogram.count)
+                    for phase, histogram in zip(PHASES, series)
+                }
+                for key, series in self._series.items()
+            }
+
+    def render(self):
+        """
+        Devuelve las métricas en el formato de texto de Prometheus
+        """
+        lines = [
+            "# HELP http_request_duration_seconds Duración de cada fase de la petición.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (route, status), phases in sorted(self.snapshot().items()):
+            for phase, (cumulative, total_sum, count) in phases.items():
+                labels = f'route="{_escape(route)}",status="{status}",phase="{phase}"'
+                for bound, total in cumulative:
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{le}"}} {total}')
+                lines.append(f"http_request_duration_seconds_sum{{{labels}}} {total_sum!r}")
+                lines.append(f"http_request_duration_seconds_count{{{labels}}} {count}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _TimedWriter:
+    """
+    Envoltorio de wfile que acumula en el manejador el tiempo pasado escribiendo
+    """
+
+    __slots__ = ("raw", "handler")
+
+    def __init__(self, raw, handler):
+        self.raw = raw
+        self.handler = handler
+
+    def write(self, data):
+        start = perf_counter()
+        try:
+            return self.raw.write(data)
+        finally:
+            self.handler._write_time += perf_counter() - start
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+
+class InstrumentedHandlerMixin:
+    """
+    Mixin para manejadores BaseHTTPRequestHandler que registra la duración de
+    cada petición en server.metrics (un RequestMetrics) y muestrea el log.
+
+    Si el servidor no tiene atributo metrics, solo se aplica el muestreo del log.
+
+    - metrics_routes: pares (patrón compilado, etiqueta); la primera ruta que
+      coincide da la etiqueta, y las demás peticiones cuentan como "other".
+      Si el manejador despacha con RoutingHandlerMixin, la etiqueta es el
+      patrón de la ruta (route_pattern) y no hace falta indicarlas.
+    - log_sample_rate: fracción de peticiones que se escriben en el log. El
+      servidor puede sobrescribirla con su propio atributo log_sample_rate.
+    """
+
+    metrics_routes = ()
+    log_sample_rate = 0.0
+
+    _parse_start = None
+    _handler_start = None
+    _write_time = 0.0
+    _status = None
+    route_pattern = None
+
+    def handle_one_request(self):
+        self._status = None
+        self.route_pattern = None
+        try:
+            super().handle_one_request()
+        finally:
+            if self._handler_start is not None:
+                self._record_request(perf_counter())
+
+    def parse_request(self):
+        self._parse_start = perf_counter()
+        self._write_time = 0.0
+        if not isinstance(self.wfile, _TimedWriter):
+            self.wfile = _TimedWriter(self.wfile, self)
+        result = super().parse_request()
+        self._handler_start = perf_counter()
+        return result
+
+    def _record_request(self, end):
+        handler_start = self._handler_start
+        self._handler_start = None
+        metrics = getattr(self.server, "metrics", None)
+        if metrics is None or self._status is None:
+            return
+        write = self._write_time
+        metrics.observe(
+            self.metrics_route(),
+            self._status,
+            handler_start - self._parse_start,
+            max(0.0, end - handler_start - write),
+            write,
+        )
+
+    def metrics_route(self):
+        """
+        Devuelve la etiqueta de ruta de la petición actual
+        """
+        if self.route_pattern is not None:
+            return self.route_pattern
+        path = getattr(self, "path", "").partition("?")[0]
+        if path == METRICS_PATH:
+            return METRICS_PATH
+        for pattern, label in self.metrics_routes:
+            if pattern.match(path):
+                return label
+        return OTHER_ROUTE
+
+    def send_metrics(self):
+        """
+        Responde con las métricas del servidor en texto plano
+        """
+        metrics = getattr(self.server, "metrics", None)
+        body = (metrics.render() if metrics is not None else "").encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_request(self, code="-", size="-"):
+        try:
+            self._status = int(code)
+        except (TypeError, ValueError):
+            pass
+        rate = getattr(self.server, "log_sample_rate", self.log_sample_rate)
+        if rate and (rate >= 1 or random.random() < rate):
+            super().log_request(code, size)
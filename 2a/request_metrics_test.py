@@ -0,0 +1,112 @@
+import pytest
+import re
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from request_metrics import Histogram, InstrumentedHandlerMixin, RequestMetrics
+from server_engines import create_http_server
+
+
+class MeteredHandler(InstrumentedHandlerMixin, BaseHTTPRequestHandler):
+    """
+    Manejador instrumentado mínimo para probar las métricas
+    """
+
+    protocol_version = "HTTP/1.1"
+    timeout = 1
+    metrics_routes = ((re.compile(r"/item/\d+$"), "/item/<id>"),)
+
+    def do_GET(self):
+        if self.path == "/metrics":
+            self.send_metrics()
+            return
+        status = 200 if self.path.startswith("/item/") else 404
+        body = self.path.encode()
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def fetch(port, path):
+    with socket.create_connection(("localhost", port), timeout=2) as sock:
+        sock.sendall(f"GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n".encode())
+        chunks = []
+        while True:
+            data = sock.recv(65536)
+            if not data:
+                break
+            chunks.append(data)
+    return b"".join(chunks)
+
+
+@pytest.fixture(params=["threads", "asyncio"])
+def server(request):
+    server = create_http_server(("localhost", 8896), MeteredHandler, engine=request.param)
+    server.metrics = RequestMetrics()
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    time.sleep(0.2)
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join(1)
+
+
+def test_histogram_uses_fixed_buckets():
+    """
+    Cada observación cae en la primera cubeta cuyo límite no supera, y +Inf recoge el resto
+    """
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.cumulative() == [(0.1, 2), (1.0, 3), (float("inf"), 4)]
+    assert histogram.count == 4
+    assert histogram.sum == pytest.approx(3.65)
+
+
+def test_render_prometheus_text():
+    """
+    Las métricas se exponen por ruta, estado y fase con el formato de Prometheus
+    """
+    metrics = RequestMetrics(buckets=(0.001, 0.01))
+    metrics.observe("/item/<id>", 200, 0.0005, 0.002, 0.02)
+    text = metrics.render()
+    labels = 'route="/item/<id>",status="200"'
+    assert "# TYPE http_request_duration_seconds histogram" in text
+    assert f'http_request_duration_seconds_bucket{{{labels},phase="parse",le="0.001"}} 1' in text
+    assert f'http_request_duration_seconds_bucket{{{labels},phase="handler",le="0.001"}} 0' in text
+    assert f'http_request_duration_seconds_bucket{{{labels},phase="write",le="+Inf"}} 1' in text
+    assert f'http_request_duration_seconds_count{{{labels},phase="handler"}} 1' in text
+
+
+def test_requests_are_recorded_by_route_and_status(server):
+    """
+    Las peticiones se agrupan por patrón de ruta y código de estado
+    """
+    for path in ("/item/1", "/item/2", "/desconocida"):
+        fetch(8896, path)
+
+    snapshot = server.metrics.snapshot()
+    assert snapshot[("/item/<id>", 200)]["handler"][2] == 2
+    assert snapshot[("other", 404)]["write"][2] == 1
+    assert set(snapshot[("/item/<id>", 200)]) == {"parse", "handler", "write"}
+
+    response = fetch(8896, "/metrics")
+    assert response.startswith(b"HTTP/1.1 200")
+    assert b'route="/item/<id>",status="200",phase="parse"' in response
+
+
+def test_log_is_sampled(server, capsys):
+    """
+    Por defecto no se escribe una línea por petición; con log_sample_rate=1 se escriben todas
+    """
+    fetch(8896, "/item/1")
+    assert "GET /item/1" not in capsys.readouterr().err
+
+    server.log_sample_rate = 1
+    fetch(8896, "/item/1")
+    assert "GET /item/1" in capsys.readouterr().err
@@ -0,0 +1,150 @@
+"""
+Tabla de rutas precompilada para los manejadores basados en http.server.
+
+En lugar de probar una expresión regular tras otra en cada petición, las rutas
+se registran una vez (al importar el módulo) en un árbol de prefijos por
+segmentos. Cada nodo tiene sus hijos estáticos en un diccionario y, como mucho,
+un hijo de parámetro con tipo, así que encontrar una ruta cuesta tanto como
+segmentos tiene la URL, sin importar cuántas rutas haya.
+
+Los patrones usan la sintaxis de Flask: "/product/<int:product_id>". Los
+tipos disponibles son los de CONVERTERS; sin tipo, el parámetro es un texto.
+La cadena de consulta (?a=1) no interviene en la búsqueda.
+"""
+
+from collections import namedtuple
+
+
+def _to_int(segment):
+    # Igual que \d+: solo dígitos, sin signo
+    if segment.isascii() and segment.isdigit():
+        return int(segment)
+    return None
+
+
+def _to_str(segment):
+    return segment or None
+
+
+# Conversores de parámetros: devuelven el valor o None si el segmento no encaja
+CONVERTERS = {
+    "int": _to_int,
+    "str": _to_str,
+}
+
+# Resultado de una búsqueda: el destino registrado, los parámetros convertidos
+# y el patrón de la ruta (útil como etiqueta de métricas)
+RouteMatch = namedtuple("RouteMatch", ["endpoint", "params", "pattern"])
+
+
+class _Node:
+    __slots__ = ("static", "param", "endpoints")
+
+    def __init__(self):
+        self.static = {}
+        # (nombre, conversor, tipo, nodo) del hijo de parámetro, si lo hay
+        self.param = None
+        # método HTTP -> (destino, patrón)
+        self.endpoints = {}
+
+
+def split_path(path):
+    """
+    Devuelve los segmentos de la ruta, sin cadena de consulta ni fragmento
+    """
+    path = path.partition("?")[0].partition("#")[0]
+    return path.split("/")[1:]
+
+
+class Router:
+    """
+    Tabla de rutas por método y segmentos de la ruta
+    """
+
+    def __init__(self):
+        self._root = _Node()
+
+    def add(self, method, pattern, endpoint):
+        """
+        Registra endpoint para las peticiones method a pattern.
+
+        Lanza ValueError si el patrón no es válido o choca con otra ruta.
+        """
+        if not pattern.startswith("/"):
+            raise ValueError(f"La ruta debe empezar por '/': {pattern!r}")
+        node = self._root
+        for segment in split_path(pattern):
+            if segment.startswith("<") and segment.endswith(">"):
+                kind, _, name = segment[1:-1].rpartition(":")
+                kind = kind or "str"
+                if kind not in CONVERTERS or not name.isidentifier():
+                    raise ValueError(f"Parámetro no válido {segment!r} en {pattern!r}")
+                if node.param is None:
+                    node.param = (name, CONVERTERS[kind], kind, _Node())
+                elif (node.param[0], node.param[2]) != (name, kind):
+                    existing = f"<{node.param[2]}:{node.param[0]}>"
+                    raise ValueError(f"{pattern!r} choca con el parámetro {existing} de otra ruta")
+                node = node.param[3]
+            else:
+                node = node.static.setdefault(segment, _Node())
+        method = method.upper()
+        if method in node.endpoints:
+            raise ValueError(f"Ruta duplicada: {method} {pattern}")
+        node.endpoints[method] = (endpoint, pattern)
+
+    def match(self, method, path):
+        """
+        Devuelve un RouteMatch para la petición, o None si ninguna ruta encaja
+        """
+        params = {}
+        target = self._match(self._root, method.upper(), split_path(path), 0, params)
+        if target is None:
+            return None
+        return RouteMatch(target[0], params, target[1])
+
+    def _match(self, node, method, segments, position, params):
+        if position == len(segments):
+            return node.endpoints.get(method)
+        segment = segments[position]
+        child = node.static.get(segment)
+        if child is not None:
+            found = self._match(child, method, segments, position + 1, params)
+            if found is not None:
+                return found
+        if node.param is not None:
+            name, convert, _, child = node.param
+            value = convert(segment)
+            if value is not None:
+                found = self._match(child, method, segments, position + 1, params)
+                if found is not None:
+                    params[name] = value
+                    return found
+        return None
+
+
+class RoutingHandlerMixin:
+    """
+    Mixin para manejadores BaseHTTPRequestHandler que despacha las peticiones
+    con la tabla de rutas de la clase (routes).
+
+    Los destinos son nombres de métodos del manejador, que reciben los
+    parámetros de la ruta como argumentos con nombre. Tras despachar, el
+    patrón de la ruta queda en route_pattern.
+    """
+
+    routes = Router()
+    route_pattern = None
+
+    def dispatch(self):
+        """
+        Ejecuta el método asociado a la ruta de la petición.
+
+        Devuelve False si ninguna ruta encaja, para que el manejador responda 404.
+        """
+        route = self.routes.match(self.command, self.path)
+        if route is None:
+            self.route_pattern = None
+            return False
+        self.route_pattern = route.pattern
+        getattr(self, route.endpoint)(**route.params)
+        return True
@@ -0,0 +1,60 @@
+import pytest
+from routing import Router
+
+
+@pytest.fixture
+def router():
+    router = Router()
+    router.add("GET", "/product/<int:product_id>", "get_product")
+    router.add("GET", "/product/new", "new_form")
+    router.add("POST", "/product/<int:product_id>/reviews", "add_review")
+    router.add("GET", "/user/<name>", "get_user")
+    router.add("GET", "/", "index")
+    return router
+
+
+def test_typed_parameters(router):
+    """
+    Los parámetros <int:...> se convierten y solo aceptan dígitos
+    """
+    route = router.match("GET", "/product/42")
+    assert route.endpoint == "get_product"
+    assert route.params == {"product_id": 42}
+    assert route.pattern == "/product/<int:product_id>"
+    assert router.match("GET", "/product/abc") is None
+    assert router.match("GET", "/product/-1") is None
+    assert router.match("GET", "/user/ana").params == {"name": "ana"}
+
+
+def test_static_segments_win_over_parameters(router):
+    """
+    Un segmento estático tiene prioridad, y si no encaja se prueba el parámetro
+    """
+    assert router.match("GET", "/product/new").endpoint == "new_form"
+    assert router.match("POST", "/product/7/reviews").params == {"product_id": 7}
+
+
+def test_query_string_and_trailing_segments(router):
+    """
+    La cadena de consulta no interviene; los segmentos de más no encajan
+    """
+    assert router.match("GET", "/product/1?verbose=1").params == {"product_id": 1}
+    assert router.match("GET", "/product/1/extra") is None
+    assert router.match("GET", "/product/1/") is None
+    assert router.match("GET", "/").endpoint == "index"
+
+
+def test_method_is_part_of_the_route(router):
+    assert router.match("POST", "/product/1") is None
+    assert router.match("get", "/product/1").endpoint == "get_product"
+
+
+def test_invalid_and_conflicting_routes(router):
+    with pytest.raises(ValueError):
+        router.add("GET", "product", "sin_barra")
+    with pytest.raises(ValueError):
+        router.add("GET", "/item/<float:precio>", "tipo_desconocido")
+    with pytest.raises(ValueError):
+        router.add("GET", "/product/<int:id>/x", "otro_nombre")
+    with pytest.raises(ValueError):
+        router.add("GET", "/product/<int:product_id>", "duplicada")
@@ -0,0 +1,897 @@
+"""
+Motores de servidor para los manejadores basados en http.server.
+
+Los ejercicios del apartado 2a crean sus servidores con create_http_server,
+que elige entre varias implementaciones intercambiables con la misma interfaz
+(serve_forever, shutdown, server_close, server_port...):
+
+- ThreadingHTTPServer: un hilo por conexión (el servidor por defecto, como el
+  de `python -m http.server`), necesario para que las conexiones keep-alive
+  de HTTP/1.1 no bloqueen a los demás clientes.
+- ThreadPoolHTTPServer: atiende las conexiones en un pool acotado de hilos,
+  con una cola de espera limitada que aplica contrapresión cuando se llena.
+- EventLoopHTTPServer: un único hilo con un bucle de eventos asyncio (epoll en
+  Linux) que ejecuta el do_GET de los manejadores sin un hilo por conexión.
+
+Además, PreforkLauncher reparte cualquiera de ellos entre varios procesos que
+comparten el socket de escucha, para no quedar limitados a un núcleo por el GIL.
+
+Todos admiten un drenaje ordenado (drain): dejar de aceptar conexiones, cerrar
+las inactivas y dar un plazo a las peticiones en curso antes de parar.
+serve_with_drain lo activa al recibir SIGTERM.
+"""
+
+import asyncio
+import gc
+import io
+import os
+import selectors
+import signal
+import socket
+import sys
+import threading
+import time
+import traceback
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from http.server import HTTPServer, ThreadingHTTPServer
+
+# Motores disponibles para create_http_server
+ENGINES = ("threads", "asyncio")
+
+# Tamaño máximo de la cabecera de una petición en el motor asyncio
+MAX_HEADER_SIZE = 65536
+
+# Tamaño máximo del cuerpo de una petición en el motor asyncio, que lo guarda
+# entero en memoria antes de pasarlo al manejador
+MAX_BODY_SIZE = 1024 * 1024
+
+# Cada cuánto (en segundos) comprueba el bucle de aceptación del pool, mientras
+# espera hueco en la cola, si se ha pedido parar el servidor
+SLOT_POLL_INTERVAL = 0.1
+
+# Cada cuánto (en segundos) comprueba PreforkLauncher si ha terminado alguno
+# de sus hijos
+SUPERVISE_POLL_INTERVAL = 0.1
+
+# Respuesta mínima que se envía cuando la cola del pool está llena
+SERVICE_UNAVAILABLE = (
+    b"HTTP/1.0 503 Service Unavailable\r\n"
+    b"Content-Type: text/plain\r\n"
+    b"Content-Length: 19\r\n"
+    b"Retry-After: 1\r\n"
+    b"Connection: close\r\n"
+    b"\r\n"
+    b"Service Unavailable"
+)
+
+# Resultado de un drenaje: peticiones completadas dentro del plazo, peticiones
+# abortadas al agotarse (en curso o aún en la cola del pool) y conexiones
+# keep-alive inactivas que se cerraron
+DrainReport = namedtuple("DrainReport", ["completed", "aborted", "idle_closed"])
+
+
+def _error_response(status, reason):
+    """
+    Respuesta mínima de error que cierra la conexión
+    """
+    body = reason.encode()
+    return (
+        f"HTTP/1.0 {status} {reason}\r\n"
+        f"Content-Type: text/plain\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: close\r\n"
+        f"\r\n"
+    ).encode() + body
+
+
+# Respuestas del motor asyncio a las peticiones cuyo cuerpo no puede delimitar
+BAD_CONTENT_LENGTH = _error_response(400, "Bad Request")
+BODY_TOO_LARGE = _error_response(413, "Payload Too Large")
+TRANSFER_ENCODING_NOT_IMPLEMENTED = _error_response(501, "Not Implemented")
+
+
+class RequestTracker:
+    """
+    Contador de peticiones en curso y completadas, seguro entre hilos
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self.in_flight = 0
+        self.completed = 0
+
+    def begin(self):
+        with self._condition:
+            self.in_flight += 1
+
+    def end(self):
+        with self._condition:
+            self.in_flight -= 1
+            self.completed += 1
+            self._condition.notify_all()
+
+    def wait(self, timeout):
+        """
+        Espera hasta timeout segundos a que termine alguna petición
+        """
+        with self._condition:
+            self._condition.wait(timeout)
+
+
+class DrainableHandlerMixin:
+    """
+    Mixin para manejadores BaseHTTPRequestHandler que permite al servidor
+    saber qué peticiones están en curso durante un drenaje.
+
+    Una petición empieza cuando se ha leído su línea inicial (no durante la
+    espera de una conexión keep-alive inactiva) y termina al enviar la
+    respuesta. Mientras el servidor drena, las respuestas llevan
+    "Connection: close" y la conexión se cierra tras ellas.
+    """
+
+    _request_tracker = None
+
+    def handle_one_request(self):
+        try:
+            super().handle_one_request()
+        finally:
+            if self._request_tracker is not None:
+                self._request_tracker.end()
+                self._request_tracker = None
+
+    def parse_request(self):
+        tracker = getattr(self.server, "request_tracker", None)
+        if tracker is not None and self._request_tracker is None:
+            tracker.begin()
+            self._request_tracker = tracker
+        result = super().parse_request()
+        if getattr(self.server, "draining", False):
+            self.close_connection = True
+        return result
+
+    def end_headers(self):
+        if getattr(self.server, "draining", False) and self.request_version != "HTTP/0.9":
+            self.send_header("Connection", "close")
+        super().end_headers()
+
+
+def _shutdown_socket(sock, how):
+    try:
+        sock.shutdown(how)
+    except OSError:
+        pass
+
+
+def _with_pending_data(socks):
+    """
+    Devuelve el conjunto de sockets que tienen datos por leer (una petición
+    ya enviada por el cliente), sin bloquearse
+    """
+    with selectors.DefaultSelector() as selector:
+        for sock in socks:
+            try:
+                selector.register(sock, selectors.EVENT_READ)
+            except (ValueError, OSError):
+                # Cerrado mientras tanto
+                pass
+        return {key.fileobj for key, _ in selector.select(0)}
+
+
+class DrainMixIn:
+    """
+    Mixin para servidores de socketserver que registra las conexiones abiertas
+    y añade el método drain.
+
+    Las conexiones aceptadas que aún esperan un hilo libre (en
+    ThreadPoolHTTPServer) se guardan además en _queued.
+    """
+
+    draining = False
+
+    def __init__(self, *args, **kwargs):
+        self.request_tracker = RequestTracker()
+        self._connections = set()
+        self._queued = set()
+        self._connections_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+
+    def verify_request(self, request, client_address):
+        with self._connections_lock:
+            self._connections.add(request)
+        return super().verify_request(request, client_address)
+
+    def shutdown_request(self, request):
+        with self._connections_lock:
+            self._connections.discard(request)
+        super().shutdown_request(request)
+
+    def drain(self, timeout=10.0):
+        """
+        Deja de aceptar conexiones, cierra las inactivas y espera hasta timeout
+        segundos a que terminen las peticiones en curso.
+
+        Debe llamarse desde un hilo distinto al de serve_forever, que termina
+        al empezar el drenaje. Devuelve un DrainReport.
+        """
+        tracker = self.request_tracker
+        completed_before = tracker.completed
+        self.draining = True
+        self.shutdown()
+        self.socket.close()
+
+        with self._connections_lock:
+            connections = list(self._connections)
+        # Las conexiones con una petición ya enviada (también las que esperan
+        # en la cola del pool) se atienden. En las demás, cerrar la lectura
+        # despierta a los hilos que esperan una nueva petición en una conexión
+        # inactiva; las que están respondiendo pueden terminar
+        pending = _with_pending_data(connections)
+        idle = [sock for sock in connections if sock not in pending]
+        idle_closed = max(0, len(idle) - tracker.in_flight)
+        for sock in idle:
+            _shutdown_socket(sock, socket.SHUT_RD)
+
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._connections_lock:
+                remaining = list(self._connections)
+            left = deadline - time.monotonic()
+            if (not remaining and tracker.in_flight == 0) or left <= 0:
+                break
+            tracker.wait(min(0.05, left))
+
+        # Abortadas: las que se estaban atendiendo y las que seguían en la cola
+        with self._connections_lock:
+            aborted = tracker.in_flight + len(self._queued.intersection(pending))
+        for sock in remaining:
+            _shutdown_socket(sock, socket.SHUT_RDWR)
+        return DrainReport(tracker.completed - completed_before, aborted, idle_closed)
+
+
+class DrainableThreadingHTTPServer(DrainMixIn, ThreadingHTTPServer):
+    """
+    ThreadingHTTPServer (un hilo por conexión) con soporte de drenaje
+    """
+
+
+class ThreadPoolHTTPServer(DrainMixIn, HTTPServer):
+    """
+    Servidor HTTP que ejecuta los manejadores en un pool acotado de hilos.
+
+    - workers: número máximo de conexiones atendidas a la vez.
+    - queue_size: conexiones aceptadas que pueden esperar un hilo libre.
+    - backlog: tamaño de la cola de conexiones pendientes del socket (listen).
+    - queue_timeout: segundos que se espera a que haya hueco en la cola.
+      Con None el bucle de aceptación se bloquea y la contrapresión llega al
+      backlog del sistema operativo; con un número, al agotarse el tiempo se
+      responde 503 y se cierra la conexión. En ambos casos la espera termina
+      (también con un 503) si se llama a shutdown o drain.
+    """
+
+    _stopping = False
+
+    def __init__(self, server_address, RequestHandlerClass, workers=8,
+                 queue_size=None, backlog=128, queue_timeout=None,
+                 bind_and_activate=True):
+        if workers < 1:
+            raise ValueError("workers debe ser al menos 1")
+        if queue_size is None:
+            queue_size = workers
+        self.workers = workers
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.request_queue_size = backlog
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="http-worker"
+        )
+        super().__init__(server_address, RequestHandlerClass, bind_and_activate)
+
+    def process_request(self, request, client_address):
+        """
+        Encola la conexión en el pool, esperando hueco si la cola está llena
+        """
+        if not self._acquire_slot():
+            self.reject_request(request, client_address)
+            return
+        with self._connections_lock:
+            self._queued.add(request)
+        try:
+            self._executor.submit(self.process_request_thread, request, client_address)
+        except RuntimeError:
+            # El pool ya se ha cerrado (server_close durante la aceptación)
+            with self._connections_lock:
+                self._queued.discard(request)
+            self._slots.release()
+            self.shutdown_request(request)
+
+    def _acquire_slot(self):
+        """
+        Espera hueco en la cola hasta queue_timeout, en tramos cortos para no
+        bloquear a shutdown con el pool lleno. Devuelve False si no lo hay
+        """
+        deadline = None if self.queue_timeout is None else time.monotonic() + self.queue_timeout
+        while not self._stopping:
+            wait = SLOT_POLL_INTERVAL
+            if deadline is not None:
+                wait = min(wait, max(0.0, deadline - time.monotonic()))
+            if self._slots.acquire(timeout=wait):
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+        return False
+
+    def serve_forever(self, poll_interval=0.5):
+        try:
+            super().serve_forever(poll_interval)
+        finally:
+            self._stopping = False
+
+    def shutdown(self):
+        self._stopping = True
+        super().shutdown()
+
+    def process_request_thread(self, request, client_address):
+        """
+        Atiende una conexión dentro de un hilo del pool
+        """
+        with self._connections_lock:
+            self._queued.discard(request)
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+
+    def reject_request(self, request, client_address):
+        """
+        Responde 503 a una conexión que no cabe en la cola y la cierra
+        """
+        try:
+            request.sendall(SERVICE_UNAVAILABLE)
+        except OSError:
+            pass
+        self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._executor.shutdown(wait=True)
+
+
+class _HTTPConnection(asyncio.Protocol):
+    """
+    Conexión del motor asyncio: acumula bytes hasta tener peticiones completas
+    y las pasa al servidor en orden, de modo que admite peticiones encadenadas
+    (pipelining) sobre la misma conexión.
+    """
+
+    __slots__ = ("server", "transport", "peername", "buffer", "idle_timer")
+
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+        self.peername = None
+        self.buffer = bytearray()
+        self.idle_timer = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.peername = transport.get_extra_info("peername")
+        self.server._connections.add(self)
+        self.reset_idle_timer()
+
+    def connection_lost(self, exc):
+        self.server._connections.discard(self)
+        self.cancel_idle_timer()
+        self.transport = None
+
+    def data_received(self, data):
+        self.buffer += data
+        while self.transport is not None:
+            request = self.next_request()
+            if request is None:
+                break
+            response, close = self.server.handle_buffered_request(request, self.peername)
+            if response:
+                self.transport.write(response)
+            if close or self.server.draining:
+                self.transport.close()
+                return
+        self.reset_idle_timer()
+
+    def next_request(self):
+        """
+        Extrae del búfer una petición completa (cabecera y cuerpo) o None.
+
+        El cuerpo se delimita solo con Content-Length: si no es un entero no
+        negativo se responde 400, si supera server.max_body_size 413, y las
+        peticiones con Transfer-Encoding (chunked) se rechazan con 501. En
+        todos esos casos se cierra la conexión.
+        """
+        end = self.buffer.find(b"\r\n\r\n")
+        if end < 0:
+            if len(self.buffer) > MAX_HEADER_SIZE:
+                self.transport.close()
+            return None
+        end += 4
+        length = self.body_length(bytes(self.buffer[:end]))
+        if length is None:
+            return None
+        if len(self.buffer) < end + length:
+            return None
+        request = bytes(self.buffer[:end + length])
+        del self.buffer[:end + length]
+        return request
+
+    def body_length(self, head):
+        """
+        Devuelve la longitud del cuerpo según la cabecera, o None si la
+        petición se ha rechazado
+        """
+        lengths = set()
+        for line in head.split(b"\r\n")[1:]:
+            name, _, value = line.partition(b":")
+            name = name.strip().lower()
+            if name == b"transfer-encoding":
+                return self.reject(TRANSFER_ENCODING_NOT_IMPLEMENTED)
+            if name == b"content-length":
+                lengths.add(value.strip())
+        if not lengths:
+            return 0
+        value = lengths.pop()
+        # int() aceptaría también signos, espacios y guiones bajos
+        if lengths or not value.isdigit():
+            return self.reject(BAD_CONTENT_LENGTH)
+        length = int(value)
+        if length > self.server.max_body_size:
+            return self.reject(BODY_TOO_LARGE)
+        return length
+
+    def reject(self, response):
+        self.transport.write(response)
+        self.transport.close()
+        return None
+
+    def reset_idle_timer(self):
+        self.cancel_idle_timer()
+        timeout = self.server.idle_timeout
+        if timeout and self.transport is not None:
+            self.idle_timer = self.server._loop.call_later(timeout, self.transport.close)
+
+    def cancel_idle_timer(self):
+        if self.idle_timer is not None:
+            self.idle_timer.cancel()
+            self.idle_timer = None
+
+
+class EventLoopHTTPServer:
+    """
+    Servidor HTTP basado en un bucle de eventos asyncio.
+
+    Ejecuta los mismos manejadores BaseHTTPRequestHandler que HTTPServer, pero
+    sin un hilo por conexión: cada petición completa se pasa al manejador
+    mediante búferes en memoria y la respuesta se escribe en el transporte.
+    Una conexión inactiva solo ocupa un objeto _HTTPConnection, lo que permite
+    mantener decenas de miles de sockets keep-alive abiertos (ajustando el
+    límite de descriptores del proceso con ulimit -n).
+
+    Los manejadores se ejecutan en el hilo del bucle, así que deben ser
+    rápidos y no bloquearse. Expone la misma interfaz que socketserver:
+    serve_forever, shutdown, server_close, server_name y server_port.
+    """
+
+    address_family = socket.AF_INET
+    request_queue_size = 1024
+    max_body_size = MAX_BODY_SIZE
+    draining = False
+
+    def __init__(self, server_address, RequestHandlerClass, backlog=None,
+                 idle_timeout=None, bind_and_activate=True):
+        self.server_address = server_address
+        self.RequestHandlerClass = RequestHandlerClass
+        # Por defecto se cierran las conexiones inactivas tras el mismo timeout
+        # que usaría el manejador con un servidor de hilos
+        if idle_timeout is None:
+            idle_timeout = getattr(RequestHandlerClass, "timeout", None)
+        self.idle_timeout = idle_timeout
+        if backlog:
+            self.request_queue_size = backlog
+        self.socket = socket.socket(self.address_family, socket.SOCK_STREAM)
+        self._loop = None
+        self._aserver = None
+        self._connections = set()
+        self.completed_requests = 0
+        self._shutdown_request = False
+        self._is_shut_down = threading.Event()
+        self._is_shut_down.set()
+        if bind_and_activate:
+            try:
+                self.server_bind()
+                self.server_activate()
+            except BaseException:
+                self.server_close()
+                raise
+
+    def server_bind(self):
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.socket.bind(self.server_address)
+        self.server_address = self.socket.getsockname()
+        host, port = self.server_address[:2]
+        self.server_name = socket.getfqdn(host)
+        self.server_port = port
+
+    def server_activate(self):
+        self.socket.listen(self.request_queue_size)
+        self.socket.setblocking(False)
+
+    def serve_forever(self, poll_interval=0.5):
+        """
+        Atiende peticiones hasta que se llame a shutdown() desde otro hilo
+        """
+        self._is_shut_down.clear()
+        loop = asyncio.new_event_loop()
+        self._loop = loop
+        try:
+            # asyncio cierra el socket que recibe, así que se le pasa un duplicado
+            server = self._aserver = loop.run_until_complete(loop.create_server(
+                lambda: _HTTPConnection(self),
+                sock=self.socket.dup(),
+                backlog=self.request_queue_size,
+            ))
+
+            def check_shutdown():
+                if self._shutdown_request:
+                    loop.stop()
+                else:
+                    loop.call_later(poll_interval, check_shutdown)
+
+            check_shutdown()
+            loop.run_forever()
+            server.close()
+            for connection in list(self._connections):
+                if connection.transport is not None:
+                    connection.transport.close()
+            loop.run_until_complete(server.wait_closed())
+        finally:
+            self._loop = None
+            self._aserver = None
+            loop.close()
+            self._shutdown_request = False
+            self._is_shut_down.set()
+
+    def shutdown(self):
+        """
+        Detiene serve_forever y espera a que termine
+        """
+        self._shutdown_request = True
+        loop = self._loop
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(loop.stop)
+            except RuntimeError:
+                pass
+        self._is_shut_down.wait()
+
+    def server_close(self):
+        self.socket.close()
+
+    def drain(self, timeout=10.0):
+        """
+        Deja de aceptar conexiones, cierra las inactivas y espera hasta timeout
+        segundos a que lleguen completas las peticiones a medio recibir.
+
+        Se llama desde otro hilo; al terminar detiene serve_forever.
+        Devuelve un DrainReport.
+        """
+        loop = self._loop
+        if loop is None:
+            return DrainReport(0, 0, 0)
+        try:
+            future = asyncio.run_coroutine_threadsafe(self._drain(timeout), loop)
+        except RuntimeError:
+            return DrainReport(0, 0, 0)
+        report = future.result()
+        self.shutdown()
+        return report
+
+    async def _drain(self, timeout):
+        loop = asyncio.get_running_loop()
+        completed_before = self.completed_requests
+        self.draining = True
+        if self._aserver is not None:
+            self._aserver.close()
+        self.socket.close()
+
+        # Las peticiones se atienden completas dentro del bucle, así que una
+        # conexión sin datos pendientes está inactiva y se puede cerrar ya
+        idle_closed = 0
+        for connection in list(self._connections):
+            if not connection.buffer:
+                connection.transport.close()
+                idle_closed += 1
+
+        deadline = loop.time() + timeout
+        while self._connections and loop.time() < deadline:
+            await asyncio.sleep(0.01)
+
+        aborted = len(self._connections)
+        for connection in list(self._connections):
+            connection.transport.abort()
+        return DrainReport(self.completed_requests - completed_before, aborted, idle_closed)
+
+    def fileno(self):
+        return self.socket.fileno()
+
+    def handle_buffered_request(self, request, client_address):
+        """
+        Ejecuta el manejador sobre una petición completa en memoria.
+
+        Devuelve los bytes de la respuesta y si hay que cerrar la conexión.
+        """
+        handler = self.RequestHandlerClass.__new__(self.RequestHandlerClass)
+        handler.request = None
+        handler.client_address = client_address
+        handler.server = self
+        handler.rfile = io.BytesIO(request)
+        handler.wfile = io.BytesIO()
+        handler.close_connection = True
+        try:
+            handler.handle_one_request()
+        except Exception:
+            self.handle_error(request, client_address)
+            return handler.wfile.getvalue(), True
+        self.completed_requests += 1
+        return handler.wfile.getvalue(), handler.close_connection
+
+    def handle_error(self, request, client_address):
+        print('-' * 40, file=sys.stderr)
+        print('Exception occurred during processing of request from',
+              client_address, file=sys.stderr)
+        traceback.print_exc()
+        print('-' * 40, file=sys.stderr)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.server_close()
+
+
+def create_http_server(server_address, RequestHandlerClass, workers=None,
+                       queue_size=None, backlog=None, queue_timeout=None,
+                       engine="threads"):
+    """
+    Crea el servidor adecuado según el motor y las opciones de concurrencia.
+
+    - engine="threads": sin workers se devuelve un ThreadingHTTPServer (un
+      hilo por conexión); con workers, un ThreadPoolHTTPServer acotado.
+    - engine="asyncio": un EventLoopHTTPServer de un solo hilo.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Motor desconocido: {engine!r}. Opciones: {', '.join(ENGINES)}")
+
+    if engine == "asyncio":
+        return EventLoopHTTPServer(server_address, RequestHandlerClass, backlog=backlog)
+
+    if workers:
+        return ThreadPoolHTTPServer(
+            server_address,
+            RequestHandlerClass,
+            workers=workers,
+            queue_size=queue_size,
+            backlog=backlog or 128,
+            queue_timeout=queue_timeout,
+        )
+
+    httpd = DrainableThreadingHTTPServer(server_address, RequestHandlerClass, bind_and_activate=False)
+    if backlog:
+        httpd.request_queue_size = backlog
+    try:
+        httpd.server_bind()
+        httpd.server_activate()
+    except BaseException:
+        httpd.server_close()
+        raise
+    return httpd
+
+
+def serve_with_drain(server, drain_timeout=10.0, signals=(signal.SIGTERM,)):
+    """
+    Ejecuta serve_forever y, al recibir una de las señales, drena el servidor.
+
+    El drenaje se hace en otro hilo (shutdown no puede llamarse desde el de
+    serve_forever). Devuelve el DrainReport, o None si el servidor se detuvo
+    sin drenar.
+    """
+    reports = []
+    drainers = []
+
+    def start_drain(signum, frame):
+        if not drainers:
+            drainer = threading.Thread(
+                target=lambda: reports.append(server.drain(drain_timeout)), daemon=True
+            )
+            drainers.append(drainer)
+            drainer.start()
+
+    previous = {}
+    if threading.current_thread() is threading.main_thread():
+        for signum in signals:
+            previous[signum] = signal.signal(signum, start_drain)
+    try:
+        server.serve_forever()
+    finally:
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+
+    for drainer in drainers:
+        drainer.join()
+    if not reports:
+        return None
+    report = reports[0]
+    print(
+        f"Servidor drenado: {report.completed} peticiones completadas, "
+        f"{report.aborted} abortadas, {report.idle_closed} conexiones inactivas cerradas",
+        file=sys.stderr,
+    )
+    return report
+
+
+class PreforkLauncher:
+    """
+    Lanza varios procesos hijos que atienden el mismo servidor y los supervisa.
+
+    El servidor se crea (y enlaza su socket) en el proceso padre; cada hijo
+    hereda el socket de escucha al hacer fork y ejecuta serve_forever sobre él,
+    de modo que el núcleo reparte las conexiones entre los procesos sin
+    necesidad de SO_REUSEPORT. Si un hijo termina de forma inesperada se lanza
+    otro en su lugar.
+
+    - processes: número de procesos hijos.
+    - warmup: función opcional que recibe el servidor y se ejecuta en el padre
+      antes de crear los hijos (cargar datos, precalcular cachés...).
+    - freeze_gc: tras el calentamiento llama a gc.freeze(), para que el
+      recolector de los hijos no toque los objetos heredados y las páginas de
+      memoria sigan compartidas (copy-on-write) entre procesos.
+    - restart_delay: espera antes de relanzar un hijo que ha durado menos de
+      un segundo, para no entrar en un bucle de fallos.
+    - drain_timeout: plazo que tiene cada hijo para drenar al recibir SIGTERM.
+    """
+
+    def __init__(self, server, processes, warmup=None, freeze_gc=True, restart_delay=1.0,
+                 drain_timeout=10.0):
+        if processes < 1:
+            raise ValueError("processes debe ser al menos 1")
+        self.server = server
+        self.processes = processes
+        self.warmup = warmup
+        self.freeze_gc = freeze_gc
+        self.restart_delay = restart_delay
+        self.drain_timeout = drain_timeout
+        self.workers = {}
+        self.restarts = 0
+        self._stopping = False
+
+    def start(self):
+        """
+        Ejecuta el calentamiento y crea los procesos hijos
+        """
+        if self.warmup is not None:
+            self.warmup(self.server)
+        if self.freeze_gc:
+            gc.collect()
+            gc.freeze()
+        for _ in range(self.processes):
+            self._spawn()
+
+    def _spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            self._run_worker()
+        self.workers[pid] = time.monotonic()
+
+    def _run_worker(self):
+        """
+        Cuerpo del proceso hijo: atiende peticiones y nunca vuelve al llamador
+        """
+        code = 0
+        try:
+            # Ctrl+C llega a todo el grupo de procesos; el padre se encarga de parar
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            serve_with_drain(self.server, self.drain_timeout)
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            os._exit(code)
+
+    def supervise_once(self, block=True):
+        """
+        Espera a que termine un hijo y lo relanza si no se está parando.
+
+        Solo se esperan los pids de self.workers: otros hijos del proceso (de
+        subprocess, por ejemplo) no son del lanzador y no se recogen. Con
+        block la espera termina también al empezar a parar.
+
+        Devuelve el pid del hijo que ha terminado, o None si no había ninguno.
+        """
+        pid = self._reap_worker()
+        while pid is None and block and self.workers and not self._stopping:
+            time.sleep(SUPERVISE_POLL_INTERVAL)
+            pid = self._reap_worker()
+        if pid is None:
+            return None
+        started_at = self.workers.pop(pid)
+        if not self._stopping:
+            if time.monotonic() - started_at < 1.0:
+                time.sleep(self.restart_delay)
+            self.restarts += 1
+            self._spawn()
+        return pid
+
+    def _reap_worker(self):
+        """
+        Recoge, sin bloquearse, un hijo del lanzador que haya terminado y
+        devuelve su pid, o None
+        """
+        for pid in list(self.workers):
+            try:
+                done, _ = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                # Ya lo ha recogido otro: ha terminado igualmente
+                return pid
+            if done:
+                return pid
+        return None
+
+    def serve_forever(self):
+        """
+        Crea los hijos y los supervisa hasta recibir SIGTERM o SIGINT
+        """
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                signal.signal(signum, self._handle_stop_signal)
+        self.start()
+        try:
+            while not self._stopping and self.workers:
+                self.supervise_once()
+        finally:
+            self.stop()
+
+    def _handle_stop_signal(self, signum, frame):
+        # Se avisa ya a los hijos; el bucle de supervisión deja de esperar en
+        # su siguiente comprobación y stop espera a que terminen
+        self._stopping = True
+        self._signal_workers(signal.SIGTERM)
+
+    def _signal_workers(self, signum):
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    def stop(self, timeout=None):
+        """
+        Pide a los hijos que terminen (SIGTERM), lo que inicia su drenaje, y
+        fuerza el cierre si no han terminado en timeout segundos (por defecto,
+        el plazo de drenaje más un margen)
+        """
+        if timeout is None:
+            timeout = self.drain_timeout + 2.0
+        self._stopping = True
+        self._signal_workers(signal.SIGTERM)
+        deadline = time.monotonic() + timeout
+        while self.workers and time.monotonic() < deadline:
+            if self.supervise_once(block=False) is None:
+                time.sleep(0.05)
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+            self.workers.pop(pid, None)
@@ -0,0 +1,503 @@
+import gc
+import os
+import pytest
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from server_engines import (
+    DrainableHandlerMixin,
+    EventLoopHTTPServer,
+    PreforkLauncher,
+    ThreadPoolHTTPServer,
+    create_http_server,
+)
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+    """
+    Manejador mínimo para probar los motores de servidor
+    """
+
+    def do_GET(self):
+        body = self.path.encode()
+        self.send_response(200)
+        self.send_header('Content-type', 'text/plain')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class KeepAliveEchoHandler(EchoHandler):
+    """
+    Variante HTTP/1.1 que mantiene la conexión abierta entre peticiones
+    """
+
+    protocol_version = "HTTP/1.1"
+    timeout = 0.3
+
+
+class SlowHandler(DrainableHandlerMixin, KeepAliveEchoHandler):
+    """
+    Manejador HTTP/1.1 que tarda en responder las rutas que empiezan por /lento
+    """
+
+    timeout = 5
+    delay = 0.5
+
+    def do_GET(self):
+        if self.path.startswith("/lento"):
+            time.sleep(self.delay)
+        super().do_GET()
+
+
+def start(server):
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return thread
+
+
+def stop(server, thread):
+    server.shutdown()
+    server.server_close()
+    thread.join(1)
+
+
+def fetch(port, path="/"):
+    """
+    Hace una petición HTTP/1.0 con un socket y devuelve la respuesta completa
+    """
+    with socket.create_connection(("localhost", port), timeout=2) as sock:
+        sock.sendall(f"GET {path} HTTP/1.0\r\nHost: localhost\r\n\r\n".encode())
+        chunks = []
+        while True:
+            data = sock.recv(4096)
+            if not data:
+                break
+            chunks.append(data)
+    return b"".join(chunks)
+
+
+def test_create_http_server_without_workers_uses_threading_server():
+    """
+    Sin workers se usa un hilo por conexión, con el backlog indicado
+    """
+    server = create_http_server(("localhost", 8892), EchoHandler, backlog=64)
+    try:
+        assert isinstance(server, ThreadingHTTPServer)
+        assert not isinstance(server, ThreadPoolHTTPServer)
+        assert server.request_queue_size == 64
+    finally:
+        server.server_close()
+
+
+def test_thread_pool_serves_requests():
+    """
+    El pool de hilos atiende peticiones normales
+    """
+    server = create_http_server(("localhost", 8892), EchoHandler, workers=2, backlog=32)
+    assert isinstance(server, ThreadPoolHTTPServer)
+    assert server.request_queue_size == 32
+    thread = start(server)
+    try:
+        response = fetch(8892, "/hola")
+        assert response.startswith(b"HTTP/1.0 200")
+        assert response.endswith(b"/hola")
+    finally:
+        stop(server, thread)
+
+
+def test_full_queue_applies_backpressure():
+    """
+    Con el pool y la cola llenos, las conexiones nuevas reciben un 503
+    """
+    server = ThreadPoolHTTPServer(
+        ("localhost", 8892), EchoHandler, workers=1, queue_size=0, queue_timeout=0.2
+    )
+    thread = start(server)
+    busy = socket.create_connection(("localhost", 8892))
+    try:
+        # La conexión ocupada retiene el único hilo del pool
+        time.sleep(0.2)
+        response = fetch(8892)
+        assert response.startswith(b"HTTP/1.0 503")
+    finally:
+        busy.close()
+        stop(server, thread)
+
+
+def test_invalid_worker_count():
+    with pytest.raises(ValueError):
+        ThreadPoolHTTPServer(("localhost", 8892), EchoHandler, workers=0, bind_and_activate=False)
+
+
+def test_event_loop_server_serves_requests():
+    """
+    El motor asyncio ejecuta el do_GET del manejador
+    """
+    server = create_http_server(("localhost", 8892), EchoHandler, engine="asyncio")
+    assert isinstance(server, EventLoopHTTPServer)
+    thread = start(server)
+    try:
+        response = fetch(8892, "/hola")
+        assert response.startswith(b"HTTP/1.0 200")
+        assert response.endswith(b"/hola")
+    finally:
+        stop(server, thread)
+
+
+def test_event_loop_server_holds_many_idle_connections():
+    """
+    Muchas conexiones abiertas sin actividad no impiden atender otras peticiones
+    """
+    server = create_http_server(("localhost", 8892), EchoHandler, engine="asyncio", backlog=512)
+    thread = start(server)
+    idle = []
+    try:
+        for _ in range(200):
+            idle.append(socket.create_connection(("localhost", 8892)))
+        response = fetch(8892, "/ocupado")
+        assert response.endswith(b"/ocupado")
+        assert len(server._connections) >= 200
+    finally:
+        for sock in idle:
+            sock.close()
+        stop(server, thread)
+
+
+def test_event_loop_server_handles_pipelined_requests():
+    """
+    Varias peticiones enviadas de una vez se responden en orden
+    """
+    server = create_http_server(("localhost", 8892), KeepAliveEchoHandler, engine="asyncio")
+    thread = start(server)
+    try:
+        with socket.create_connection(("localhost", 8892), timeout=2) as sock:
+            sock.sendall(
+                b"GET /uno HTTP/1.1\r\nHost: localhost\r\n\r\n"
+                b"GET /dos HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n"
+            )
+            data = b""
+            while True:
+                chunk = sock.recv(4096)
+                if not chunk:
+                    break
+                data += chunk
+        assert data.count(b"HTTP/1.1 200") == 2
+        assert data.index(b"/uno") < data.index(b"/dos")
+        assert data.endswith(b"/dos")
+    finally:
+        stop(server, thread)
+
+
+@pytest.mark.parametrize("headers, status", [
+    (b"Content-Length: -5\r\n", b"400"),
+    (b"Content-Length: abc\r\n", b"400"),
+    (b"Content-Length: 3\r\nContent-Length: 4\r\n", b"400"),
+    (b"Content-Length: 20000000\r\n", b"413"),
+    (b"Transfer-Encoding: chunked\r\n", b"501"),
+])
+def test_event_loop_server_rejects_undelimited_bodies(headers, status):
+    """
+    El motor asyncio rechaza y cierra las peticiones cuyo cuerpo no puede
+    delimitar o no cabe en memoria, sin esperar a recibirlo
+    """
+    server = create_http_server(("localhost", 8893), EchoHandler, engine="asyncio")
+    thread = start(server)
+    try:
+        with socket.create_connection(("localhost", 8893), timeout=2) as sock:
+            sock.sendall(b"POST /datos HTTP/1.1\r\nHost: localhost\r\n" + headers + b"\r\nabc")
+            data = b""
+            while True:
+                chunk = sock.recv(4096)
+                if not chunk:
+                    break
+                data += chunk
+        assert data.startswith(b"HTTP/1.0 " + status)
+    finally:
+        stop(server, thread)
+
+
+@pytest.mark.parametrize("engine", ["threads", "asyncio"])
+def test_idle_keep_alive_connections_are_reaped(engine):
+    """
+    Una conexión keep-alive sin actividad se cierra tras el timeout del manejador
+    """
+    server = create_http_server(("localhost", 8892), KeepAliveEchoHandler, engine=engine)
+    thread = start(server)
+    try:
+        with socket.create_connection(("localhost", 8892), timeout=2) as sock:
+            sock.sendall(b"GET /uno HTTP/1.1\r\nHost: localhost\r\n\r\n")
+            data = b""
+            while not data.endswith(b"/uno"):
+                data += sock.recv(4096)
+            started = time.monotonic()
+            # El servidor cierra la conexión: recv devuelve b"" antes del timeout del cliente
+            assert sock.recv(4096) == b""
+            assert time.monotonic() - started < 1.5
+    finally:
+        stop(server, thread)
+
+
+def read_response(sock):
+    """
+    Lee una respuesta HTTP/1.1 completa (con Content-Length) de un socket
+    """
+    data = b""
+    while b"\r\n\r\n" not in data:
+        chunk = sock.recv(4096)
+        if not chunk:
+            return data
+        data += chunk
+    head, _, body = data.partition(b"\r\n\r\n")
+    length = int(next(
+        line for line in head.split(b"\r\n") if line.lower().startswith(b"content-length:")
+    ).split(b":")[1])
+    while len(body) < length:
+        body += sock.recv(4096)
+    return head + b"\r\n\r\n" + body
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_drain_lets_in_flight_requests_finish(workers):
+    """
+    Al drenar se cierran las conexiones inactivas y las peticiones en curso terminan
+    """
+    server = create_http_server(("localhost", 8895), SlowHandler, workers=workers)
+    thread = start(server)
+    try:
+        idle = socket.create_connection(("localhost", 8895), timeout=3)
+        idle.sendall(b"GET /rapido HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        assert read_response(idle).endswith(b"/rapido")
+
+        busy = socket.create_connection(("localhost", 8895), timeout=3)
+        busy.sendall(b"GET /lento HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        time.sleep(0.1)
+
+        report = server.drain(timeout=3)
+        assert report.completed == 1
+        assert report.aborted == 0
+        assert report.idle_closed == 1
+
+        response = read_response(busy)
+        assert response.endswith(b"/lento")
+        assert b"Connection: close" in response
+        assert busy.recv(4096) == b""
+        assert idle.recv(4096) == b""
+        with pytest.raises(OSError):
+            socket.create_connection(("localhost", 8895), timeout=1)
+        idle.close()
+        busy.close()
+    finally:
+        server.server_close()
+        thread.join(1)
+
+
+def test_drain_aborts_requests_after_deadline():
+    """
+    Las peticiones que no terminan dentro del plazo se cuentan como abortadas
+    """
+    class VerySlowHandler(SlowHandler):
+        delay = 1.5
+
+    server = create_http_server(("localhost", 8895), VerySlowHandler)
+    thread = start(server)
+    try:
+        busy = socket.create_connection(("localhost", 8895), timeout=3)
+        busy.sendall(b"GET /lento HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        time.sleep(0.1)
+        report = server.drain(timeout=0.2)
+        assert report.completed == 0
+        assert report.aborted == 1
+        busy.close()
+    finally:
+        server.server_close()
+        thread.join(1)
+
+
+def test_drain_serves_requests_queued_in_the_pool():
+    """
+    Una conexión que espera en la cola del pool con su petición ya enviada se
+    atiende durante el drenaje; la que no ha enviado nada se cierra como inactiva
+    """
+    server = ThreadPoolHTTPServer(("localhost", 8895), SlowHandler, workers=1, queue_size=2)
+    thread = start(server)
+    try:
+        busy = socket.create_connection(("localhost", 8895), timeout=3)
+        busy.sendall(b"GET /lento HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        time.sleep(0.1)
+        queued = socket.create_connection(("localhost", 8895), timeout=3)
+        queued.sendall(b"GET /en-cola HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        silent = socket.create_connection(("localhost", 8895), timeout=3)
+        time.sleep(0.1)
+
+        report = server.drain(timeout=3)
+        assert report == (2, 0, 1)
+        assert read_response(busy).endswith(b"/lento")
+        response = read_response(queued)
+        assert response.endswith(b"/en-cola")
+        assert b"Connection: close" in response
+        assert silent.recv(4096) == b""
+        for sock in (busy, queued, silent):
+            sock.close()
+    finally:
+        server.server_close()
+        thread.join(1)
+
+
+def test_drain_with_full_pool_and_no_queue_timeout():
+    """
+    Con el pool y la cola llenos y sin queue_timeout, el bucle de aceptación
+    está bloqueado esperando hueco; drain no debe quedarse esperándolo
+    """
+    release = threading.Event()
+
+    class BlockedHandler(DrainableHandlerMixin, EchoHandler):
+        def do_GET(self):
+            release.wait(5)
+            super().do_GET()
+
+    server = ThreadPoolHTTPServer(("localhost", 8895), BlockedHandler, workers=1, queue_size=1)
+    thread = start(server)
+    clients = []
+    try:
+        # Una conexión ocupa el hilo, otra la cola y la tercera bloquea la aceptación
+        for _ in range(3):
+            client = socket.create_connection(("localhost", 8895), timeout=3)
+            client.sendall(b"GET / HTTP/1.0\r\n\r\n")
+            clients.append(client)
+        time.sleep(0.2)
+        started = time.monotonic()
+        report = server.drain(timeout=0.3)
+        assert time.monotonic() - started < 1.5
+        # La petición en curso y la que esperaba en la cola con su petición enviada
+        assert report.aborted == 2
+        thread.join(1)
+        assert not thread.is_alive()
+    finally:
+        release.set()
+        for client in clients:
+            client.close()
+        server.server_close()
+
+
+def test_event_loop_drain():
+    """
+    El motor asyncio cierra las conexiones inactivas y espera a las peticiones a medio recibir
+    """
+    server = create_http_server(("localhost", 8895), SlowHandler, engine="asyncio")
+    thread = start(server)
+    try:
+        idle = socket.create_connection(("localhost", 8895), timeout=3)
+        partial = socket.create_connection(("localhost", 8895), timeout=3)
+        partial.sendall(b"GET /parcial HTTP/1.1\r\n")
+        time.sleep(0.1)
+
+        # La petición a medio enviar se completa mientras el servidor drena
+        reports = []
+        drainer = threading.Thread(target=lambda: reports.append(server.drain(timeout=3)))
+        drainer.start()
+        time.sleep(0.2)
+        partial.sendall(b"Host: localhost\r\n\r\n")
+        drainer.join(5)
+
+        assert reports == [(1, 0, 1)]
+        assert read_response(partial).endswith(b"/parcial")
+        assert idle.recv(4096) == b""
+        idle.close()
+        partial.close()
+    finally:
+        server.server_close()
+        thread.join(1)
+
+
+def test_event_loop_drain_aborts_incomplete_requests():
+    server = create_http_server(("localhost", 8895), SlowHandler, engine="asyncio")
+    thread = start(server)
+    try:
+        partial = socket.create_connection(("localhost", 8895), timeout=3)
+        partial.sendall(b"GET /parcial HTTP/1.1\r\n")
+        time.sleep(0.1)
+        report = server.drain(timeout=0.2)
+        assert report == (0, 1, 0)
+        partial.close()
+    finally:
+        server.server_close()
+        thread.join(1)
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        create_http_server(("localhost", 8892), EchoHandler, engine="gevent")
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="Requiere os.fork")
+def test_prefork_launcher_restarts_crashed_workers():
+    """
+    Los procesos hijos comparten el socket y se relanzan si terminan
+    """
+    server = create_http_server(("localhost", 8893), EchoHandler)
+    warmed_up = []
+    launcher = PreforkLauncher(server, processes=2, warmup=warmed_up.append, restart_delay=0)
+    launcher.start()
+    try:
+        assert warmed_up == [server]
+        assert len(launcher.workers) == 2
+        assert fetch(8893, "/uno").endswith(b"/uno")
+
+        victim = next(iter(launcher.workers))
+        os.kill(victim, signal.SIGKILL)
+        assert launcher.supervise_once() == victim
+        assert victim not in launcher.workers
+        assert len(launcher.workers) == 2
+        assert launcher.restarts == 1
+        assert fetch(8893, "/dos").endswith(b"/dos")
+
+        # Un hijo que no es del lanzador no se recoge
+        other = subprocess.Popen([sys.executable, "-c", "pass"])
+        time.sleep(0.5)
+        assert launcher.supervise_once(block=False) is None
+        assert os.waitpid(other.pid, 0)[0] == other.pid
+    finally:
+        launcher.stop()
+        gc.unfreeze()
+        server.server_close()
+    assert launcher.workers == {}
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="Requiere os.fork")
+def test_prefork_launcher_stops_on_sigterm(tmp_path):
+    """
+    serve_forever termina (junto con sus hijos) al recibir SIGTERM
+    """
+    script = tmp_path / "launcher.py"
+    script.write_text(
+        "import sys\n"
+        f"sys.path.insert(0, {os.path.dirname(os.path.abspath(__file__))!r})\n"
+        "from server_engines import PreforkLauncher, create_http_server\n"
+        "from server_engines_test import EchoHandler\n"
+        "server = create_http_server(('localhost', 8894), EchoHandler)\n"
+        "PreforkLauncher(server, processes=2).serve_forever()\n"
+    )
+    process = subprocess.Popen([sys.executable, str(script)])
+    response = b""
+    try:
+        for _ in range(50):
+            try:
+                response = fetch(8894, "/vivo")
+                break
+            except OSError:
+                time.sleep(0.1)
+        assert response.endswith(b"/vivo")
+        process.send_signal(signal.SIGTERM)
+        assert process.wait(timeout=10) == 0
+    finally:
+        if process.poll() is None:
+            process.kill()
@@ -0,0 +1,86 @@
+"""
+Serializador XML directo para respuestas sencillas (un elemento con campos).
+
+prettify en ej2a3 serializaba con ET.tostring, volvía a analizar el resultado
+con minidom y lo serializaba otra vez con toprettyxml: tres pasadas y un DOM
+por respuesta. Aquí el texto se escribe en una sola pasada, con el mismo
+resultado que prettify en el modo con sangría (indent="  ") y sin espacios
+en el modo compacto (indent=None).
+
+element_chunks devuelve las piezas de texto de un elemento, e
+iter_collection las de un documento con muchos elementos, generadas una a
+una: quien escribe colecciones grandes puede enviarlas poco a poco sin
+construir el documento completo en memoria.
+"""
+
+import re
+
+# Declaración XML, igual que la que escribe minidom
+XML_DECLARATION = '<?xml version="1.0" ?>'
+
+# Caracteres que XML 1.0 no permite ni siquiera escapados
+_INVALID_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f￾￿]")
+
+
+def escape_text(text):
+    """
+    Escapa el texto de un elemento (&, <, > y comillas, como minidom).
+
+    El retorno de carro se escribe como &#13;: sin escapar, el lector lo
+    normalizaría (\r\n pasaría a \n) y el texto no llegaría intacto.
+
+    Lanza ValueError si contiene caracteres que XML 1.0 no admite.
+    """
+    if _INVALID_CHARS.search(text):
+        raise ValueError(f"Carácter no permitido en XML: {text!r}")
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    if '"' in text:
+        text = text.replace('"', "&quot;")
+    if "\r" in text:
+        text = text.replace("\r", "&#13;")
+    return text
+
+
+def element_chunks(tag, fields, indent="  ", level=0):
+    """
+    Devuelve las piezas de texto de <tag> con un hijo por cada campo de fields
+    """
+    if indent is None:
+        prefix = child_prefix = newline = ""
+    else:
+        prefix = indent * level
+        child_prefix = indent * (level + 1)
+        newline = "\n"
+    chunks = [f"{prefix}<{tag}>{newline}"]
+    for key, value in fields.items():
+        text = escape_text(str(value))
+        if text:
+            chunks.append(f"{child_prefix}<{key}>{text}</{key}>{newline}")
+        else:
+            chunks.append(f"{child_prefix}<{key}/>{newline}")
+    chunks.append(f"{prefix}</{tag}>{newline}")
+    return chunks
+
+
+def to_xml(tag, fields, indent="  "):
+    """
+    Devuelve el documento XML (en bytes UTF-8) de un elemento con sus campos
+    """
+    newline = "" if indent is None else "\n"
+    return (XML_DECLARATION + newline + "".join(element_chunks(tag, fields, indent))).encode()
+
+
+def iter_collection(tag, item_tag, items, indent="  "):
+    """
+    Genera, pieza a pieza, el documento <tag> con un <item_tag> por elemento de items
+    """
+    newline = "" if indent is None else "\n"
+    yield f"{XML_DECLARATION}{newline}<{tag}>{newline}"
+    for item in items:
+        yield from element_chunks(item_tag, item, indent, level=1)
+    yield f"</{tag}>{newline}"
@@ -0,0 +1,56 @@
+import tracemalloc
+
+import pytest
+import xml.etree.ElementTree as ET
+
+from comun.streaming import batch_chunks
+from ej2a3 import dict_to_xml, prettify
+from xml_writer import escape_text, iter_collection, to_xml
+
+
+@pytest.mark.parametrize("fields", [
+    {"id": 1, "name": "Laptop", "price": 999.99},
+    {"id": 2, "name": 'Caña & "Niños" <ñ>', "price": ""},
+])
+def test_indented_output_matches_prettify(fields):
+    """
+    Con sangría, el resultado es idéntico al de dict_to_xml + prettify
+    """
+    assert to_xml("product", fields) == prettify(dict_to_xml("product", fields))
+
+
+def test_compact_output():
+    xml = to_xml("error", {"message": "a < b"}, indent=None)
+    assert xml == b'<?xml version="1.0" ?><error><message>a &lt; b</message></error>'
+    assert ET.fromstring(xml).find("message").text == "a < b"
+
+
+def test_carriage_return_survives_parsing():
+    """
+    El \r se escapa como &#13;, así que el lector no lo normaliza
+    """
+    assert escape_text("a\r\nb") == "a&#13;\nb"
+    xml = to_xml("product", {"name": "a\r\nb"})
+    assert ET.fromstring(xml).find("name").text == "a\r\nb"
+
+
+def test_invalid_characters_are_rejected():
+    with pytest.raises(ValueError):
+        escape_text("fin\x00")
+
+
+def test_streamed_collection_memory_is_flat():
+    """
+    Generar un catálogo muy grande por partes no acumula el documento en memoria
+    """
+    items = ({"id": i, "name": f"Producto {i}", "price": 1.5} for i in range(200000))
+    tracemalloc.start()
+    try:
+        total = 0
+        for chunk in batch_chunks(iter_collection("products", "product", items)):
+            total += len(chunk)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert total > 10 * 1024 * 1024
+    assert peak < 1024 * 1024
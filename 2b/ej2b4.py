@@ -11,7 +11,18 @@ Además, debes crear una plantilla HTML utilizando Jinja2 que reciba una variabl
 Nota: Asegúrate de incluir una estructura HTML válida en la plantilla.
 """
 
-from flask import Flask, render_template_string
+import os
+import sys
+
+from flask import Flask, Response, current_app, render_template, request, stream_template
+from jinja2 import ChoiceLoader, DictLoader, FileSystemBytecodeCache
+
+# El paquete comun está en la raíz del repositorio; así el ejercicio también
+# se puede ejecutar como script (python 2b/ej2b4.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from comun.response_cache import ResponseCache
+from comun.streaming import batch_chunks
 
 # Implementa la plantilla HTML aquí
 TEMPLATE = """
@@ -27,20 +38,94 @@ TEMPLATE = """
 </html>
 """
 
+# Página con un saludo por cada nombre, que puede ser muy larga
+GREET_LIST_TEMPLATE = """
+<!doctype html>
+<html>
+<head>
+    <title>Greeting Page</title>
+</head>
+<body>
+    <ul>
+    {% for nombre in nombres %}
+        <li>¡hola, {{ nombre }}!</li>
+    {% endfor %}
+    </ul>
+</body>
+</html>
+"""
+
+# Plantillas de la aplicación, registradas por nombre
+TEMPLATES = {"greet.html": TEMPLATE, "greet_list.html": GREET_LIST_TEMPLATE}
 
-def create_app():
+# Presupuesto de memoria (en bytes, contando claves y entradas) de los fragmentos renderizados guardados
+FRAGMENT_CACHE_BYTES = 4 * 1024 * 1024
+
+
+def render_page(name, cached=False, **context):
     """
-    Crea y configura la aplicación Flask
+    Renderiza la plantilla registrada name.
+
+    Con cached el resultado se guarda en la caché LRU de fragmentos de la
+    aplicación, con la plantilla y los argumentos como clave (que deben ser
+    hashables): las peticiones repetidas no vuelven a renderizar.
+
+    Con STREAM_TEMPLATES activado devuelve una respuesta que se envía por
+    partes según Jinja2 la genera: el cliente recibe los primeros bytes
+    antes de que termine el renderizado y la página nunca está entera en
+    memoria. STREAM_CHUNK_SIZE es el tamaño aproximado de cada parte.
+    """
+    if current_app.config["STREAM_TEMPLATES"]:
+        pieces = stream_template(name, **context)
+        return Response(batch_chunks(pieces, current_app.config["STREAM_CHUNK_SIZE"]), mimetype="text/html")
+    if cached:
+        key = (name, tuple(sorted(context.items())))
+        cache = current_app.extensions["fragment_cache"]
+        return cache.get_or_build(key, lambda: render_template(name, **context).encode()).body
+    return render_template(name, **context)
+
+
+def create_app(bytecode_cache_dir=None, stream_templates=False, fragment_cache_bytes=FRAGMENT_CACHE_BYTES):
+    """
+    Crea y configura la aplicación Flask.
+
+    Las plantillas de TEMPLATES se compilan una sola vez, aquí, y el código
+    compilado se guarda en bytecode_cache_dir (por defecto, un directorio
+    temporal del usuario): al reiniciar un proceso, Jinja2 carga ese código
+    en lugar de volver a compilar las plantillas.
+
+    Con stream_templates las páginas se envían por partes (ver render_page).
+    Los saludos renderizados se guardan en una caché LRU acotada a
+    fragment_cache_bytes (app.extensions["fragment_cache"]), de modo que
+    los nombres únicos de un cliente malicioso solo expulsan entradas
+    antiguas.
     """
     app = Flask(__name__)
+    app.config["STREAM_TEMPLATES"] = stream_templates
+    app.config["STREAM_CHUNK_SIZE"] = 8 * 1024
+    app.extensions["fragment_cache"] = ResponseCache(fragment_cache_bytes)
+    app.jinja_options = {
+        **app.jinja_options,
+        "loader": ChoiceLoader([DictLoader(TEMPLATES), app.create_global_jinja_loader()]),
+        "bytecode_cache": FileSystemBytecodeCache(bytecode_cache_dir),
+    }
+    for name in TEMPLATES:
+        app.jinja_env.get_template(name)
 
     @app.route("/greet/<nombre>", methods=["GET"])
     def greet(nombre):
         """
         Devuelve una página web que saluda al usuario utilizando una plantilla Jinja2
         """
-        # Utiliza render_template_string para renderizar la plantilla con el nombre proporcionado:
-        return render_template_string(TEMPLATE, nombre=nombre)
+        # La plantilla ya está compilada y los nombres repetidos salen de la caché de fragmentos
+        return render_page("greet.html", cached=True, nombre=nombre)
+
+    @app.route("/greet", methods=["GET"])
+    def greet_list():
+        """
+        Devuelve una página con un saludo por cada parámetro nombre de la URL
+        """
+        return render_page("greet_list.html", nombres=request.args.getlist("nombre"))
 
     return app
 
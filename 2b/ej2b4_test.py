@@ -1,7 +1,7 @@
 import pytest
 from flask.testing import FlaskClient
-from ej2b4 import create_app, TEMPLATE
-from jinja2 import Template
+from ej2b4 import create_app, render_page, TEMPLATE
+from jinja2 import Environment, Template
 
 @pytest.fixture
 def client() -> FlaskClient:
@@ -29,3 +29,89 @@ def test_greet_endpoint(client):
     assert "<html>" in html_content.lower(), "La respuesta debe contener la etiqueta <html>."
     assert "<body>" in html_content.lower(), "La respuesta debe contener la etiqueta <body>."
     assert f"¡hola, {nombre}!" in html_content.lower(), "La respuesta debe contener el mensaje '¡Hola, <nombre>!' dentro del cuerpo."
+
+def test_templates_are_compiled_once(tmp_path, monkeypatch):
+    """
+    create_app compila las plantillas y guarda el bytecode en disco; una
+    segunda aplicación con el mismo directorio no vuelve a compilarlas.
+    """
+    app = create_app(bytecode_cache_dir=str(tmp_path))
+    assert list(tmp_path.glob("__jinja2_*.cache")), "El bytecode compilado debe guardarse en disco."
+
+    def fail(*args, **kwargs):
+        raise AssertionError("La plantilla no debe compilarse otra vez")
+
+    monkeypatch.setattr(Environment, "compile", fail)
+    app = create_app(bytecode_cache_dir=str(tmp_path))
+    response = app.test_client().get("/greet/Ana")
+    assert response.status_code == 200
+    assert "¡hola, Ana!" in response.data.decode("utf-8")
+
+def test_greet_list_endpoint(client):
+    response = client.get("/greet?nombre=Ana&nombre=Juan")
+    assert response.status_code == 200
+    html_content = response.data.decode("utf-8")
+    assert "¡hola, Ana!" in html_content
+    assert "¡hola, Juan!" in html_content
+
+
+def test_streamed_page_sends_first_bytes_before_rendering_ends():
+    """
+    Con stream_templates la primera parte de la página sale cuando solo se
+    han renderizado unos pocos nombres de la lista.
+    """
+    app = create_app(stream_templates=True)
+    total = 5000
+    rendered = []
+
+    def nombres():
+        for i in range(total):
+            rendered.append(i)
+            yield f"usuario{i}"
+
+    with app.test_request_context("/greet"):
+        response = render_page("greet_list.html", nombres=nombres())
+        assert response.is_streamed
+        chunks = iter(response.response)
+        first = next(chunks)
+        assert b"<!doctype html>" in first
+        assert b"</html>" not in first
+        assert len(rendered) < total, "La primera parte debe salir antes de terminar el renderizado."
+        rest = b"".join(chunks)
+    assert len(rendered) == total
+    assert (first + rest).decode("utf-8").count("<li>") == total
+
+
+def test_streamed_greet_endpoint():
+    app = create_app(stream_templates=True)
+    response = app.test_client().get("/greet?" + "&".join(f"nombre=n{i}" for i in range(2000)))
+    assert response.status_code == 200
+    assert response.is_streamed
+    html_content = response.data.decode("utf-8")
+    assert html_content.count("<li>") == 2000
+    assert "</html>" in html_content
+
+    response = app.test_client().get("/greet/Ana")
+    assert "¡hola, Ana!" in response.data.decode("utf-8")
+
+
+def test_greet_uses_fragment_cache(client):
+    """
+    El saludo de un nombre repetido no se vuelve a renderizar
+    """
+    cache = client.application.extensions["fragment_cache"]
+    first = client.get("/greet/Ana").data
+    assert client.get("/greet/Ana").data == first
+    client.get("/greet/Juan")
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert ("greet.html", (("nombre", "Ana"),)) in cache
+
+
+def test_fragment_cache_is_bounded():
+    app = create_app(fragment_cache_bytes=2000)
+    client = app.test_client()
+    for i in range(100):
+        assert f"¡hola, n{i}!" in client.get(f"/greet/n{i}").data.decode("utf-8")
+    cache = app.extensions["fragment_cache"]
+    assert cache.size <= 2000
+    assert len(cache) < 100
@@ -28,7 +28,7 @@ Ejemplo:
 2. Una solicitud `GET /product/999` debe devolver un mensaje de error con código 404.
 """
 
-from flask import Flask, jsonify
+from flask import Flask, jsonify, request
 
 # Lista de productos predefinida
 products = [
@@ -37,6 +37,14 @@ products = [
     {"id": 3, "name": "Tablet", "price": 349.99}
 ]
 
+# Índice por id sobre la lista anterior: las búsquedas no recorren el catálogo
+products_by_id = {p["id"]: p for p in products}
+
+# Versión de cada producto (1 al crearse; quien lo modifique debe
+# incrementarla): el ETag sale de ella, sin serializar ni calcular el hash del
+# cuerpo
+product_versions = {p["id"]: 1 for p in products}
+
 def create_app():
     """
     Crea y configura la aplicación Flask
@@ -50,15 +58,18 @@ def create_app():
         - Si existe: devuelve el producto con código 200 (OK)
         - Si no existe: devuelve un error con código 404 (Not Found)
         """
-        # Buscar el producto por ID
-        product = None
-        for prod in products:
-            if prod['id'] == product_id:
-                product = prod
-                break
+        # Buscar el producto por ID en el índice
+        product = products_by_id.get(product_id)
         
         if product:
-            return jsonify(product), 200
+            # ETag a partir de la versión del producto: si el cliente ya tiene
+            # esa versión se responde 304 sin serializar el producto
+            etag = f"{product_id}-{product_versions[product_id]}-json"
+            if request.if_none_match.contains_weak(etag):
+                return "", 304, {"ETag": f'"{etag}"'}
+            response = jsonify(product)
+            response.set_etag(etag)
+            return response, 200
         else:
             return jsonify({"error": f"Product with id {product_id} not found"}), 404
 
@@ -1,4 +1,5 @@
 import pytest
+import ej2c1
 from flask.testing import FlaskClient
 from ej2c1 import create_app
 
@@ -26,3 +27,24 @@ def test_get_product_not_found(client):
     response = client.get("/product/999")
     assert response.status_code == 404
     assert "error" in response.json
+
+def test_etag_and_not_modified(client):
+    """GET /product/1 with the ETag in If-None-Match should return 304 without a body"""
+    etag = client.get("/product/1").headers["ETag"]
+    response = client.get("/product/1", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+    assert response.headers["ETag"] == etag
+
+def test_not_modified_skips_serialization(client, monkeypatch):
+    """The 304 is decided from the version, before the product is serialized"""
+    etag = client.get("/product/1").headers["ETag"]
+    assert etag == '"1-1-json"'
+
+    def fail(*args, **kwargs):
+        raise AssertionError("The product must not be serialized for a 304")
+
+    monkeypatch.setattr(ej2c1, "jsonify", fail)
+    response = client.get("/product/1", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
@@ -7,6 +7,7 @@ La API debe exponer los siguientes endpoints:
 2. `POST /tasks`: Agrega una nueva tarea. El cuerpo de la solicitud debe incluir un JSON con el campo "name".
 3. `DELETE /tasks/<task_id>`: Elimina una tarea específica por su ID.
 4. `PUT /tasks/<task_id>`: Actualiza el nombre de una tarea existente por su ID. El cuerpo de la solicitud debe incluir un JSON con el campo "name".
+5. `POST /tasks/bulk`: Crea, actualiza y elimina varias tareas en una sola petición.
 
 Observa que el mismo endpoint (por ejemplo, `/tasks/<task_id>`) puede recibir diferentes verbos HTTP (DELETE, PUT) y realizar distintas operaciones según el verbo utilizado. Esta es una característica fundamental de las APIs REST.
 
@@ -27,27 +28,116 @@ Si la lista de tareas inicial está vacía:
 Tu tarea es implementar esta API en Flask.
 """
 
-from flask import Flask, jsonify, request
+import json
+import os
+import sys
+import weakref
 
-# Esta lista almacenará todas las tareas
-tasks = []
-# Este contador se usará para asignar IDs únicos
-next_id = 1
+from flask import Flask, Response, jsonify, request
 
+# El paquete comun está en la raíz del repositorio; así el ejercicio también
+# se puede ejecutar como script (python 2c/ej2c2.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-def create_app():
+from comun.compression import init_compression
+from comun.pagination import page_body, parse_page_args
+from comun.record_log import open_store
+from comun.record_store import RecordStore
+from comun.streaming import batch_chunks, iter_json_array
+
+# Este almacén guardará todas las tareas, por id y en orden de creación;
+# asigna IDs únicos a partir de 1. Solo está en memoria: con un directorio de
+# datos, create_app abre otro almacén persistente para esa aplicación
+tasks = RecordStore()
+
+# Número máximo de operaciones en una petición a POST /tasks/bulk
+MAX_BULK_OPERATIONS = 10000
+
+
+def parse_bulk_operation(item):
+    """
+    Convierte una operación de POST /tasks/bulk en la tupla (acción, id,
+    campos) de RecordStore.apply. Lanza ValueError con el mensaje de error.
+    """
+    if not isinstance(item, dict):
+        raise ValueError("Operation must be a JSON object")
+    op = item.get("op")
+    if op == "create":
+        if "name" not in item:
+            raise ValueError("Task name is required")
+        return ("add", None, {"name": item["name"]})
+    if op not in ("update", "delete"):
+        raise ValueError("Operation must be create, update or delete")
+    task_id = item.get("id")
+    if not isinstance(task_id, int) or isinstance(task_id, bool):
+        raise ValueError("Task id is required")
+    if op == "delete":
+        return ("delete", task_id, None)
+    if "name" not in item:
+        raise ValueError("Task name is required")
+    return ("update", task_id, {"name": item["name"]})
+
+
+def read_bulk_items():
+    """
+    Devuelve las operaciones del cuerpo de la petición: un array JSON o, con
+    Content-Type application/x-ndjson, un objeto JSON por línea. Las líneas
+    que no son JSON válido se devuelven como ValueError.
     """
-    Crea y configura la aplicación Flask
+    if request.mimetype == "application/x-ndjson":
+        items = []
+        for line in request.get_data().splitlines():
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                items.append(ValueError("Invalid JSON"))
+        return items
+    data = request.get_json(silent=True)
+    if not isinstance(data, list):
+        raise ValueError("Body must be a JSON array of operations")
+    return data
+
+
+def create_app(data_dir=None):
+    """
+    Crea y configura la aplicación Flask.
+
+    Con data_dir las tareas se guardan en ese directorio (un registro de
+    solo añadido más instantáneas, ver record_log) y se recuperan al
+    reiniciar; sin él se usa el almacén en memoria del módulo. El almacén
+    de la aplicación queda en app.extensions["tasks"], y el persistente se
+    cierra (con sus hilos y su segmento) cuando se libera la aplicación o
+    al terminar el proceso.
     """
     app = Flask(__name__)
+    if data_dir is None:
+        store = tasks
+    else:
+        store = open_store(data_dir)
+        weakref.finalize(app, store.close)
+    app.extensions["tasks"] = store
+    # Respuestas gzip/deflate según Accept-Encoding, con caché de variantes comprimidas
+    init_compression(app)
 
     @app.route("/tasks", methods=["GET"])
     def get_tasks():
         """
-        Devuelve la lista completa de tareas
+        Devuelve la lista completa de tareas, enviada por partes.
+
+        Con los parámetros limit y cursor devuelve solo una página:
+        {"tasks": [...], "next_cursor": ...}
         """
         # Implementa este endpoint
-        return jsonify(tasks)
+        try:
+            page = parse_page_args(request.args)
+        except ValueError as error:
+            return jsonify({"error": str(error)}), 400
+        if page is not None:
+            return jsonify(page_body(store, "tasks", *page))
+        chunks = batch_chunks(iter_json_array(store.all(), app.json.dumps))
+        return Response(chunks, mimetype="application/json")
 
     @app.route("/tasks", methods=["POST"])
     def add_task():
@@ -56,16 +146,12 @@ def create_app():
         El cuerpo de la solicitud debe incluir un JSON con el campo "name"
         """
         # Implementa este endpoint
-        global next_id
         data = request.get_json()
 
         if not data or "name" not in data:
             return jsonify({"error": "Task name is required"}), 400
 
-        task = {"id": next_id, "name": data["name"]}
-        tasks.append(task)
-        next_id += 1
-
+        task = store.add({"name": data["name"]})
         return jsonify(task), 201
 
     @app.route("/tasks/<int:task_id>", methods=["DELETE"])
@@ -74,17 +160,9 @@ def create_app():
         Elimina una tarea específica por su ID
         """
         # Implementa este endpoint
-        global tasks
-        task_to_delete = None
-        for task in tasks:
-            if task["id"] == task_id:
-                task_to_delete = task
-                break
-
-        if task_to_delete is None:
+        if store.delete(task_id) is None:
             return jsonify({"error": "Task not found"}), 404
 
-        tasks = [task for task in tasks if task["id"] != task_id]
         return jsonify({"message": "Task deleted"}), 200
 
     @app.route("/tasks/<int:task_id>", methods=["PUT"])
@@ -100,21 +178,57 @@ def create_app():
         if not data or "name" not in data:
             return jsonify({"error": "Task name is required"}), 400
 
-        task_to_update = None
-        for task in tasks:
-            if task["id"] == task_id:
-                task_to_update = task
-                break
+        task_to_update = store.update(task_id, {"name": data["name"]})
 
         if task_to_update is None:
             return jsonify({"error": "Task not found"}), 404
 
-        task_to_update["name"] = data["name"]
         return jsonify(task_to_update), 200
 
+    @app.route("/tasks/bulk", methods=["POST"])
+    def bulk_tasks():
+        """
+        Crea, actualiza y elimina varias tareas en una sola petición.
+
+        El cuerpo es un array JSON (o NDJSON) de operaciones:
+        {"op": "create", "name": ...}, {"op": "update", "id": ..., "name": ...}
+        o {"op": "delete", "id": ...}. Las operaciones válidas se aplican en
+        orden, de una vez; la respuesta incluye el resultado de cada una con
+        el código que habría devuelto la petición individual.
+        """
+        try:
+            items = read_bulk_items()
+        except ValueError as error:
+            return jsonify({"error": str(error)}), 400
+        if len(items) > MAX_BULK_OPERATIONS:
+            return jsonify({"error": f"At most {MAX_BULK_OPERATIONS} operations per request"}), 413
+
+        results = [None] * len(items)
+        operations = []
+        positions = []
+        for position, item in enumerate(items):
+            try:
+                if isinstance(item, ValueError):
+                    raise item
+                operations.append(parse_bulk_operation(item))
+                positions.append(position)
+            except ValueError as error:
+                results[position] = {"status": 400, "error": str(error)}
+
+        for position, (action, _, _), task in zip(positions, operations, store.apply(operations)):
+            if task is None:
+                results[position] = {"status": 404, "error": "Task not found"}
+            elif action == "add":
+                results[position] = {"status": 201, "task": task}
+            elif action == "update":
+                results[position] = {"status": 200, "task": task}
+            else:
+                results[position] = {"status": 200, "message": "Task deleted"}
+        return jsonify({"results": results}), 200
+
     return app
 
 
 if __name__ == "__main__":
-    app = create_app()
+    app = create_app(os.environ.get("TASKS_DATA_DIR"))
     app.run(debug=True)
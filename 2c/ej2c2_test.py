@@ -1,3 +1,8 @@
+import gc
+import gzip
+import json
+import threading
+
 import pytest
 from flask import Flask
 from flask.testing import FlaskClient
@@ -62,3 +67,169 @@ def test_update_nonexistent_task(client):
     response = client.put("/tasks/999", json={"name": "Tarea inexistente"})
     assert response.status_code == 404
     assert response.json == {"error": "Task not found"}
+
+
+def test_concurrent_requests_keep_ids_unique():
+    """
+    Muchos hilos creando, modificando, borrando y listando tareas a la vez:
+    los ids no se repiten y el listado siempre es coherente
+    """
+    app = create_app()
+    threads_count, per_thread = 8, 100
+    created = [[] for _ in range(threads_count)]
+    errors = []
+
+    def worker(n):
+        client = app.test_client()
+        try:
+            for i in range(per_thread):
+                task = client.post("/tasks", json={"name": f"hilo {n} tarea {i}"}).json
+                created[n].append(task["id"])
+                if i % 2:
+                    assert client.put(f"/tasks/{task['id']}", json={"name": "cambiada"}).status_code == 200
+                if i % 4 == 3:
+                    assert client.delete(f"/tasks/{task['id']}").status_code == 200
+                ids = [t["id"] for t in client.get("/tasks").json]
+                assert len(ids) == len(set(ids)) and ids == sorted(ids)
+        except AssertionError as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(threads_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    all_created = [task_id for ids in created for task_id in ids]
+    assert len(set(all_created)) == threads_count * per_thread
+    listed = {t["id"] for t in app.test_client().get("/tasks").json}
+    for ids in created:
+        for i, task_id in enumerate(ids):
+            assert (task_id in listed) == (i % 4 != 3)
+
+
+def test_get_tasks_is_streamed(client):
+    client.post("/tasks", json={"name": "Tarea por partes"})
+    response = client.get("/tasks")
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == "application/json"
+    assert {"id": response.json[-1]["id"], "name": "Tarea por partes"} == response.json[-1]
+
+
+def test_get_tasks_is_gzipped(client):
+    """
+    La lista completa de tareas se comprime por partes si el cliente acepta gzip
+    """
+    for i in range(50):
+        client.post("/tasks", json={"name": f"Tarea {i}"})
+    plain = client.get("/tasks")
+    response = client.get("/tasks", headers={"Accept-Encoding": "gzip"})
+    assert response.is_streamed
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert json.loads(gzip.decompress(response.data)) == plain.json
+
+
+def test_get_tasks_with_cursor(client):
+    """
+    Recorrer GET /tasks con limit y cursor devuelve todas las tareas una sola vez
+    """
+    for i in range(7):
+        client.post("/tasks", json={"name": f"Tarea {i}"})
+    expected = [task["id"] for task in client.get("/tasks").json]
+    seen = []
+    response = client.get("/tasks?limit=3")
+    while True:
+        assert response.status_code == 200
+        assert len(response.json["tasks"]) <= 3
+        seen.extend(task["id"] for task in response.json["tasks"])
+        cursor = response.json["next_cursor"]
+        if cursor is None:
+            break
+        response = client.get(f"/tasks?limit=3&cursor={cursor}")
+    assert seen == expected
+
+    assert client.get("/tasks?limit=0").status_code == 400
+    assert client.get("/tasks?cursor=no-valido").status_code == 400
+
+
+def test_bulk_operations(client):
+    """
+    POST /tasks/bulk aplica cada operación y devuelve su resultado, en orden
+    """
+    task_id = client.post("/tasks", json={"name": "Tarea existente"}).json["id"]
+    response = client.post("/tasks/bulk", json=[
+        {"op": "create", "name": "Nueva"},
+        {"op": "update", "id": task_id, "name": "Cambiada"},
+        {"op": "delete", "id": 999999},
+        {"op": "create"},
+        {"op": "borrar", "id": task_id},
+        "no es un objeto",
+    ])
+    assert response.status_code == 200
+    results = response.json["results"]
+    assert [result["status"] for result in results] == [201, 200, 404, 400, 400, 400]
+    new_id = results[0]["task"]["id"]
+    assert results[0]["task"] == {"id": new_id, "name": "Nueva"}
+    assert results[1]["task"] == {"id": task_id, "name": "Cambiada"}
+
+    response = client.post("/tasks/bulk", json=[{"op": "delete", "id": new_id}, {"op": "delete", "id": task_id}])
+    assert [result["status"] for result in response.json["results"]] == [200, 200]
+    ids = [task["id"] for task in client.get("/tasks").json]
+    assert new_id not in ids and task_id not in ids
+
+
+def test_bulk_operations_ndjson(client):
+    body = '{"op": "create", "name": "a"}\n\n{"op": "create", "name": "b"}\nno es json\n'
+    response = client.post("/tasks/bulk", data=body, content_type="application/x-ndjson")
+    assert [result["status"] for result in response.json["results"]] == [201, 201, 400]
+    first, second = (result["task"]["id"] for result in response.json["results"][:2])
+    assert second == first + 1
+
+
+def test_bulk_operations_invalid_body(client):
+    assert client.post("/tasks/bulk", json={"op": "create", "name": "a"}).status_code == 400
+    assert client.post("/tasks/bulk", data="[", content_type="application/json").status_code == 400
+
+
+def test_tasks_survive_restart(tmp_path):
+    """
+    Con un directorio de datos las tareas se recuperan al crear otra vez la aplicación
+    """
+    app = create_app(data_dir=str(tmp_path))
+    client = app.test_client()
+    first = client.post("/tasks", json={"name": "Persistente"}).json["id"]
+    second = client.post("/tasks", json={"name": "Borrada"}).json["id"]
+    client.put(f"/tasks/{first}", json={"name": "Persistente cambiada"})
+    client.delete(f"/tasks/{second}")
+    app.extensions["tasks"].close()
+
+    app = create_app(data_dir=str(tmp_path))
+    client = app.test_client()
+    assert client.get("/tasks").json == [{"id": first, "name": "Persistente cambiada"}]
+    assert client.post("/tasks", json={"name": "Nueva"}).json["id"] == second + 1
+    app.extensions["tasks"].close()
+
+
+def test_persistent_store_belongs_to_its_app(tmp_path):
+    """
+    Una aplicación con directorio de datos no cambia el almacén de las demás,
+    y su almacén se cierra al liberarla
+    """
+    import ej2c2
+
+    persistent = create_app(data_dir=str(tmp_path))
+    in_memory = create_app()
+    assert in_memory.extensions["tasks"] is ej2c2.tasks
+    assert persistent.extensions["tasks"] is not ej2c2.tasks
+
+    persistent.test_client().post("/tasks", json={"name": "Solo en disco"})
+    names = [task["name"] for task in in_memory.test_client().get("/tasks").json]
+    assert "Solo en disco" not in names
+
+    journal = persistent.extensions["tasks"]._journal
+    del persistent
+    gc.collect()
+    assert journal._file.closed
@@ -30,8 +30,17 @@ Ejemplos:
 4. `GET /products?name=pro` debe devolver productos cuyo nombre contenga "pro" (como "Laptop Pro").
 """
 
+import os
+import sys
+
 from flask import Flask, jsonify, request
 
+# El paquete comun está en la raíz del repositorio; así el ejercicio también
+# se puede ejecutar como script (python 2c/ej2c3.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from comun.compression import init_compression
+
 # Lista de productos predefinida con categorías
 products = [
     {"id": 1, "name": "Laptop Pro", "price": 999.99, "category": "electronics"},
@@ -49,6 +58,8 @@ def create_app():
     Crea y configura la aplicación Flask
     """
     app = Flask(__name__)
+    # Respuestas gzip/deflate según Accept-Encoding, con caché de variantes comprimidas
+    init_compression(app)
 
     @app.route('/products', methods=['GET'])
     def get_products():
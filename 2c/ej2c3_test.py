@@ -1,3 +1,4 @@
+import gzip
 import pytest
 from flask.testing import FlaskClient
 from ej2c3 import create_app
@@ -114,3 +115,15 @@ def test_filter_no_results(client):
     assert response.status_code == 200
     data = response.json
     assert len(data) == 0  # No debería haber productos
+
+def test_products_are_compressed(client):
+    """Test GET /products with Accept-Encoding: gzip returns a gzip body above the size threshold"""
+    client.application.extensions["compression"].min_size = 100
+    response = client.get("/products", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert gzip.decompress(response.data).startswith(b"[")
+
+    response = client.get("/products")
+    assert "Content-Encoding" not in response.headers
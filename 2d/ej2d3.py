@@ -32,22 +32,31 @@ Tu tarea es implementar esta API en Flask con el manejo adecuado de errores.
 """
 
 import logging
+import os
+import sys
 
-from flask import Flask, abort, jsonify, request
+from flask import Flask, Response, abort, jsonify, request
+
+# El paquete comun está en la raíz del repositorio; así el ejercicio también
+# se puede ejecutar como script (python 2d/ej2d3.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from comun.compression import init_compression
+from comun.pagination import page_body, parse_page_args
+from comun.record_store import RecordStore
+from comun.streaming import batch_chunks, iter_json_array
 
 # Configuración del registro (logging)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Lista de animales predefinida
-animals = [
+# Animales predefinidos; el almacén asigna IDs únicos a los nuevos (a partir de 4)
+# y se puede usar desde varios hilos a la vez
+animals = RecordStore([
     {"id": 1, "name": "León", "species": "Panthera leo"},
     {"id": 2, "name": "Elefante", "species": "Loxodonta africana"},
     {"id": 3, "name": "Jirafa", "species": "Giraffa camelopardalis"},
-]
-
-# Este contador se usará para asignar IDs únicos
-next_id = 4
+])
 
 
 def create_app():
@@ -55,6 +64,8 @@ def create_app():
     Crea y configura la aplicación Flask con manejadores de errores personalizados
     """
     app = Flask(__name__)
+    # Respuestas gzip/deflate según Accept-Encoding, con caché de variantes comprimidas
+    init_compression(app)
 
     # Manejador de errores 400 - Bad Request
     @app.errorhandler(400)
@@ -125,10 +136,20 @@ def create_app():
     @app.route("/animals", methods=["GET"])
     def get_animals():
         """
-        Devuelve la lista completa de animales
+        Devuelve la lista completa de animales, enviada por partes.
+
+        Con los parámetros limit y cursor devuelve solo una página:
+        {"animals": [...], "next_cursor": ...}
         """
         # Implementa este endpoint para devolver la lista de animales
-        return jsonify(animals), 200
+        try:
+            page = parse_page_args(request.args)
+        except ValueError as error:
+            abort(400, description=str(error))
+        if page is not None:
+            return jsonify(page_body(animals, "animals", *page)), 200
+        chunks = batch_chunks(iter_json_array(animals.all(), app.json.dumps))
+        return Response(chunks, mimetype="application/json"), 200
 
     @app.route("/animals/<int:animal_id>", methods=["GET"])
     def get_animal(animal_id):
@@ -136,7 +157,7 @@ def create_app():
         Devuelve la información de un animal específico por su ID
         Si el animal no existe, debe activar un error 404
         """
-        animal = next((a for a in animals if a["id"] == animal_id), None)
+        animal = animals.get(animal_id)
         if animal is None:
             # Si el animal no existe, usa abort(404) para lanzar un error 404
             abort(404)
@@ -154,8 +175,6 @@ def create_app():
         # 2. Verifica que los campos "name" y "species" estén presentes
         # 3. Si falta algún campo, usa abort(400) para lanzar un error
         # 4. Si todo está correcto, agrega el nuevo animal a la lista y devuelve una respuesta adecuada (código 201)
-        global next_id
-
         # Verificar que la solicitud contiene JSON
         if not request.is_json:
             abort(400)
@@ -166,12 +185,8 @@ def create_app():
         if "name" not in data or "species" not in data:
             abort(400)
 
-        # Crear el nuevo animal
-        new_animal = {"id": next_id, "name": data["name"], "species": data["species"]}
-
-        # Agregar a la lista
-        animals.append(new_animal)
-        next_id += 1
+        # Crear el nuevo animal y agregarlo al almacén, que le asigna el id
+        new_animal = animals.add({"name": data["name"], "species": data["species"]})
 
         return jsonify(new_animal), 201
 
@@ -186,20 +201,10 @@ def create_app():
         # 2. Si no existe, usa abort(404) para lanzar un error 404
         # 3. Si existe, elimínalo de la lista y devuelve una respuesta adecuada
 
-        # Buscar el animal en la lista
-        animal_to_delete = None
-        for animal in animals:
-            if animal["id"] == animal_id:
-                animal_to_delete = animal
-                break
-
-        # Si no se encontró el animal, lanzar error 404
-        if animal_to_delete is None:
+        # Eliminar el animal; si no se encontró, lanzar error 404
+        if animals.delete(animal_id) is None:
             abort(404)
 
-        # Eliminar el animal de la lista
-        animals.remove(animal_to_delete)
-
         # Devolver respuesta sin contenido (código 204)
         return "", 204
 
@@ -1,8 +1,11 @@
+import gzip
+import json
 import pytest
 from flask import Flask
 from flask.testing import FlaskClient
 from ej2d3 import create_app
 import logging
+import threading
 from io import StringIO
 
 
@@ -47,6 +50,16 @@ def test_get_animals(client):
     assert len(response.json) == 3
     assert response.json[0]["name"] == "León"
 
+def test_get_animals_is_gzipped(client):
+    """GET /animals (la lista completa, enviada por partes) se comprime si el cliente acepta gzip"""
+    plain = client.get("/animals")
+    response = client.get("/animals", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert json.loads(gzip.decompress(response.data)) == plain.json
+    assert "Content-Encoding" not in plain.headers
+
 def test_get_animal_exists(client):
     """Test GET /animals/1 - should return the animal with ID 1"""
     response = client.get("/animals/1")
@@ -121,3 +134,61 @@ def test_method_not_allowed(client):
 #     assert "ERROR:" in logs, "Debe registrarse un mensaje de nivel ERROR para errores 500"
 #     assert "test-error" in logs, "El log debe incluir información de la ruta que causó el error"
 
+
+
+def test_concurrent_requests_keep_ids_unique(client):
+    """
+    Muchos hilos creando, consultando y borrando animales a la vez: los ids
+    no se repiten y los animales creados se pueden consultar
+    """
+    app = client.application
+    threads_count, per_thread = 8, 100
+    created = [[] for _ in range(threads_count)]
+    errors = []
+
+    def worker(n):
+        thread_client = app.test_client()
+        try:
+            for i in range(per_thread):
+                animal = thread_client.post("/animals", json={"name": f"a{n}-{i}", "species": "x"}).json
+                created[n].append(animal["id"])
+                assert thread_client.get(f"/animals/{animal['id']}").json["name"] == f"a{n}-{i}"
+                if i % 2:
+                    assert thread_client.delete(f"/animals/{animal['id']}").status_code == 204
+                ids = [a["id"] for a in thread_client.get("/animals").json]
+                assert len(ids) == len(set(ids))
+        except AssertionError as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(threads_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    all_created = [animal_id for ids in created for animal_id in ids]
+    assert len(set(all_created)) == threads_count * per_thread
+    listed = {a["id"] for a in client.get("/animals").json}
+    assert {ids[i] for ids in created for i in range(0, per_thread, 2)} <= listed
+
+
+def test_get_animals_pagination(client):
+    """
+    GET /animals con limit y cursor recorre el catálogo completo por páginas
+    """
+    expected = [a["id"] for a in client.get("/animals").json]
+    seen = []
+    response = client.get("/animals?limit=2")
+    while True:
+        assert response.status_code == 200
+        seen.extend(a["id"] for a in response.json["animals"])
+        cursor = response.json["next_cursor"]
+        if cursor is None:
+            break
+        response = client.get(f"/animals?limit=2&cursor={cursor}")
+    assert seen == expected
+
+    response = client.get("/animals?limit=abc")
+    assert response.status_code == 400
+    assert response.json["error"] == "Bad Request"
@@ -0,0 +1,62 @@
+"""
+Micro-benchmark de la creación de tareas en ej2c2, una a una o por lotes.
+
+Compara el coste por tarea de N peticiones POST /tasks con el de una sola
+petición POST /tasks/bulk con N operaciones, en JSON y en NDJSON. Usa el
+cliente de pruebas de Flask, que no abre conexiones: sobre HTTP real, el
+coste de cada petición individual es aún mayor y la mejora también.
+
+Uso:
+    python benchmarks/bench_bulk_tasks.py [--tasks 5000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "2c"))
+
+from ej2c2 import create_app  # noqa: E402
+
+
+def per_item(run, total):
+    """
+    Ejecuta run() y devuelve los microsegundos por tarea
+    """
+    started = time.perf_counter()
+    run()
+    return (time.perf_counter() - started) / total * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=5000)
+    args = parser.parse_args()
+
+    client = create_app().test_client()
+    operations = [{"op": "create", "name": f"Tarea {i}"} for i in range(args.tasks)]
+    ndjson = "\n".join(json.dumps(operation) for operation in operations)
+
+    def single():
+        for operation in operations:
+            client.post("/tasks", json={"name": operation["name"]})
+
+    versions = {
+        "POST /tasks": single,
+        "bulk JSON": lambda: client.post("/tasks/bulk", json=operations),
+        "bulk NDJSON": lambda: client.post("/tasks/bulk", data=ndjson, content_type="application/x-ndjson"),
+    }
+    print(f"{'versión':<14} {'µs por tarea':>14} {'mejora':>8}")
+    baseline = None
+    for name, run in versions.items():
+        cost = per_item(run, args.tasks)
+        baseline = baseline or cost
+        print(f"{name:<14} {cost:>14.1f} {baseline / cost:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Micro-benchmark de la búsqueda de productos por id.
+
+Compara la búsqueda lineal que usaban ej2a2 y ej2a3 (recorrer la lista
+de productos) con ProductRepository.get, que usa un índice por id, para
+catálogos de tamaño creciente. Los ids buscados se reparten uniformemente por
+el catálogo, más un id inexistente, que es el peor caso de la búsqueda lineal.
+
+Uso:
+    python benchmarks/bench_product_lookup.py [--sizes 100 10000 500000] [--lookups 2000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "2a"))
+
+from product_repository import ProductRepository  # noqa: E402
+
+
+def linear_scan(products, product_id):
+    """
+    Búsqueda anterior al índice
+    """
+    return next((p for p in products if p["id"] == product_id), None)
+
+
+def build_catalog(size):
+    return [{"id": i, "name": f"Producto {i}", "price": round(i * 0.37, 2)} for i in range(1, size + 1)]
+
+
+def run(lookup, ids):
+    """
+    Ejecuta una búsqueda por id y devuelve las búsquedas por segundo
+    """
+    started = time.perf_counter()
+    for product_id in ids:
+        lookup(product_id)
+    return len(ids) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 100000, 500000])
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"{'productos':>10} {'lineal/s':>14} {'índice/s':>14} {'mejora':>10}")
+    for size in args.sizes:
+        products = build_catalog(size)
+        repository = ProductRepository(products)
+        ids = [size + 1] + [rng.randint(1, size) for _ in range(args.lookups - 1)]
+        # La búsqueda lineal es O(n): se limita el número de búsquedas en catálogos grandes
+        scan_ids = ids[:max(10, args.lookups * 1000 // size)]
+        scan = run(lambda product_id: linear_scan(products, product_id), scan_ids)
+        indexed = run(repository.get, ids * 100)
+        print(f"{size:>10,} {scan:>14,.0f} {indexed:>14,.0f} {indexed / scan:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
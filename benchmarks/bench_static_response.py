@@ -0,0 +1,108 @@
+"""
+Micro-benchmark de las respuestas precodificadas de ej2a1.
+
+Compara el do_GET original (send_response + send_header + end_headers +
+write del cuerpo) con el envío de la respuesta construida en create_server.
+Los manejadores se ejecutan en proceso, sobre búferes en memoria, para medir
+solo el coste del manejador; el escritor cuenta las llamadas a write, que en
+el servidor real son llamadas a sendall.
+
+Uso:
+    python benchmarks/bench_static_response.py [--requests 200000]
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "2a"))
+
+from ej2a1 import MyHTTPRequestHandler, build_static_responses  # noqa: E402
+
+
+class CountingWriter(io.RawIOBase):
+    """
+    Escritor que descarta los datos y cuenta las escrituras
+    """
+
+    def __init__(self):
+        self.writes = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.writes += 1
+        return len(data)
+
+
+class QuietHandler(MyHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class LegacyHandler(QuietHandler):
+    """
+    do_GET anterior a la caché: construye estado, cabeceras y cuerpo en cada petición
+    """
+
+    def do_GET(self):
+        if self.path == '/':
+            body = "¡Hola mundo!".encode()
+            self.send_response(200)
+            self.send_header('Content-type', 'text/plain')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            body = "404 Not Found".encode()
+            self.send_response(404)
+            self.send_header('Content-type', 'text/plain')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+
+class FakeServer:
+    static_responses = build_static_responses()
+
+
+def run(handler_class, path, total):
+    """
+    Ejecuta total peticiones GET y devuelve (peticiones/s, escrituras por petición)
+    """
+    request = f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode()
+    server = FakeServer()
+    writer = CountingWriter()
+    started = time.perf_counter()
+    for _ in range(total):
+        handler = handler_class.__new__(handler_class)
+        handler.server = server
+        handler.client_address = ("127.0.0.1", 0)
+        handler.rfile = io.BytesIO(request)
+        handler.wfile = writer
+        handler.close_connection = True
+        handler.handle_one_request()
+    elapsed = time.perf_counter() - started
+    return total / elapsed, writer.writes / total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200000)
+    args = parser.parse_args()
+
+    print(f"{'ruta':<8} {'versión':<10} {'peticiones/s':>14} {'writes/petición':>16}")
+    for path in ("/", "/missing"):
+        results = {}
+        for name, handler_class in (("antes", LegacyHandler), ("después", QuietHandler)):
+            rate, writes = run(handler_class, path, args.requests)
+            results[name] = rate
+            print(f"{path:<8} {name:<10} {rate:>14,.0f} {writes:>16.1f}")
+        print(f"{path:<8} {'mejora':<10} {results['después'] / results['antes']:>13.2f}x")
+
+
+if __name__ == "__main__":
+    main()
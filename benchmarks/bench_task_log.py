@@ -0,0 +1,105 @@
+"""
+Micro-benchmark de la persistencia de tareas (record_log).
+
+Mide las escrituras por segundo con cada modo de fsync y compara con
+reescribir un fichero JSON con todas las tareas en cada cambio. Después
+mide el tiempo de arranque con --tasks tareas guardadas, cargando la
+instantánea más la cola del registro, o reproduciendo el registro completo
+sin instantánea.
+
+Uso:
+    python benchmarks/bench_task_log.py [--tasks 1000000] [--writes 2000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from comun.record_log import open_store  # noqa: E402
+
+# Tamaño de los lotes con que se llena el almacén antes de medir el arranque
+BATCH = 10000
+
+
+def writes_per_second(directory, fsync, total):
+    store = open_store(directory, fsync=fsync, fsync_interval=0.05)
+    started = time.perf_counter()
+    for i in range(total):
+        store.add({"name": f"Tarea {i}"})
+    rate = total / (time.perf_counter() - started)
+    store.close()
+    return rate
+
+
+def rewrite_per_second(directory, tasks, total):
+    """
+    Alternativa ingenua: reescribir el fichero completo en cada cambio
+    """
+    path = os.path.join(directory, "tasks.json")
+    started = time.perf_counter()
+    for i in range(total):
+        tasks.append({"id": len(tasks) + 1, "name": f"Tarea {i}"})
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(tasks, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+    return total / (time.perf_counter() - started)
+
+
+def fill(directory, total, snapshot):
+    """
+    Guarda total tareas (y borra una de cada diez); con snapshot, las
+    compacta en una instantánea y deja una cola de BATCH entradas
+    """
+    store = open_store(directory, fsync="never", snapshot_every=None)
+    for start in range(0, total, BATCH):
+        store.apply([("add", None, {"name": f"Tarea {i}"}) for i in range(start, start + BATCH)])
+        store.apply([("delete", i, None) for i in range(start + 1, start + BATCH + 1, 10)])
+    if snapshot:
+        store.compact()
+        store.apply([("update", i, {"name": "cambiada"}) for i in range(2, BATCH + 2)])
+    store.close()
+
+
+def restart_seconds(directory):
+    started = time.perf_counter()
+    store = open_store(directory, snapshot_every=None)
+    elapsed = time.perf_counter() - started
+    count = len(store)
+    store.close()
+    return elapsed, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=1000000)
+    parser.add_argument("--writes", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'escritura':<28} {'por segundo':>14}")
+    with tempfile.TemporaryDirectory() as directory:
+        tasks = [{"id": i, "name": f"Tarea {i}"} for i in range(1, 10001)]
+        rate = rewrite_per_second(directory, tasks, max(10, args.writes // 100))
+        print(f"{'reescribir JSON (10^4)':<28} {rate:>14,.0f}")
+    for fsync in ("always", "interval", "never"):
+        with tempfile.TemporaryDirectory() as directory:
+            rate = writes_per_second(directory, fsync, args.writes)
+            print(f"{'registro, fsync=' + fsync:<28} {rate:>14,.0f}")
+
+    print()
+    print(f"{'arranque':<28} {'segundos':>10} {'tareas':>12}")
+    for snapshot, name in ((True, "instantánea + cola"), (False, "solo registro")):
+        with tempfile.TemporaryDirectory() as directory:
+            fill(directory, args.tasks, snapshot)
+            elapsed, count = restart_seconds(directory)
+            print(f"{name:<28} {elapsed:>10.2f} {count:>12,}")
+
+
+if __name__ == "__main__":
+    main()
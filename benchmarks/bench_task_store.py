@@ -0,0 +1,85 @@
+"""
+Micro-benchmark del almacén de tareas de ej2c2.
+
+Compara, para listas de tareas de tamaño creciente, las operaciones que hacía
+ej2c2 sobre una lista (buscar recorriéndola y borrar construyendo una lista
+nueva) con RecordStore, que guarda las tareas en un diccionario por id. Los
+ids modificados y borrados se reparten uniformemente por la lista.
+
+Uso:
+    python benchmarks/bench_task_store.py [--sizes 100 10000 100000] [--operations 2000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from comun.record_store import RecordStore  # noqa: E402
+
+
+class TaskList:
+    """
+    Operaciones anteriores al almacén, sobre una lista
+    """
+
+    def __init__(self, tasks):
+        self.tasks = tasks
+
+    def update(self, task_id, name):
+        for task in self.tasks:
+            if task["id"] == task_id:
+                task["name"] = name
+                return task
+        return None
+
+    def delete(self, task_id):
+        if not any(task["id"] == task_id for task in self.tasks):
+            return None
+        self.tasks = [task for task in self.tasks if task["id"] != task_id]
+        return True
+
+
+def build_tasks(size):
+    return [{"id": i, "name": f"Tarea {i}"} for i in range(1, size + 1)]
+
+
+def run(operation, ids):
+    """
+    Aplica la operación a cada id y devuelve las operaciones por segundo
+    """
+    started = time.perf_counter()
+    for task_id in ids:
+        operation(task_id)
+    return len(ids) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 100000])
+    parser.add_argument("--operations", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"{'tareas':>8} {'operación':<10} {'lista/s':>12} {'almacén/s':>12} {'mejora':>9}")
+    for size in args.sizes:
+        ids = rng.sample(range(1, size + 1), min(size, args.operations))
+        # Las operaciones sobre la lista son O(n): se limitan en listas grandes
+        list_ids = ids[:max(10, args.operations * 1000 // size)]
+        for name in ("update", "delete"):
+            task_list = TaskList(build_tasks(size))
+            store = RecordStore(build_tasks(size))
+            if name == "update":
+                before = run(lambda task_id: task_list.update(task_id, "x"), list_ids)
+                after = run(lambda task_id: store.update(task_id, {"name": "x"}), ids)
+            else:
+                before = run(task_list.delete, list_ids)
+                after = run(store.delete, ids)
+            print(f"{size:>8,} {name:<10} {before:>12,.0f} {after:>12,.0f} {after / before:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Micro-benchmark del renderizado de plantillas de ej2b4.
+
+Mide el arranque de la aplicación (create_app) en frío, con el directorio de
+bytecode vacío, y en caliente, con el bytecode ya guardado por un arranque
+anterior, y compara el renderizado en régimen estacionario de
+render_template_string (compila la plantilla en cada petición) con
+render_template sobre la plantilla registrada.
+
+Uso:
+    python benchmarks/bench_template_render.py [--starts 200] [--iterations 20000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "2b"))
+
+from flask import render_template, render_template_string  # noqa: E402
+
+from ej2b4 import TEMPLATE, create_app  # noqa: E402
+
+
+def time_starts(total, cache_dir=None):
+    """
+    Ejecuta total arranques y devuelve los milisegundos por arranque.
+
+    Sin cache_dir cada arranque usa un directorio vacío (arranque en frío).
+    """
+    elapsed = 0.0
+    for _ in range(total):
+        with tempfile.TemporaryDirectory() as empty_dir:
+            started = time.perf_counter()
+            create_app(bytecode_cache_dir=cache_dir or empty_dir)
+            elapsed += time.perf_counter() - started
+    return elapsed / total * 1000
+
+
+def run(render, total):
+    """
+    Ejecuta total renderizados y devuelve los renderizados por segundo
+    """
+    started = time.perf_counter()
+    for _ in range(total):
+        render()
+    return total / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--starts", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        create_app(bytecode_cache_dir=cache_dir)
+        print(f"{'arranque':<24} {'ms':>10}")
+        print(f"{'en frío':<24} {time_starts(args.starts):>10.3f}")
+        print(f"{'con bytecode en disco':<24} {time_starts(args.starts, cache_dir):>10.3f}")
+
+        app = create_app(bytecode_cache_dir=cache_dir)
+        versions = {
+            "render_template_string": lambda: render_template_string(TEMPLATE, nombre="Juan"),
+            "render_template": lambda: render_template("greet.html", nombre="Juan"),
+        }
+        print()
+        print(f"{'renderizado':<24} {'por segundo':>14} {'mejora':>8}")
+        with app.test_request_context("/greet/Juan"):
+            baseline = None
+            for name, render in versions.items():
+                rate = run(render, args.iterations)
+                baseline = baseline or rate
+                print(f"{name:<24} {rate:>14,.0f} {rate / baseline:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
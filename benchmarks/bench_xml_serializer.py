@@ -0,0 +1,58 @@
+"""
+Micro-benchmark del serializador XML de ej2a3.
+
+Compara prettify (ET.tostring + minidom.parseString + toprettyxml) con
+xml_writer.to_xml en sus modos con sangría y compacto, sobre el producto y
+el mensaje de error que devuelve la API.
+
+Uso:
+    python benchmarks/bench_xml_serializer.py [--iterations 50000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "2a"))
+
+from ej2a3 import dict_to_xml, prettify  # noqa: E402
+from xml_writer import to_xml  # noqa: E402
+
+PAYLOADS = {
+    "product": {"id": 1, "name": "Laptop", "price": 999.99},
+    "error": {"message": "Product with id 999 not found"},
+}
+
+
+def run(serialize, total):
+    """
+    Ejecuta total serializaciones y devuelve las serializaciones por segundo
+    """
+    started = time.perf_counter()
+    for _ in range(total):
+        serialize()
+    return total / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=50000)
+    args = parser.parse_args()
+
+    print(f"{'carga':<8} {'versión':<16} {'por segundo':>14} {'mejora':>8}")
+    for tag, fields in PAYLOADS.items():
+        versions = {
+            "prettify": lambda: prettify(dict_to_xml(tag, fields)),
+            "to_xml": lambda: to_xml(tag, fields),
+            "to_xml compacto": lambda: to_xml(tag, fields, indent=None),
+        }
+        baseline = None
+        for name, serialize in versions.items():
+            rate = run(serialize, args.iterations)
+            baseline = baseline or rate
+            print(f"{tag:<8} {name:<16} {rate:>14,.0f} {rate / baseline:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,375 @@
+"""
+Generador de carga y benchmark de latencia para los servidores de los ejercicios.
+
+Arranca cualquier objetivo `create_server` (http.server, apartado 2a) o
+`create_app` (Flask, apartados 2b-2f) en localhost, en un puerto libre, y lo
+somete a N clientes concurrentes con conexiones keep-alive (http.client).
+Para cada ruta informa de las peticiones por segundo y de las latencias
+p50/p95/p99, y puede guardar los resultados en JSON para compararlos con una
+ejecución anterior y detectar regresiones.
+
+Uso:
+    python benchmarks/loadgen.py 2a/ej2a1.py
+    python benchmarks/loadgen.py 2c/ej2c2.py --clients 16 --duration 10 --output ej2c2.json
+    python benchmarks/loadgen.py 2a/ej2a2.py --route "GET /product/2" --compare ej2a2.json
+    python benchmarks/loadgen.py --all --output todos.json
+
+Cada ruta se indica como "MÉTODO RUTA [CUERPO_JSON]", por ejemplo
+"POST /tasks {\"name\": \"Comprar pan\"}". Si no se indican rutas se usan las
+de DEFAULT_ROUTES para el ejercicio.
+"""
+
+import argparse
+import http.client
+import importlib.util
+import itertools
+import json
+import logging
+import math
+import os
+import platform
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Rutas representativas de cada ejercicio, usadas cuando no se indica --route
+DEFAULT_ROUTES = {
+    "ej2a1": ["GET /", "GET /missing"],
+    "ej2a2": ["GET /product/1", "GET /product/999", "GET /products?ids=1,2,3"],
+    "ej2a3": ["GET /product/1", "GET /product/999"],
+    "ej2b1": ["GET /"],
+    "ej2b2": ["GET /hello", "GET /greet/Juan"],
+    "ej2b3": ["GET /search?q=flask&category=tutorial", 'POST /json {"nombre": "Juan"}'],
+    "ej2b4": ["GET /greet/Juan"],
+    "ej2c1": ["GET /product/1", "GET /product/999"],
+    "ej2c2": ["GET /tasks", 'POST /tasks {"name": "Tarea de carga"}'],
+    "ej2c3": ["GET /products", "GET /products?category=electronics&min_price=150"],
+    "ej2d1": ["GET /info", "GET /status"],
+    "ej2d2": ["GET /resource/1", "GET /resource/0"],
+    "ej2d3": ["GET /animals", "GET /animals/1", "GET /animals/999"],
+    "ej2e1": ["GET /headers", 'POST /echo {"mensaje": "hola"}'],
+    "ej2e2": ["GET /text", "GET /json", "GET /xml"],
+    "ej2e3": ['POST /json {"mensaje": "hola"}'],
+    "ej2f1": ["GET /api/v1/", "GET /api/v1/user/list"],
+}
+
+
+class Route:
+    """
+    Petición que se repite durante el benchmark
+    """
+
+    def __init__(self, spec):
+        parts = spec.split(" ", 2)
+        if len(parts) < 2:
+            raise ValueError(f"Ruta no válida: {spec!r}. Formato: 'MÉTODO RUTA [CUERPO_JSON]'")
+        self.name = spec
+        self.method = parts[0].upper()
+        self.path = parts[1]
+        self.body = None
+        self.headers = {}
+        if len(parts) == 3:
+            self.body = json.dumps(json.loads(parts[2])).encode()
+            self.headers["Content-Type"] = "application/json"
+
+
+# Sufijos con los que se registran en sys.modules los ejercicios cargados
+_module_ids = itertools.count(1)
+
+
+def exercise_name(module):
+    """
+    Devuelve el nombre del ejercicio (ej2a1) de un módulo cargado con load_module
+    """
+    return os.path.splitext(os.path.basename(module.__file__))[0]
+
+
+def load_module(target):
+    """
+    Importa un ejercicio a partir de su ruta (por ejemplo 2a/ej2a1.py).
+
+    Se registra en sys.modules con un nombre propio, para no sustituir al
+    módulo del mismo nombre que ya se hubiera importado (en una sesión de
+    pytest, por ejemplo).
+    """
+    path = os.path.abspath(target if os.path.isabs(target) else os.path.join(ROOT, target))
+    if not os.path.exists(path):
+        path = os.path.abspath(target)
+    # El directorio del ejercicio para sus módulos locales y la raíz para el
+    # paquete comun
+    for directory in (ROOT, os.path.dirname(path)):
+        if directory not in sys.path:
+            sys.path.insert(0, directory)
+    name = f"_loadgen_{os.path.splitext(os.path.basename(path))[0]}_{next(_module_ids)}"
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class RunningTarget:
+    """
+    Servidor del ejercicio arrancado en un hilo sobre un puerto libre de localhost
+    """
+
+    def __init__(self, module):
+        self.name = exercise_name(module)
+        if hasattr(module, "create_server"):
+            self.server = module.create_server(host="127.0.0.1", port=0)
+            handler_class = self.server.RequestHandlerClass
+            # El registro por petición en stderr distorsiona la medida
+            self.server.RequestHandlerClass = type(
+                handler_class.__name__, (handler_class,), {"log_message": lambda self, *args: None}
+            )
+        elif hasattr(module, "create_app"):
+            from werkzeug.serving import WSGIRequestHandler, make_server
+
+            class KeepAliveRequestHandler(WSGIRequestHandler):
+                protocol_version = "HTTP/1.1"
+
+                def log_request(self, *args, **kwargs):
+                    pass
+
+            logging.getLogger("werkzeug").setLevel(logging.ERROR)
+            app = module.create_app()
+            app.logger.setLevel(logging.CRITICAL)
+            self.server = make_server(
+                "127.0.0.1", 0, app, threaded=True, request_handler=KeepAliveRequestHandler
+            )
+        else:
+            raise ValueError(f"{self.name} no define create_server ni create_app")
+        self.port = self.server.server_port
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join(1)
+
+
+def client_loop(port, routes, offset, deadline, max_requests, samples, errors, lock):
+    """
+    Cuerpo de un cliente: reutiliza una conexión keep-alive y recorre las rutas en orden
+    """
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    local = {route.name: [] for route in routes}
+    local_errors = {route.name: 0 for route in routes}
+    sent = 0
+    index = offset
+    try:
+        while time.perf_counter() < deadline and (max_requests is None or sent < max_requests):
+            route = routes[index % len(routes)]
+            index += 1
+            sent += 1
+            started = time.perf_counter()
+            try:
+                connection.request(route.method, route.path, body=route.body, headers=route.headers)
+                response = connection.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException):
+                local_errors[route.name] += 1
+                connection.close()
+                continue
+            elapsed = time.perf_counter() - started
+            if response.status >= 500:
+                local_errors[route.name] += 1
+            else:
+                local[route.name].append(elapsed)
+    finally:
+        connection.close()
+        with lock:
+            for name, values in local.items():
+                samples[name].extend(values)
+                errors[name] += local_errors[name]
+
+
+def percentile(sorted_values, fraction):
+    """
+    Percentil por rango más cercano sobre una lista ya ordenada
+    """
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(round(fraction * len(sorted_values), 9)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(samples, errors, elapsed):
+    """
+    Calcula peticiones/s y percentiles (en milisegundos) por ruta
+    """
+    routes = {}
+    for name, values in samples.items():
+        values = sorted(values)
+        routes[name] = {
+            "requests": len(values),
+            "errors": errors[name],
+            "rps": len(values) / elapsed if elapsed else 0.0,
+            "p50_ms": _ms(percentile(values, 0.50)),
+            "p95_ms": _ms(percentile(values, 0.95)),
+            "p99_ms": _ms(percentile(values, 0.99)),
+        }
+    return routes
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+def run_benchmark(target, routes=None, clients=8, duration=5.0, requests=None, warmup=0.5):
+    """
+    Arranca el objetivo, lo calienta y lo somete a carga.
+
+    Devuelve un diccionario serializable con la configuración y los resultados.
+    """
+    module = load_module(target)
+    specs = routes or DEFAULT_ROUTES.get(exercise_name(module), ["GET /"])
+    parsed = [Route(spec) for spec in specs]
+
+    with RunningTarget(module) as running:
+        if warmup:
+            _drive(running.port, parsed, 1, time.perf_counter() + warmup, None)
+        samples, errors, elapsed = _drive(
+            running.port, parsed, clients, time.perf_counter() + duration, requests
+        )
+
+    results = summarize(samples, errors, elapsed)
+    total = sum(route["requests"] for route in results.values())
+    return {
+        "target": target,
+        "clients": clients,
+        "duration_s": round(elapsed, 3),
+        "total_requests": total,
+        "total_rps": total / elapsed if elapsed else 0.0,
+        "routes": results,
+    }
+
+
+def _drive(port, routes, clients, deadline, requests):
+    samples = {route.name: [] for route in routes}
+    errors = {route.name: 0 for route in routes}
+    lock = threading.Lock()
+    # El resto de requests // clients se reparte entre los primeros clientes
+    if requests is None:
+        quotas = [None] * clients
+    else:
+        quotas = [requests // clients + (offset < requests % clients) for offset in range(clients)]
+    threads = [
+        threading.Thread(
+            target=client_loop,
+            args=(port, routes, offset, deadline, quotas[offset], samples, errors, lock),
+        )
+        for offset in range(clients)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, errors, time.perf_counter() - started
+
+
+def compare(current, baseline, threshold=10.0):
+    """
+    Compara dos ejecuciones del mismo objetivo.
+
+    Devuelve una lista de regresiones: rutas cuyo rps baja o cuyo p99 sube
+    más de threshold por ciento respecto a la línea base.
+    """
+    regressions = []
+    for name, now in current["routes"].items():
+        before = baseline.get("routes", {}).get(name)
+        if not before:
+            continue
+        if before["rps"] and now["rps"] < before["rps"] * (1 - threshold / 100):
+            regressions.append(f"{name}: rps {before['rps']:.0f} -> {now['rps']:.0f}")
+        if before["p99_ms"] and now["p99_ms"] and now["p99_ms"] > before["p99_ms"] * (1 + threshold / 100):
+            regressions.append(f"{name}: p99 {before['p99_ms']:.3f} ms -> {now['p99_ms']:.3f} ms")
+    return regressions
+
+
+def print_report(result):
+    print(f"\n{result['target']}  ({result['clients']} clientes, {result['duration_s']} s, "
+          f"{result['total_rps']:,.0f} peticiones/s en total)")
+    print(f"  {'ruta':<48} {'peticiones/s':>12} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errores':>8}")
+    for name, route in result["routes"].items():
+        print(f"  {name[:48]:<48} {route['rps']:>12,.0f} {_fmt(route['p50_ms'])} "
+              f"{_fmt(route['p95_ms'])} {_fmt(route['p99_ms'])} {route['errors']:>8}")
+
+
+def _fmt(value):
+    return f"{'-':>9}" if value is None else f"{value:>9.3f}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de carga para los servidores de los ejercicios")
+    parser.add_argument("targets", nargs="*", help="Ficheros de ejercicio, por ejemplo 2a/ej2a1.py")
+    parser.add_argument("--all", action="store_true", help="Ejecuta todos los ejercicios de DEFAULT_ROUTES")
+    parser.add_argument("--route", action="append", dest="routes", help="Ruta a medir (se puede repetir)")
+    parser.add_argument("--clients", type=int, default=8, help="Clientes concurrentes")
+    parser.add_argument("--duration", type=float, default=5.0, help="Segundos de medida por objetivo")
+    parser.add_argument("--requests", type=int, help="Límite total de peticiones por objetivo")
+    parser.add_argument("--warmup", type=float, default=0.5, help="Segundos de calentamiento")
+    parser.add_argument("--output", help="Guarda los resultados en este fichero JSON")
+    parser.add_argument("--compare", help="Fichero JSON de una ejecución anterior para comparar")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Porcentaje tolerado antes de marcar regresión")
+    args = parser.parse_args(argv)
+
+    targets = list(args.targets)
+    if args.all:
+        targets += [
+            os.path.join(name[2:4], f"{name}.py") for name in DEFAULT_ROUTES
+        ]
+    if not targets:
+        parser.error("indica al menos un objetivo o usa --all")
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": [],
+    }
+    for target in targets:
+        result = run_benchmark(
+            target,
+            routes=args.routes,
+            clients=args.clients,
+            duration=args.duration,
+            requests=args.requests,
+            warmup=args.warmup,
+        )
+        report["results"].append(result)
+        print_report(result)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados guardados en {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = {result["target"]: result for result in json.load(f)["results"]}
+        regressions = []
+        for result in report["results"]:
+            if result["target"] in baseline:
+                regressions += [
+                    f"{result['target']} {line}"
+                    for line in compare(result, baseline[result["target"]], args.threshold)
+                ]
+        if regressions:
+            print("\nRegresiones respecto a la línea base:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\nSin regresiones respecto a la línea base.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
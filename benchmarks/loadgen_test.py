@@ -0,0 +1,80 @@
+import json
+import sys
+import pytest
+from loadgen import Route, compare, load_module, main, percentile, run_benchmark
+
+
+def test_route_parsing():
+    """
+    Las rutas se indican como 'MÉTODO RUTA [CUERPO_JSON]'
+    """
+    route = Route('post /tasks {"name": "Comprar pan"}')
+    assert route.method == "POST"
+    assert route.path == "/tasks"
+    assert json.loads(route.body) == {"name": "Comprar pan"}
+    assert route.headers == {"Content-Type": "application/json"}
+
+    with pytest.raises(ValueError):
+        Route("/tasks")
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert percentile(values, 0.50) == 50
+    assert percentile(values, 0.95) == 95
+    assert percentile(values, 0.99) == 99
+    assert percentile([], 0.5) is None
+
+
+def test_run_benchmark_http_server():
+    """
+    El benchmark arranca un servidor de http.server y mide cada ruta
+    """
+    result = run_benchmark("2a/ej2a1.py", clients=3, duration=1, requests=40, warmup=0)
+    assert set(result["routes"]) == {"GET /", "GET /missing"}
+    # 40 no es múltiplo de 3: el resto también se envía
+    assert result["total_requests"] == 40
+    for route in result["routes"].values():
+        assert route["errors"] == 0
+        assert route["p50_ms"] <= route["p95_ms"] <= route["p99_ms"]
+
+
+def test_load_module_keeps_imported_module(monkeypatch):
+    """
+    Cargar un ejercicio no sustituye al módulo del mismo nombre ya importado
+    """
+    imported = object()
+    monkeypatch.setitem(sys.modules, "ej2a1", imported)
+    module = load_module("2a/ej2a1.py")
+    assert sys.modules["ej2a1"] is imported
+    assert sys.modules[module.__name__] is module
+
+
+def test_run_benchmark_flask_app():
+    """
+    El benchmark arranca una aplicación Flask y admite rutas personalizadas
+    """
+    result = run_benchmark("2b/ej2b2.py", routes=["GET /greet/Ana"], clients=2, duration=1, requests=20, warmup=0)
+    assert list(result["routes"]) == ["GET /greet/Ana"]
+    assert result["routes"]["GET /greet/Ana"]["requests"] == 20
+
+
+def test_compare_detects_regressions():
+    baseline = {"routes": {"GET /": {"rps": 1000.0, "p99_ms": 2.0}}}
+    same = {"routes": {"GET /": {"rps": 980.0, "p99_ms": 2.1}}}
+    slower = {"routes": {"GET /": {"rps": 700.0, "p99_ms": 5.0}}}
+    assert compare(same, baseline) == []
+    assert len(compare(slower, baseline)) == 2
+
+
+def test_main_saves_and_compares_results(tmp_path):
+    """
+    Los resultados se guardan en JSON y sirven de línea base para la siguiente ejecución
+    """
+    output = tmp_path / "base.json"
+    args = ["2a/ej2a1.py", "--clients", "1", "--requests", "10", "--warmup", "0"]
+    assert main(args + ["--output", str(output)]) == 0
+    report = json.loads(output.read_text())
+    assert report["results"][0]["target"] == "2a/ej2a1.py"
+    # Con un umbral enorme la comparación no puede marcar regresiones
+    assert main(args + ["--compare", str(output), "--threshold", "100000"]) == 0
@@ -0,0 +1,9 @@
+"""
+Módulos compartidos por los ejercicios de varios apartados: compresión de
+respuestas, caché de respuestas, envío por partes y el almacén de registros
+(con su persistencia y su paginación).
+
+Se importa desde la raíz del repositorio (from comun.compression import
+...): pytest la añade a sys.path (pytest.ini), y los ejercicios que lo usan la
+añaden también al empezar, para poder ejecutarlos como script.
+"""
@@ -0,0 +1,250 @@
+"""
+Compresión gzip/deflate negociada con Accept-Encoding.
+
+Compressor elige la codificación que acepta el cliente (según sus valores q),
+comprime solo los cuerpos que superan min_size y guarda las variantes
+comprimidas en una ResponseCache, para no volver a comprimir el mismo cuerpo.
+La clave de la caché es un resumen blake2b del cuerpo: calcularlo es mucho más
+barato que comprimir y, al depender solo de los bytes, una variante nunca se
+sirve con un cuerpo distinto del que se comprimió (una clave como el ETag
+podría emparejar la versión nueva con el cuerpo anterior).
+
+Sirve tanto para los manejadores de http.server (apartado 2a) como para las
+aplicaciones Flask, con init_compression. Las respuestas Flask enviadas por
+partes (listas completas de tareas o animales) se comprimen también por
+partes con compress_stream, sin reunir el cuerpo en memoria.
+
+Al comprimir, un ETag fuerte se convierte en débil (W/"..."), como hace
+nginx: la representación comprimida no es idéntica byte a byte, pero las
+comprobaciones de If-None-Match usan la comparación débil y siguen
+funcionando con el mismo ETag.
+"""
+
+import gzip
+import hashlib
+import zlib
+
+from .response_cache import ResponseCache
+
+# Codificaciones soportadas, en orden de preferencia ante la misma q
+ENCODINGS = ("gzip", "deflate")
+
+# Tamaño mínimo (en bytes) a partir del cual compensa comprimir el cuerpo
+DEFAULT_MIN_SIZE = 1024
+
+# Nivel de compresión por defecto (1 = más rápido, 9 = más compacto)
+DEFAULT_LEVEL = 6
+
+# Tipos de contenido que se comprimen (los binarios suelen estar ya comprimidos)
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/xml")
+
+
+def parse_accept_encoding(header):
+    """
+    Devuelve un diccionario {codificación: q} a partir de Accept-Encoding
+    """
+    accepted = {}
+    for item in (header or "").split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def choose_encoding(header):
+    """
+    Devuelve la codificación soportada con mayor q en Accept-Encoding, o None
+    """
+    accepted = parse_accept_encoding(header)
+    best = None
+    best_q = 0.0
+    for encoding in ENCODINGS:
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body, encoding, level=DEFAULT_LEVEL):
+    """
+    Comprime el cuerpo con gzip o deflate (formato zlib, como exige HTTP)
+    """
+    if encoding == "gzip":
+        # mtime=0: la misma entrada produce siempre los mismos bytes
+        return gzip.compress(body, compresslevel=level, mtime=0)
+    if encoding == "deflate":
+        return zlib.compress(body, level)
+    raise ValueError(f"Codificación no soportada: {encoding!r}")
+
+
+def compress_stream(chunks, encoding, level=DEFAULT_LEVEL):
+    """
+    Comprime, trozo a trozo, un cuerpo que se genera por partes.
+
+    Cada trozo se vacía con Z_SYNC_FLUSH, de modo que el cliente puede
+    descomprimir lo recibido sin esperar al final del cuerpo.
+    """
+    if encoding == "gzip":
+        # 16 + MAX_WBITS: cabecera y cola gzip (con mtime 0, como compress)
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    elif encoding == "deflate":
+        compressor = zlib.compressobj(level)
+    else:
+        raise ValueError(f"Codificación no soportada: {encoding!r}")
+    for chunk in chunks:
+        if chunk:
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+def is_compressible(content_type):
+    content_type = (content_type or "").lower()
+    return any(content_type.startswith(prefix) for prefix in COMPRESSIBLE_TYPES)
+
+
+def weaken_etag(etag):
+    if etag and not etag.startswith("W/"):
+        return "W/" + etag
+    return etag
+
+
+class Compressor:
+    """
+    Compresión configurable con caché de variantes comprimidas.
+
+    - level: nivel de compresión de gzip/deflate.
+    - min_size: los cuerpos más pequeños se envían sin comprimir.
+    - max_bytes: presupuesto de memoria de la caché de variantes.
+    """
+
+    def __init__(self, level=DEFAULT_LEVEL, min_size=DEFAULT_MIN_SIZE, max_bytes=None):
+        if not 0 <= level <= 9:
+            raise ValueError("level debe estar entre 0 y 9")
+        self.level = level
+        self.min_size = min_size
+        self.cache = ResponseCache() if max_bytes is None else ResponseCache(max_bytes)
+
+    def negotiate(self, accept_encoding, body, content_type):
+        """
+        Devuelve la codificación con la que enviar el cuerpo, o None para enviarlo tal cual
+        """
+        if len(body) < self.min_size or not is_compressible(content_type):
+            return None
+        return choose_encoding(accept_encoding)
+
+    def compress(self, body, encoding):
+        """
+        Devuelve el cuerpo comprimido, reutilizando la variante guardada si la hay
+        """
+        key = hashlib.blake2b(body, digest_size=16).digest()
+        return self.cache.get_or_build(
+            (key, encoding), lambda: compress(body, encoding, self.level)
+        ).body
+
+
+class CompressionHandlerMixin:
+    """
+    Mixin para manejadores BaseHTTPRequestHandler que comprime las respuestas
+    con el Compressor del servidor (server.compressor), si lo tiene
+    """
+
+    def response_vary(self, content_type, vary=()):
+        """
+        Devuelve las cabeceras de Vary de una respuesta de ese tipo: vary más
+        Accept-Encoding si el cuerpo podría ir comprimido. Una respuesta 304
+        debe llevar las mismas que la respuesta completa.
+        """
+        if getattr(self.server, "compressor", None) is not None and is_compressible(content_type):
+            return (*vary, 'Accept-Encoding')
+        return tuple(vary)
+
+    def send_body(self, status, content_type, body, etag=None, content_length=None, vary=()):
+        """
+        Envía el cuerpo, comprimido si el cliente lo acepta y merece la pena.
+
+        vary son las cabeceras de la petición de las que depende el cuerpo,
+        además de Accept-Encoding.
+        """
+        compressor = getattr(self.server, "compressor", None)
+        encoding = None
+        if compressor is not None:
+            encoding = compressor.negotiate(self.headers.get("Accept-Encoding"), body, content_type)
+            if encoding:
+                body = compressor.compress(body, encoding)
+                content_length = None
+                etag = weaken_etag(etag)
+        self.send_response(status)
+        self.send_header('Content-type', content_type)
+        self.send_header('Content-Length', content_length or str(len(body)))
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        vary = self.response_vary(content_type, vary)
+        if vary:
+            self.send_header('Vary', ', '.join(vary))
+        if etag:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _weaken_response_etag(response):
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+
+
+def init_compression(app, level=None, min_size=None):
+    """
+    Comprime las respuestas de una aplicación Flask.
+
+    Si no se indican level o min_size se leen de app.config
+    (COMPRESSION_LEVEL, COMPRESSION_MIN_SIZE), igual que el presupuesto de la
+    caché (COMPRESSION_CACHE_BYTES). Devuelve el Compressor.
+    """
+    compressor = Compressor(
+        level=app.config.get("COMPRESSION_LEVEL", DEFAULT_LEVEL) if level is None else level,
+        min_size=app.config.get("COMPRESSION_MIN_SIZE", DEFAULT_MIN_SIZE) if min_size is None else min_size,
+        max_bytes=app.config.get("COMPRESSION_CACHE_BYTES"),
+    )
+    app.extensions["compression"] = compressor
+
+    from flask import request
+
+    @app.after_request
+    def compress_response(response):
+        if (
+            response.direct_passthrough
+            or not 200 <= response.status_code < 300
+            or "Content-Encoding" in response.headers
+            or not is_compressible(response.mimetype)
+        ):
+            return response
+        response.vary.add("Accept-Encoding")
+        if response.is_streamed:
+            # El tamaño no se conoce: un cuerpo por partes se supone grande
+            encoding = choose_encoding(request.headers.get("Accept-Encoding"))
+            if encoding:
+                response.response = compress_stream(response.iter_encoded(), encoding, compressor.level)
+                response.headers.pop("Content-Length", None)
+                response.headers["Content-Encoding"] = encoding
+                _weaken_response_etag(response)
+            return response
+        body = response.get_data()
+        encoding = compressor.negotiate(request.headers.get("Accept-Encoding"), body, response.mimetype)
+        if encoding:
+            response.set_data(compressor.compress(body, encoding))
+            response.headers["Content-Encoding"] = encoding
+            _weaken_response_etag(response)
+        return response
+
+    return compressor
@@ -0,0 +1,52 @@
+import gzip
+import zlib
+from comun.compression import Compressor, choose_encoding, compress, compress_stream, parse_accept_encoding
+
+
+def test_accept_encoding_q_values():
+    """
+    Se elige la codificación soportada con mayor q; q=0 la excluye
+    """
+    assert parse_accept_encoding("gzip;q=0.5, br") == {"gzip": 0.5, "br": 1.0}
+    assert choose_encoding("gzip, deflate") == "gzip"
+    assert choose_encoding("gzip;q=0.2, deflate;q=0.8") == "deflate"
+    assert choose_encoding("*;q=0.5, gzip;q=0") == "deflate"
+    assert choose_encoding("br") is None
+    assert choose_encoding(None) is None
+
+
+def test_compress_round_trip():
+    body = b'{"products": []}' * 100
+    assert gzip.decompress(compress(body, "gzip", level=1)) == body
+    assert zlib.decompress(compress(body, "deflate")) == body
+
+
+def test_compress_stream_round_trip():
+    """
+    Cada trozo comprimido se puede descomprimir en cuanto llega
+    """
+    chunks = [b'{"id": %d}' % i * 50 for i in range(20)]
+    compressed = list(compress_stream(iter(chunks), "gzip"))
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    assert decompressor.decompress(compressed[0]) == chunks[0]
+    assert gzip.decompress(b"".join(compressed)) == b"".join(chunks)
+    assert zlib.decompress(b"".join(compress_stream(iter(chunks), "deflate"))) == b"".join(chunks)
+
+
+def test_negotiate_respects_threshold_and_content_type():
+    compressor = Compressor(min_size=100)
+    assert compressor.negotiate("gzip", b"x" * 99, "application/json") is None
+    assert compressor.negotiate("gzip", b"x" * 100, "application/json") == "gzip"
+    assert compressor.negotiate("gzip", b"x" * 100, "image/png") is None
+
+
+def test_compressed_variants_are_cached():
+    """
+    El mismo cuerpo no se comprime dos veces para la misma codificación
+    """
+    compressor = Compressor(min_size=0)
+    body = b"hola " * 500
+    first = compressor.compress(body, "gzip")
+    assert compressor.compress(bytes(body), "gzip") is first
+    assert compressor.compress(body, "deflate") is not first
+    assert (compressor.cache.hits, compressor.cache.misses) == (1, 2)
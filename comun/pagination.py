@@ -0,0 +1,70 @@
+"""
+Paginación por cursor de colecciones guardadas en un RecordStore.
+
+GET /tasks y GET /animals devolvían la colección completa con jsonify,
+construyendo una sola cadena con todos los registros. Con los parámetros
+limit y cursor se devuelve una página:
+
+    {"<colección>": [...], "next_cursor": "..."}
+
+next_cursor es null en la última página. El cursor es opaco para el cliente
+y codifica el último id devuelto. Como los ids son crecientes, la página
+siguiente empieza justo después de él aunque entretanto se creen o borren
+registros: no se repiten ni se saltan elementos.
+
+Sin parámetros se devuelve la colección completa como antes, pero se envía
+por partes (streaming.iter_json_array) en lugar de serializarla de una vez.
+"""
+
+import base64
+import binascii
+
+# Tamaño de página cuando se pasa cursor sin limit, y tamaño máximo permitido
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+
+def encode_cursor(record_id):
+    return base64.urlsafe_b64encode(f"id:{record_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Devuelve el id que codifica el cursor. Lanza ValueError si no es válido.
+    """
+    try:
+        text = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except (binascii.Error, UnicodeDecodeError):
+        raise ValueError(f"Cursor no válido: {cursor!r}") from None
+    prefix, _, record_id = text.partition(":")
+    if prefix != "id" or not record_id.isdigit():
+        raise ValueError(f"Cursor no válido: {cursor!r}")
+    return int(record_id)
+
+
+def parse_page_args(args):
+    """
+    Lee limit y cursor de los parámetros de la URL y devuelve (after_id,
+    limit), o None si no se pide paginación. Lanza ValueError si no son
+    válidos; limit se recorta a MAX_LIMIT.
+    """
+    limit = args.get("limit")
+    cursor = args.get("cursor")
+    if limit is None and cursor is None:
+        return None
+    if limit is None:
+        limit = DEFAULT_LIMIT
+    elif not limit.isdigit() or int(limit) < 1:
+        raise ValueError("limit debe ser un entero positivo")
+    after_id = decode_cursor(cursor) if cursor else None
+    return after_id, min(int(limit), MAX_LIMIT)
+
+
+def page_body(store, name, after_id, limit):
+    """
+    Devuelve el cuerpo (un diccionario) de la página de store que empieza
+    después de after_id, con los registros bajo la clave name
+    """
+    records, more = store.page(after_id, limit)
+    next_cursor = encode_cursor(records[-1]["id"]) if more else None
+    return {name: list(records), "next_cursor": next_cursor}
@@ -0,0 +1,43 @@
+import pytest
+from comun.pagination import MAX_LIMIT, decode_cursor, encode_cursor, page_body, parse_page_args
+from comun.record_store import RecordStore
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(42)
+    assert "42" not in cursor
+    assert decode_cursor(cursor) == 42
+    for invalid in ("", "%%%", encode_cursor("x"), "aWQ6"):
+        with pytest.raises(ValueError):
+            decode_cursor(invalid)
+
+
+def test_parse_page_args():
+    assert parse_page_args({}) is None
+    assert parse_page_args({"limit": "10"}) == (None, 10)
+    assert parse_page_args({"limit": "5000"}) == (None, MAX_LIMIT)
+    assert parse_page_args({"cursor": encode_cursor(7)}) == (7, 100)
+    for args in ({"limit": "0"}, {"limit": "-1"}, {"limit": "abc"}, {"cursor": "???"}):
+        with pytest.raises(ValueError):
+            parse_page_args(args)
+
+
+def test_pages_are_stable_under_inserts_and_deletes():
+    """
+    Recorrer las páginas mientras se crean y borran registros no repite ni
+    salta ninguno de los que existían al empezar
+    """
+    store = RecordStore()
+    for i in range(10):
+        store.add({"name": str(i)})
+    seen = []
+    body = page_body(store, "tasks", None, 3)
+    while True:
+        seen.extend(record["id"] for record in body["tasks"])
+        if body["next_cursor"] is None:
+            break
+        store.delete(seen[-1])
+        store.add({"name": "nueva"})
+        body = page_body(store, "tasks", decode_cursor(body["next_cursor"]), 3)
+    assert seen[:10] == list(range(1, 11))
+    assert len(seen) == len(set(seen))
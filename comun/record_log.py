@@ -0,0 +1,305 @@
+"""
+Persistencia de un RecordStore: registro de escritura anticipada (WAL) de
+solo añadido e instantáneas compactadas.
+
+Reescribir un fichero JSON con todos los registros en cada cambio cuesta
+O(n) por escritura. Aquí cada cambio añade una línea JSON al final del
+segmento actual del registro ("wal-<generación>.log"):
+
+    ["add", 7, {"name": "Comprar pan"}]
+    ["update", 7, {"name": "Comprar leche"}]
+    ["delete", 7, null]
+
+Cuándo llegan los cambios al disco depende de fsync:
+
+- "always": cada escritura espera a su fsync antes de responder. Los hilos
+  que escriben a la vez comparten el mismo fsync (confirmación en grupo):
+  el primero que llega sincroniza todo lo escrito hasta ese momento y los
+  demás encuentran su entrada ya en disco.
+- "interval": las escrituras solo esperan a que el sistema operativo tenga
+  los datos, y un hilo hace fsync cada fsync_interval segundos. Si cae la
+  máquina (no el proceso) se pierden como mucho esos segundos.
+- "never": el sistema operativo decide cuándo escribir en disco.
+
+Cada snapshot_every entradas se guarda una instantánea compactada
+("snapshot-<generación>.ndjson": una línea de cabecera con next_id y una
+línea por registro) y se borran los segmentos que ya contiene. Así el
+arranque lee la última instantánea y solo reproduce la cola del registro.
+La instantánea se escribe en un fichero temporal que se renombra al
+terminar, de modo que nunca queda una a medias. Si el proceso muere a
+mitad de escribir una entrada, la línea incompleta se descarta al cargar.
+"""
+
+import itertools
+import json
+import os
+import re
+import threading
+
+from .record_store import RecordStore
+
+# Modos de sincronización con el disco
+FSYNC_MODES = ("always", "interval", "never")
+
+# Segundos entre fsync en el modo "interval"
+DEFAULT_FSYNC_INTERVAL = 1.0
+
+# Entradas del registro tras las que se guarda una instantánea
+DEFAULT_SNAPSHOT_EVERY = 100000
+
+# Líneas que se decodifican de una vez al cargar (una sola llamada a json.loads)
+LOAD_BATCH_LINES = 10000
+
+_FILE_NAME = re.compile(r"^(wal|snapshot)-(\d{8})\.(log|ndjson)$")
+
+
+def _path(directory, kind, generation):
+    extension = "log" if kind == "wal" else "ndjson"
+    return os.path.join(directory, f"{kind}-{generation:08d}.{extension}")
+
+
+def _generations(directory, kind):
+    """
+    Devuelve, ordenadas, las generaciones de los ficheros de ese tipo
+    """
+    generations = []
+    for name in os.listdir(directory):
+        match = _FILE_NAME.match(name)
+        if match and match.group(1) == kind:
+            generations.append(int(match.group(2)))
+    return sorted(generations)
+
+
+def _fsync_directory(directory):
+    """
+    Lleva a disco las altas, bajas y renombrados de ficheros del directorio
+    """
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _read_entries(lines):
+    """
+    Genera las entradas JSON de las líneas, decodificándolas por bloques.
+
+    Se detiene en la primera línea que no es JSON válido: solo puede ser la
+    última, a medio escribir cuando terminó el proceso.
+    """
+    batch = []
+    for line in itertools.chain(lines, [None]):
+        if line is not None:
+            batch.append(line)
+            if len(batch) < LOAD_BATCH_LINES:
+                continue
+        if not batch:
+            break
+        try:
+            yield from json.loads("[" + ",".join(batch) + "]")
+        except ValueError:
+            for entry in batch:
+                try:
+                    yield json.loads(entry)
+                except ValueError:
+                    return
+            return
+        batch = []
+
+
+def load(directory):
+    """
+    Reconstruye el estado guardado en directory a partir de la última
+    instantánea y de los segmentos del registro posteriores.
+
+    Devuelve (registros, next_id, última generación, entradas reproducidas).
+    """
+    records = {}
+    next_id = 1
+    start = 0
+    snapshots = _generations(directory, "snapshot")
+    if snapshots:
+        start = snapshots[-1]
+        with open(_path(directory, "snapshot", start), encoding="utf-8") as snapshot:
+            next_id = json.loads(snapshot.readline())["next_id"]
+            for record in _read_entries(snapshot):
+                records[record["id"]] = record
+
+    replayed = 0
+    segments = [generation for generation in _generations(directory, "wal") if generation >= start]
+    for generation in segments:
+        with open(_path(directory, "wal", generation), encoding="utf-8") as segment:
+            for action, record_id, fields in _read_entries(segment):
+                if action == "add":
+                    records[record_id] = {"id": record_id, **fields}
+                    next_id = max(next_id, record_id + 1)
+                elif action == "update":
+                    if record_id in records:
+                        records[record_id] = {**records[record_id], **fields}
+                else:
+                    records.pop(record_id, None)
+                replayed += 1
+    return list(records.values()), next_id, max(segments + [start]), replayed
+
+
+def open_store(directory, fsync="always", fsync_interval=DEFAULT_FSYNC_INTERVAL,
+               snapshot_every=DEFAULT_SNAPSHOT_EVERY):
+    """
+    Abre (o crea) el almacén persistente guardado en directory y devuelve un
+    RecordStore cuyos cambios se anotan en su registro
+    """
+    os.makedirs(directory, exist_ok=True)
+    for name in os.listdir(directory):
+        if name.endswith(".tmp"):
+            os.remove(os.path.join(directory, name))
+    records, next_id, generation, replayed = load(directory)
+    # Se empieza siempre un segmento nuevo: el anterior puede acabar en una línea incompleta
+    journal = RecordLog(directory, generation + 1, fsync, fsync_interval, snapshot_every)
+    store = RecordStore(records, next_id, journal=journal)
+    if snapshot_every is not None and replayed >= snapshot_every:
+        store.compact()
+    return store
+
+
+class RecordLog:
+    """
+    Registro de escritura anticipada de un RecordStore
+    """
+
+    def __init__(self, directory, generation, fsync="always", fsync_interval=DEFAULT_FSYNC_INTERVAL,
+                 snapshot_every=DEFAULT_SNAPSHOT_EVERY):
+        if fsync not in FSYNC_MODES:
+            raise ValueError(f"fsync debe ser uno de {FSYNC_MODES}")
+        self.directory = directory
+        self.fsync = fsync
+        self.snapshot_every = snapshot_every
+        # _lock protege el fichero y los contadores; _sync_lock hace que haya
+        # un solo fsync a la vez (se toma siempre antes que _lock)
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._seq = 0
+        self._flushed = 0
+        self._synced = 0
+        self._since_snapshot = 0
+        self._compacting = False
+        self._open_segment(generation)
+        self._stop = threading.Event()
+        self._syncer = None
+        if fsync == "interval":
+            self._syncer = threading.Thread(target=self._sync_periodically, args=(fsync_interval,), daemon=True)
+            self._syncer.start()
+
+    def _open_segment(self, generation):
+        self.generation = generation
+        self._file = open(_path(self.directory, "wal", generation), "a", encoding="utf-8")
+        _fsync_directory(self.directory)
+
+    def append(self, action, record_id, fields):
+        """
+        Añade una entrada al registro (sin esperar al disco) y devuelve su número
+        """
+        line = json.dumps([action, record_id, fields], ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._file.write(line + "\n")
+            self._seq += 1
+            self._since_snapshot += 1
+            return self._seq
+
+    def commit(self, seq):
+        """
+        Espera a que la entrada seq, y todas las anteriores, estén escritas
+        según el modo fsync
+        """
+        if self.fsync == "always":
+            self.sync(seq)
+            return
+        with self._lock:
+            if self._flushed < seq:
+                self._file.flush()
+                self._flushed = self._seq
+
+    def sync(self, seq=None):
+        """
+        Lleva a disco las entradas hasta seq (todas si es None). Si otro hilo
+        ya las ha sincronizado no hace nada.
+        """
+        with self._sync_lock:
+            if seq is not None and self._synced >= seq:
+                return
+            with self._lock:
+                if self._file.closed:
+                    return
+                self._file.flush()
+                self._flushed = target = self._seq
+                fileno = self._file.fileno()
+            # El fsync se hace sin _lock, para que se puedan seguir añadiendo entradas
+            os.fsync(fileno)
+            self._synced = target
+
+    def _sync_periodically(self, interval):
+        while not self._stop.wait(interval):
+            self.sync()
+
+    def should_compact(self):
+        """
+        Indica si toca guardar una instantánea y, si es así, marca que hay una en curso
+        """
+        with self._lock:
+            if self.snapshot_every is None or self._compacting or self._since_snapshot < self.snapshot_every:
+                return False
+            self._compacting = True
+            return True
+
+    def rotate(self):
+        """
+        Cierra el segmento actual, empieza uno nuevo y devuelve su generación.
+
+        Debe llamarse dentro del cerrojo del almacén, al tomar el estado que
+        se guardará en la instantánea de esa generación.
+        """
+        with self._sync_lock, self._lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._synced = self._flushed = self._seq
+            self._since_snapshot = 0
+            self._open_segment(self.generation + 1)
+            return self.generation
+
+    def write_snapshot(self, records, next_id, generation):
+        """
+        Guarda la instantánea de generation y borra los segmentos e
+        instantáneas anteriores, que ya contiene
+        """
+        path = _path(self.directory, "snapshot", generation)
+        try:
+            with open(path + ".tmp", "w", encoding="utf-8") as snapshot:
+                snapshot.write(json.dumps({"next_id": next_id}) + "\n")
+                dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+                for record in records:
+                    snapshot.write(dumps(record) + "\n")
+                snapshot.flush()
+                os.fsync(snapshot.fileno())
+            os.replace(path + ".tmp", path)
+            _fsync_directory(self.directory)
+            for kind in ("wal", "snapshot"):
+                for old in _generations(self.directory, kind):
+                    if old < generation:
+                        os.remove(_path(self.directory, kind, old))
+        finally:
+            with self._lock:
+                self._compacting = False
+
+    def close(self):
+        """
+        Detiene el hilo de sincronización, lleva a disco lo pendiente y cierra el segmento
+        """
+        self._stop.set()
+        if self._syncer is not None:
+            self._syncer.join()
+        self.sync()
+        with self._lock:
+            self._file.close()
@@ -0,0 +1,126 @@
+import os
+import threading
+import time
+
+import pytest
+from comun.record_log import RecordLog, load, open_store
+
+
+def test_changes_survive_reopen(tmp_path):
+    store = open_store(str(tmp_path))
+    store.add({"name": "a"})
+    store.add({"name": "b"})
+    store.apply([("update", 1, {"name": "A"}), ("add", None, {"name": "c"}), ("delete", 3, None)])
+    store.close()
+
+    store = open_store(str(tmp_path))
+    assert store.all() == ({"id": 1, "name": "A"}, {"id": 2, "name": "b"})
+    assert store.add({"name": "d"})["id"] == 4, "Los ids borrados no se reutilizan tras reiniciar"
+    store.close()
+
+
+def test_torn_last_entry_is_ignored(tmp_path):
+    """
+    Una entrada a medio escribir al morir el proceso se descarta al cargar
+    """
+    store = open_store(str(tmp_path), fsync="never")
+    store.add({"name": "a"})
+    store.close()
+    segment = next(name for name in os.listdir(tmp_path) if name.startswith("wal-"))
+    with open(tmp_path / segment, "a", encoding="utf-8") as wal:
+        wal.write('["add",2,{"na')
+
+    store = open_store(str(tmp_path))
+    assert store.all() == ({"id": 1, "name": "a"},)
+    store.add({"name": "b"})
+    store.close()
+    assert [r["name"] for r in load(str(tmp_path))[0]] == ["a", "b"]
+
+
+def test_compact_replaces_old_segments(tmp_path):
+    store = open_store(str(tmp_path), snapshot_every=None)
+    for i in range(20):
+        store.add({"name": str(i)})
+    store.delete(5)
+    store.compact()
+    store.add({"name": "tail"})
+    store.close()
+
+    names = sorted(os.listdir(tmp_path))
+    assert len([name for name in names if name.startswith("snapshot-")]) == 1
+    records, next_id, _, replayed = load(str(tmp_path))
+    assert replayed == 1, "Solo se reproduce la cola posterior a la instantánea"
+    assert len(records) == 20 and next_id == 22
+    assert 5 not in {record["id"] for record in records}
+
+
+def test_snapshot_is_taken_automatically(tmp_path):
+    store = open_store(str(tmp_path), snapshot_every=50)
+    for i in range(120):
+        store.add({"name": str(i)})
+    deadline = time.monotonic() + 5
+    while not any(name.startswith("snapshot-") for name in os.listdir(tmp_path)):
+        assert time.monotonic() < deadline, "Se debe guardar una instantánea"
+        time.sleep(0.01)
+    store.close()
+    assert len(load(str(tmp_path))[0]) == 120
+
+
+def test_close_waits_for_background_compaction(tmp_path, monkeypatch):
+    """
+    close espera a la compactación lanzada por una escritura, que si no
+    rotaría un segmento ya cerrado
+    """
+    real_rotate = RecordLog.rotate
+
+    def slow_rotate(self):
+        time.sleep(0.2)
+        return real_rotate(self)
+
+    monkeypatch.setattr(RecordLog, "rotate", slow_rotate)
+    store = open_store(str(tmp_path), snapshot_every=10)
+    for i in range(10):
+        store.add({"name": str(i)})
+    store.close()
+    assert any(name.startswith("snapshot-") for name in os.listdir(tmp_path))
+    assert len(load(str(tmp_path))[0]) == 10
+
+
+def test_concurrent_writes_are_all_durable(tmp_path, monkeypatch):
+    """
+    Muchos hilos escribiendo a la vez con fsync="always": los que esperan
+    mientras otro hace fsync comparten el siguiente, así que hay menos fsync
+    que escrituras, y ninguna escritura confirmada se pierde
+    """
+    store = open_store(str(tmp_path), fsync="always")
+    syncs = []
+    real_fsync = os.fsync
+
+    def counting_fsync(fd):
+        syncs.append(fd)
+        # Un fsync de un disco real, no el de un sistema de ficheros en memoria
+        time.sleep(0.001)
+        real_fsync(fd)
+
+    monkeypatch.setattr(os, "fsync", counting_fsync)
+    threads = [
+        threading.Thread(target=lambda: [store.add({"name": "x"}) for _ in range(50)])
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(syncs) < 400
+    records, _, _, _ = load(str(tmp_path))
+    assert len(records) == 400
+    store.close()
+
+
+def test_interval_mode_syncs_in_background(tmp_path):
+    store = open_store(str(tmp_path), fsync="interval", fsync_interval=0.01)
+    store.add({"name": "a"})
+    assert len(load(str(tmp_path))[0]) == 1, "La entrada está en el sistema operativo al responder"
+    store.close()
+    with pytest.raises(ValueError):
+        open_store(str(tmp_path), fsync="sometimes")
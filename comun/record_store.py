@@ -0,0 +1,236 @@
+"""
+Almacén en memoria de registros con id entero (tareas, animales...).
+
+Las APIs de ej2c2 guardaban las tareas en una lista: para modificar o borrar
+una tarea había que recorrerla entera, y el borrado además construía una
+lista nueva, así que cada cambio costaba O(n). Aquí los registros se guardan
+en un diccionario id -> registro, que conserva el orden de inserción: get,
+update y delete son O(1) y all devuelve los registros en el orden en que se
+crearon, como la lista.
+
+Los ids se asignan de forma creciente a partir de next_id y no se reutilizan
+aunque se borre el último registro, así que el orden de inserción es también
+el orden de los ids. Por eso page puede paginar con el último id devuelto
+como cursor: las altas van siempre detrás y los borrados no desplazan las
+páginas siguientes. page busca el cursor con bisect en una lista ordenada de
+ids y recorre solo la página pedida, así que su coste depende de limit y no
+del tamaño del almacén. Los borrados dejan su id en esa lista (la lista se
+rehace cuando más de la mitad de sus ids ya no existen), de modo que delete
+sigue siendo O(1) amortizado.
+
+El almacén es seguro entre hilos. Las escrituras se serializan con un
+cerrojo, que también protege la asignación de ids, y nunca modifican un
+registro ya publicado: update lo sustituye por una copia. Las lecturas no
+toman el cerrojo. get consulta el diccionario directamente, y all devuelve
+una instantánea inmutable (una tupla) que se reutiliza mientras no haya
+escrituras. Quien lee nunca ve una colección a medio modificar.
+
+Con un journal (record_log.RecordLog) cada cambio se anota en el registro
+de escritura anticipada dentro del cerrojo, en el mismo orden en que se
+aplica, y se confirma al soltarlo. Para abrir un almacén persistente se
+usa record_log.open_store.
+"""
+
+import bisect
+import threading
+
+# Ids borrados que puede acumular la lista ordenada de page antes de rehacerla
+# (siempre que sean además más de la mitad de la lista)
+MIN_STALE_IDS = 1024
+
+
+class RecordStore:
+    """
+    Registros indexados por su campo "id", en orden de inserción
+    """
+
+    def __init__(self, records=(), next_id=1, journal=None):
+        self._records = {}
+        self._ids = []
+        self._stale_ids = 0
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._journal = journal
+        self._journal_seq = 0
+        self._compactor = None
+        self.next_id = next_id
+        last_id = None
+        for record in records:
+            record_id = record["id"]
+            if last_id is not None and record_id <= last_id:
+                raise ValueError(f"Los ids deben ser crecientes y sin duplicados: {record_id}")
+            self._records[record_id] = record
+            self._ids.append(record_id)
+            self.next_id = max(self.next_id, record_id + 1)
+            last_id = record_id
+
+    def add(self, fields):
+        """
+        Crea un registro con los campos indicados y el siguiente id, y lo devuelve
+        """
+        return self._write(self._add, fields)
+
+    def _write(self, operation, *args):
+        """
+        Ejecuta la operación dentro del cerrojo y, si hay journal, confirma
+        sus entradas al soltarlo: varios hilos pueden esperar al mismo fsync
+        """
+        with self._lock:
+            result = operation(*args)
+            seq = self._journal_seq
+        journal = self._journal
+        if journal is not None:
+            journal.commit(seq)
+            if journal.should_compact():
+                self._compactor = threading.Thread(target=self.compact, daemon=True)
+                self._compactor.start()
+        return result
+
+    def _log(self, action, record_id, fields):
+        if self._journal is not None:
+            self._journal_seq = self._journal.append(action, record_id, fields)
+
+    def _add(self, fields):
+        record = {"id": self.next_id, **fields}
+        self._records[record["id"]] = record
+        self._ids.append(record["id"])
+        self.next_id += 1
+        self._snapshot = None
+        self._log("add", record["id"], fields)
+        return record
+
+    def get(self, record_id):
+        """
+        Devuelve el registro con ese id, o None si no existe
+        """
+        return self._records.get(record_id)
+
+    def update(self, record_id, changes):
+        """
+        Modifica los campos indicados de un registro y lo devuelve, o None si
+        no existe. El id no se puede cambiar.
+        """
+        if "id" in changes and changes["id"] != record_id:
+            raise ValueError("No se puede cambiar el id de un registro")
+        return self._write(self._update, record_id, changes)
+
+    def _update(self, record_id, changes):
+        record = self._records.get(record_id)
+        if record is None:
+            return None
+        record = self._records[record_id] = {**record, **changes}
+        self._snapshot = None
+        self._log("update", record_id, changes)
+        return record
+
+    def delete(self, record_id):
+        """
+        Elimina el registro y lo devuelve, o None si no existía
+        """
+        return self._write(self._delete, record_id)
+
+    def _delete(self, record_id):
+        record = self._records.pop(record_id, None)
+        if record is not None:
+            self._snapshot = None
+            self._stale_ids += 1
+            if self._stale_ids > MIN_STALE_IDS and self._stale_ids * 2 > len(self._ids):
+                self._ids = list(self._records)
+                self._stale_ids = 0
+            self._log("delete", record_id, None)
+        return record
+
+    def apply(self, operations):
+        """
+        Aplica en una sola pasada, tomando el cerrojo una única vez, una
+        secuencia de operaciones (acción, id, campos):
+
+        - ("add", None, campos)
+        - ("update", id, cambios)
+        - ("delete", id, None)
+
+        Devuelve una lista con el resultado de cada operación, en el mismo
+        orden: el registro creado, modificado o borrado, o None si no existía.
+        """
+        operations = list(operations)
+        for action, record_id, fields in operations:
+            if action not in ("add", "update", "delete"):
+                raise ValueError(f"Operación no válida: {action!r}")
+            if action == "update" and "id" in fields and fields["id"] != record_id:
+                raise ValueError("No se puede cambiar el id de un registro")
+        return self._write(self._apply, operations)
+
+    def _apply(self, operations):
+        results = []
+        for action, record_id, fields in operations:
+            if action == "add":
+                results.append(self._add(fields))
+            elif action == "update":
+                results.append(self._update(record_id, fields))
+            else:
+                results.append(self._delete(record_id))
+        return results
+
+    def compact(self):
+        """
+        Guarda en el journal una instantánea de todos los registros, que
+        sustituye a las entradas anteriores del registro
+        """
+        if self._journal is None:
+            return
+        with self._lock:
+            records = tuple(self._records.values())
+            next_id = self.next_id
+            generation = self._journal.rotate()
+        # Los registros publicados no se modifican: se pueden escribir sin el cerrojo
+        self._journal.write_snapshot(records, next_id, generation)
+
+    def close(self):
+        """
+        Cierra el journal, si lo hay, tras llevar a disco las entradas pendientes
+        y esperar a la compactación en curso
+        """
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+        if self._journal is not None:
+            self._journal.close()
+
+    def all(self):
+        """
+        Devuelve una tupla con todos los registros, en orden de inserción
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                snapshot = self._snapshot
+                if snapshot is None:
+                    snapshot = self._snapshot = tuple(self._records.values())
+        return snapshot
+
+    def page(self, after_id=None, limit=100):
+        """
+        Devuelve (registros, hay_más): hasta limit registros con id mayor que
+        after_id (desde el principio si es None), en orden
+        """
+        records = []
+        with self._lock:
+            ids = self._ids
+            start = 0 if after_id is None else bisect.bisect_right(ids, after_id)
+            for index in range(start, len(ids)):
+                record = self._records.get(ids[index])
+                if record is None:
+                    continue
+                if len(records) == limit:
+                    return tuple(records), True
+                records.append(record)
+        return tuple(records), False
+
+    def __contains__(self, record_id):
+        return record_id in self._records
+
+    def __len__(self):
+        return len(self._records)
+
+    def __iter__(self):
+        return iter(self.all())
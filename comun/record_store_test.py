@@ -0,0 +1,139 @@
+import threading
+
+import pytest
+from comun.record_store import RecordStore
+
+
+def test_add_assigns_increasing_ids():
+    store = RecordStore()
+    assert store.add({"name": "a"}) == {"id": 1, "name": "a"}
+    assert store.add({"name": "b"})["id"] == 2
+    store.delete(2)
+    assert store.add({"name": "c"})["id"] == 3, "Los ids borrados no se reutilizan"
+
+
+def test_initial_records_set_next_id():
+    store = RecordStore([{"id": 1, "name": "León"}, {"id": 5, "name": "Jirafa"}])
+    assert store.add({"name": "Tigre"})["id"] == 6
+    with pytest.raises(ValueError):
+        RecordStore([{"id": 1}, {"id": 1}])
+    with pytest.raises(ValueError):
+        RecordStore([{"id": 2}, {"id": 1}])
+
+
+def test_all_keeps_insertion_order_after_changes():
+    """
+    all devuelve los registros en orden de creación aunque se modifiquen o borren otros
+    """
+    store = RecordStore()
+    for name in "abcd":
+        store.add({"name": name})
+    store.delete(2)
+    store.update(3, {"name": "C"})
+    assert [record["name"] for record in store.all()] == ["a", "C", "d"]
+    assert [record["id"] for record in store] == [1, 3, 4]
+    assert len(store) == 3
+    assert 2 not in store
+
+
+def test_update_and_delete_missing():
+    store = RecordStore()
+    record = store.add({"name": "a"})
+    updated = store.update(1, {"name": "b"})
+    assert updated == {"id": 1, "name": "b"}
+    assert record == {"id": 1, "name": "a"}, "update no modifica el registro publicado"
+    assert store.get(1) is updated
+    assert store.update(9, {"name": "x"}) is None
+    assert store.delete(9) is None
+    assert store.delete(1) is updated
+    with pytest.raises(ValueError):
+        store.update(1, {"id": 2})
+
+
+def test_all_returns_snapshot():
+    """
+    all devuelve una instantánea que no cambia con las escrituras posteriores
+    """
+    store = RecordStore()
+    store.add({"name": "a"})
+    snapshot = store.all()
+    assert store.all() is snapshot
+    store.add({"name": "b"})
+    assert len(snapshot) == 1
+    assert len(store.all()) == 2
+
+
+def test_concurrent_writes_keep_ids_unique():
+    store = RecordStore()
+    threads_count, per_thread = 8, 500
+
+    def worker(n):
+        for i in range(per_thread):
+            record = store.add({"name": f"{n}-{i}"})
+            if i % 3 == 0:
+                store.update(record["id"], {"name": "x"})
+            if i % 5 == 0:
+                store.delete(record["id"])
+            store.all()
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(threads_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    ids = [record["id"] for record in store.all()]
+    assert len(ids) == len(set(ids)) == threads_count * (per_thread - per_thread // 5)
+    assert ids == sorted(ids)
+    assert store.next_id == threads_count * per_thread + 1
+
+
+def test_page_after_id():
+    store = RecordStore()
+    for name in "abcde":
+        store.add({"name": name})
+    records, more = store.page(limit=2)
+    assert [r["id"] for r in records] == [1, 2] and more
+    store.delete(3)
+    records, more = store.page(2, limit=2)
+    assert [r["id"] for r in records] == [4, 5] and not more
+    records, more = store.page(5, limit=2)
+    assert records == () and not more
+
+
+def test_page_skips_deleted_ids_and_rebuilds_index():
+    """
+    page salta los ids borrados, y la lista de ids se rehace cuando la
+    mayoría ya no existen
+    """
+    store = RecordStore()
+    for i in range(3000):
+        store.add({"n": i})
+    for record_id in range(1, 2901):
+        store.delete(record_id)
+    assert len(store._ids) < 3000
+    store.add({"n": 3000})
+    walked = []
+    after_id, more = None, True
+    while more:
+        records, more = store.page(after_id, limit=40)
+        walked.extend(record["id"] for record in records)
+        after_id = walked[-1]
+    assert walked == [record["id"] for record in store.all()] == list(range(2901, 3002))
+
+
+def test_apply_runs_operations_in_order():
+    store = RecordStore()
+    store.add({"name": "a"})
+    results = store.apply([
+        ("add", None, {"name": "b"}),
+        ("update", 2, {"name": "B"}),
+        ("delete", 1, None),
+        ("delete", 1, None),
+        ("update", 9, {"name": "x"}),
+    ])
+    assert results == [{"id": 2, "name": "b"}, {"id": 2, "name": "B"}, {"id": 1, "name": "a"}, None, None]
+    assert store.all() == ({"id": 2, "name": "B"},)
+    with pytest.raises(ValueError):
+        store.apply([("add", None, {"name": "c"}), ("rename", 1, {})])
+    assert len(store) == 1, "Una operación no válida no aplica ninguna"
@@ -0,0 +1,129 @@
+"""
+Caché de respuestas serializadas con expulsión LRU por presupuesto de memoria.
+
+Guarda, por clave (por ejemplo, el id de un producto), los bytes listos para
+enviar y su Content-Length ya formateado, de modo que una petición repetida no
+vuelve a serializar el recurso. Cuando la memoria estimada supera max_bytes se
+expulsan las entradas usadas hace más tiempo.
+
+La estimación de cada entrada (entry_size) suma al cuerpo el tamaño de la
+clave y un coste fijo por entrada: con cuerpos pequeños y muchas claves
+distintas, contar solo los bytes del cuerpo dejaba que la caché ocupara
+decenas de veces su presupuesto.
+
+Las entradas se invalidan explícitamente con invalidate cuando el recurso
+cambia (ProductRepository.add_listener). get_or_build no guarda un valor si
+la clave se ha invalidado mientras se construía, para que una serialización
+lenta no vuelva a dejar en la caché una versión anterior al cambio.
+"""
+
+import sys
+import threading
+from collections import OrderedDict, namedtuple
+
+# Presupuesto de memoria por defecto (en bytes)
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+# Memoria aproximada de cada entrada además del cuerpo y la clave: el nodo del
+# OrderedDict, el CachedBody y su Content-Length (medido con tracemalloc en
+# CPython 3.11 de 64 bits)
+ENTRY_OVERHEAD = 224
+
+# Entrada de la caché: cuerpo listo para enviar y su Content-Length como texto
+CachedBody = namedtuple("CachedBody", ["body", "content_length"])
+
+
+def _key_size(key):
+    size = sys.getsizeof(key)
+    if isinstance(key, tuple):
+        size += sum(_key_size(part) for part in key)
+    return size
+
+
+def entry_size(key, body):
+    """
+    Devuelve los bytes que se cuentan en el presupuesto por guardar body bajo key
+    """
+    return sys.getsizeof(body) + _key_size(key) + ENTRY_OVERHEAD
+
+
+class ResponseCache:
+    """
+    Caché LRU de cuerpos de respuesta, segura entre hilos
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Devuelve el CachedBody de la clave, o None, y la marca como usada
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def get_or_build(self, key, build):
+        """
+        Devuelve el CachedBody de la clave; si no está, llama a build() para
+        obtener los bytes, los guarda y los devuelve
+        """
+        entry = self.get(key)
+        if entry is not None:
+            return entry
+        generation = self._generations.get(key, 0)
+        body = build()
+        entry = CachedBody(body, str(len(body)))
+        with self._lock:
+            if self._generations.get(key, 0) == generation:
+                self._store(key, entry)
+        return entry
+
+    def put(self, key, body):
+        """
+        Guarda los bytes de la clave y devuelve su CachedBody
+        """
+        entry = CachedBody(body, str(len(body)))
+        with self._lock:
+            self._store(key, entry)
+        return entry
+
+    def _store(self, key, entry):
+        size = entry_size(key, entry.body)
+        if size > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.size -= entry_size(key, previous.body)
+        self._entries[key] = entry
+        self.size += size
+        while self.size > self.max_bytes:
+            evicted_key, evicted = self._entries.popitem(last=False)
+            self.size -= entry_size(evicted_key, evicted.body)
+
+    def invalidate(self, key):
+        """
+        Elimina la entrada de la clave (el recurso ha cambiado)
+        """
+        with self._lock:
+            self._generations[key] = self._generations.get(key, 0) + 1
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.size -= entry_size(key, entry.body)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,77 @@
+import tracemalloc
+
+from comun.response_cache import ResponseCache, entry_size
+
+
+def test_get_or_build_serializes_once():
+    """
+    La segunda petición de la misma clave reutiliza los bytes guardados
+    """
+    cache = ResponseCache()
+    calls = []
+
+    def build():
+        calls.append(1)
+        return b'{"id": 1}'
+
+    first = cache.get_or_build(1, build)
+    second = cache.get_or_build(1, build)
+    assert second is first
+    assert first.content_length == "9"
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_lru_eviction_respects_memory_budget():
+    """
+    Al superar max_bytes se expulsan las entradas usadas hace más tiempo
+    """
+    one = entry_size("a", b"1234")
+    cache = ResponseCache(max_bytes=2 * one + one // 2)
+    cache.put("a", b"1234")
+    cache.put("b", b"1234")
+    cache.get("a")
+    cache.put("c", b"1234")
+    assert "a" in cache and "c" in cache
+    assert "b" not in cache
+    assert cache.size == 2 * one
+
+    # Un cuerpo mayor que el presupuesto no se guarda
+    cache.put("grande", b"x" * cache.max_bytes)
+    assert "grande" not in cache
+
+
+def test_budget_covers_keys_and_entry_overhead():
+    """
+    Con muchas claves distintas y cuerpos pequeños, la memoria real de la
+    caché sigue cerca de max_bytes
+    """
+    cache = ResponseCache(max_bytes=256 * 1024)
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for i in range(20000):
+            cache.put(("greet", f"nombre{i}"), f"¡Hola, nombre{i}!".encode())
+        used = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    assert cache.size <= cache.max_bytes
+    assert used < 1.5 * cache.max_bytes
+
+
+def test_invalidate_drops_entry_and_in_flight_builds():
+    """
+    invalidate elimina la entrada, y un valor construido antes del cambio no se guarda
+    """
+    cache = ResponseCache()
+    cache.put(1, b"viejo")
+    cache.invalidate(1)
+    assert 1 not in cache
+    assert cache.size == 0
+
+    def stale_build():
+        cache.invalidate(1)
+        return b"obsoleto"
+
+    assert cache.get_or_build(1, stale_build).body == b"obsoleto"
+    assert 1 not in cache
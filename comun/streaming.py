@@ -0,0 +1,82 @@
+"""
+Respuestas HTTP enviadas por partes (Transfer-Encoding: chunked).
+
+Permiten enviar cuerpos que se generan poco a poco, como una colección
+completa de productos, sin conocer su tamaño de antemano ni construirlos
+enteros en memoria: el manejador solo guarda el trozo que está enviando.
+
+Con los motores de hilos cada trozo se escribe directamente en el socket. El
+motor asyncio ejecuta el manejador sobre un búfer en memoria y envía la
+respuesta al terminar, así que allí el cuerpo completo sí ocupa memoria.
+"""
+
+# Tamaño aproximado (en bytes) de cada trozo enviado
+DEFAULT_CHUNK_SIZE = 16 * 1024
+
+
+def batch_chunks(pieces, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Agrupa piezas de texto pequeñas en trozos de bytes de unos chunk_size bytes
+    """
+    batch = []
+    size = 0
+    for piece in pieces:
+        data = piece.encode()
+        batch.append(data)
+        size += len(data)
+        if size >= chunk_size:
+            yield b"".join(batch)
+            batch = []
+            size = 0
+    if batch:
+        yield b"".join(batch)
+
+
+def iter_json_array(items, dumps):
+    """
+    Genera, pieza a pieza, el array JSON de items; dumps serializa cada elemento
+    """
+    yield "["
+    separator = ""
+    for item in items:
+        yield separator + dumps(item)
+        separator = ","
+    yield "]"
+
+
+class ChunkedResponseMixin:
+    """
+    Mixin para manejadores BaseHTTPRequestHandler que envía cuerpos generados
+    por partes
+    """
+
+    def send_chunked(self, status, content_type, chunks):
+        """
+        Envía los trozos de bytes que produce chunks según se generan.
+
+        Con HTTP/1.1 se usa Transfer-Encoding: chunked y la conexión se puede
+        reutilizar; un cliente HTTP/1.0 no lo entiende, así que recibe el
+        cuerpo tal cual y la conexión se cierra al terminar.
+        """
+        chunked = self.request_version == "HTTP/1.1"
+        self.send_response(status)
+        self.send_header('Content-type', content_type)
+        if chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+        else:
+            self.close_connection = True
+        self.end_headers()
+        try:
+            for chunk in chunks:
+                if not chunk:
+                    continue
+                if chunked:
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                else:
+                    self.wfile.write(chunk)
+        except BaseException:
+            # La respuesta ha quedado a medias: el cliente no puede reutilizar la conexión
+            self.close_connection = True
+            raise
+        if chunked:
+            self.wfile.write(b"0\r\n\r\n")
@@ -0,0 +1,14 @@
+import json
+from comun.streaming import batch_chunks, iter_json_array
+
+
+def test_batch_chunks_groups_small_pieces():
+    chunks = list(batch_chunks(["ab", "cd", "e"], chunk_size=4))
+    assert chunks == [b"abcd", b"e"]
+    assert list(batch_chunks([])) == []
+
+
+def test_iter_json_array():
+    items = [{"id": 1}, {"id": 2, "name": "á"}]
+    assert json.loads("".join(iter_json_array(items, json.dumps))) == items
+    assert "".join(iter_json_array([], json.dumps)) == "[]"